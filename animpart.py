@@ -1,6 +1,7 @@
 import bpy
-import random
-from mathutils import Vector
+import numpy as np
+
+import bpl
 
 # Function to create an icosphere
 def create_icosphere(size):
@@ -28,29 +29,12 @@ def create_emission_material(intensity):
 
     return mat
 
-# Function to generate a random direction vector
-def generate_random_direction():
-    direction = Vector((random.choice([1, -1]), random.choice([1, -1]), random.choice([1, -1])))
-    return direction
-
-# Main function to create the animation
-def animate_icosphere_in_fog(steps, size, intensity):
-    # Create the icosphere
-    icosphere = create_icosphere(size)
-
-    # Create the emission material and assign it to the icosphere
-    emission_material = create_emission_material(intensity)
-    if len(icosphere.data.materials):
-        icosphere.data.materials[0] = emission_material
-    else:
-        icosphere.data.materials.append(emission_material)
-
-    # Create the fog cube
-    bpy.ops.mesh.primitive_cube_add(size=10, location=(0, 0, 0))
+# Function to create the fog cube with a volume scatter material
+def create_fog_cube(size=10, location=(0, 0, 0), density=0.1):
+    bpy.ops.mesh.primitive_cube_add(size=size, location=location)
     fog_cube = bpy.context.object
     fog_cube.name = "FogCube"
     fog_cube.display_type = 'WIRE'
-    fog_cube.hide_render = True  # Hide the cube in renders
 
     # Create a volume scatter material for the fog
     fog_material = bpy.data.materials.new(name="FogMaterial")
@@ -61,7 +45,7 @@ def animate_icosphere_in_fog(steps, size, intensity):
     nodes.clear()
 
     volume_scatter = nodes.new(type='ShaderNodeVolumeScatter')
-    volume_scatter.inputs['Density'].default_value = 0.1
+    volume_scatter.inputs['Density'].default_value = density
     volume_scatter.inputs['Color'].default_value = (0.8, 0.8, 0.8, 1)  # Light gray
 
     volume_output = nodes.new(type='ShaderNodeOutputMaterial')
@@ -69,19 +53,231 @@ def animate_icosphere_in_fog(steps, size, intensity):
     links.new(volume_scatter.outputs['Volume'], volume_output.inputs['Volume'])
 
     fog_cube.data.materials.append(fog_material)
+    return fog_cube
+
+def random_walks(count, steps, step_size, starts, bounds=None, seed=None):
+    """
+    Generates count random walks at once. Every step moves each walker by
+    step_size along a random diagonal (+-1 on every axis).
+
+    Args:
+    - count: The number of walkers.
+    - steps: The number of steps.
+    - step_size: The distance moved along every axis per step.
+    - starts: A (count, 3) array (or a single point) with the start positions.
+    - bounds: Optional (min, max) corners of a box. Walkers are reflected at its
+      walls, which keeps them inside without sticking to them.
+    - seed: Seed of the random generator.
+
+    Returns:
+    - A (steps + 1, count, 3) float array of positions, starting with starts.
+    """
+    rng = np.random.default_rng(seed)
+    directions = rng.integers(0, 2, size=(steps, count, 3), dtype=np.int8) * 2 - 1
+    positions = np.empty((steps + 1, count, 3))
+    positions[0] = starts
+    np.cumsum(directions * step_size, axis=0, out=positions[1:])
+    positions[1:] += positions[0]
+
+    if bounds is not None:
+        # Folding the free walk into the box is the same as reflecting every step at the walls
+        low, high = (np.asarray(corner, dtype=float) for corner in bounds)
+        extent = high - low
+        folded = np.mod(positions - low, 2 * extent)
+        positions = low + np.where(folded > extent, 2 * extent - folded, folded)
+    return positions
+
+def kmeans(points, clusters, seed=None, iterations=20):
+    """
+    Groups points into clusters with Lloyd's algorithm.
+
+    Returns:
+    - An int array with the cluster of every point.
+    """
+    rng = np.random.default_rng(seed)
+    centers = points[rng.choice(len(points), size=min(clusters, len(points)), replace=False)]
+    labels = np.zeros(len(points), dtype=np.int64)
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        # Empty clusters keep their previous center
+        occupied = counts > 0
+        centers[occupied] = sums[occupied] / counts[occupied, None]
+    return labels
+
+def merge_overlapping_boxes(boxes):
+    """
+    Replaces overlapping boxes by their union until no two boxes overlap.
+
+    Args:
+    - boxes: A list of (low, high) corner arrays.
+
+    Returns:
+    - The list of disjoint boxes.
+    """
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                (low_i, high_i), (low_j, high_j) = boxes[i], boxes[j]
+                if np.all(low_i < high_j) and np.all(low_j < high_i):
+                    boxes[i] = (np.minimum(low_i, low_j), np.maximum(high_i, high_j))
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+def fog_domains(positions, margin=0.5, clusters=1, seed=None, bounds=None):
+    """
+    Computes boxes that cover the given positions with a margin, so the fog only fills
+    the space the walkers actually visit.
+
+    Args:
+    - positions: A (steps + 1, count, 3) array of walks (see random_walks) or an (N, 3) array of points.
+    - margin: The distance between the points and the walls of their box.
+    - clusters: The number of boxes to split the walks into (k-means). Boxes that
+      would overlap are merged, so the fog density never doubles.
+    - seed: Seed of the clustering.
+    - bounds: Optional (min, max) corners of a box the domains are clipped to.
+
+    Returns:
+    - A list of (low, high) corner arrays.
+    """
+    positions = np.asarray(positions, dtype=float)
+    # Walks of shape (steps + 1, count, 3) are clustered as whole walks, by their mean position
+    walks = positions.reshape(-1, positions.shape[-2], 3) if positions.ndim == 3 else positions.reshape(1, -1, 3)
+    if clusters > 1:
+        labels = kmeans(walks.mean(axis=0), clusters, seed=seed)
+        groups = [walks[:, labels == label].reshape(-1, 3) for label in np.unique(labels)]
+    else:
+        groups = [walks.reshape(-1, 3)]
+    boxes = [(group.min(axis=0) - margin, group.max(axis=0) + margin) for group in groups]
+    if bounds is not None:
+        boxes = [(np.maximum(low, bounds[0]), np.minimum(high, bounds[1])) for low, high in boxes]
+    return merge_overlapping_boxes(boxes)
+
+def create_fog_domains(boxes, density=0.1, reference_size=None, max_density=1.0):
+    """
+    Creates one fog cube per box.
+
+    Args:
+    - boxes: A list of (low, high) corner arrays, see fog_domains.
+    - density: The volume scatter density.
+    - reference_size: If given, the density of every domain is scaled by reference_size
+      divided by the mean thickness (cube root of the volume) of the domain. A ray
+      through a domain then sees the same optical depth as through a fog cube of edge
+      reference_size with the given density, which keeps the amount of haze similar.
+    - max_density: The upper limit of the scaled density, so small domains do not
+      turn into opaque blocks.
+
+    Returns:
+    - The list of fog cube objects.
+    """
+    fog_cubes = []
+    for low, high in boxes:
+        extent = np.maximum(high - low, 1e-6)
+        domain_density = density
+        if reference_size is not None:
+            domain_density = min(density * reference_size / np.prod(extent) ** (1 / 3), max(density, max_density))
+        fog_cube = create_fog_cube(1, location=(low + high) / 2, density=domain_density)
+        fog_cube.scale = extent
+        fog_cubes.append(fog_cube)
+    return fog_cubes
+
+# Main function to create the animation
+def animate_icosphere_in_fog(steps, size, intensity, count=1, seed=None, fog_size=10, frame_step=10,
+                             adaptive_fog=False, fog_margin=0.5, fog_clusters=1, scale_fog_density=True,
+                             start_groups=None, group_radius=0.5):
+    """
+    Creates a fog cube and animates count emitting icospheres on random walks inside it.
+
+    All walkers share one icosphere mesh, one emission material and one action with
+    a slot per walker (see bpl.assign_shared_action). Their walks are generated
+    together with random_walks and written to the location F-Curves in bulk (see
+    bpl.set_keyframes).
+
+    Args:
+    - steps: The number of steps of every walk.
+    - size: The icosphere radius, which is also the step length along every axis.
+    - intensity: The emission strength.
+    - count: The number of walkers. A single walker starts in a corner of the fog
+      cube; several walkers start at random positions inside it.
+    - seed: Seed of the random generator.
+    - fog_size: The edge length of the fog cube.
+    - frame_step: The number of frames per step.
+    - adaptive_fog: If True, the fog only fills boxes around the walks (see fog_domains)
+      instead of the whole cube, which cuts the volume Cycles has to trace.
+    - fog_margin: The margin between the walks and the adaptive fog boxes.
+    - fog_clusters: The number of adaptive fog boxes to split the walks into.
+    - scale_fog_density: If True, the density of the adaptive boxes is scaled to keep
+      the optical depth of the fixed fog cube (see create_fog_domains).
+    - start_groups: If given, several walkers start in this many groups around random
+      centers instead of spread over the whole cube.
+    - group_radius: The distance along every axis between a walker start and its group center.
+
+    Returns:
+    - The list of walker objects.
+    """
+    # Create the icosphere
+    icosphere = create_icosphere(size)
+
+    # Create the emission material and assign it to the icosphere
+    emission_material = create_emission_material(intensity)
+    if len(icosphere.data.materials):
+        icosphere.data.materials[0] = emission_material
+    else:
+        icosphere.data.materials.append(emission_material)
+
+    # Walkers stay one radius away from the walls of the fog cube
+    half = fog_size / 2 - size
+    bounds = ((-half, -half, -half), (half, half, half))
+    if count == 1:
+        starts = np.full((1, 3), -fog_size / 2 + 0.5)
+    elif start_groups:
+        rng = np.random.default_rng(seed)
+        centers = rng.uniform(-half + group_radius, half - group_radius, size=(start_groups, 3))
+        starts = centers[rng.integers(0, start_groups, size=count)]
+        starts += rng.uniform(-group_radius, group_radius, size=(count, 3))
+    else:
+        starts = np.random.default_rng(seed).uniform(-half, half, size=(count, 3))
+    # The walks use their own stream, derived from the seed
+    positions = random_walks(count, steps, size, starts, bounds=bounds,
+                             seed=None if seed is None else seed + 1)
+
+    if adaptive_fog:
+        fog_bounds = ((-fog_size / 2,) * 3, (fog_size / 2,) * 3)
+        boxes = fog_domains(positions, margin=fog_margin, clusters=fog_clusters, seed=seed, bounds=fog_bounds)
+        create_fog_domains(boxes, reference_size=fog_size if scale_fog_density else None)
+    else:
+        create_fog_cube(fog_size)
+
+    walkers = [icosphere]
+    if count > 1:
+        # Copies share the mesh (and with it the material); they are linked to a
+        # collection that is added to the scene once, after all links
+        collection = bpy.data.collections.new("Walkers")
+        for index in range(1, count):
+            walker = icosphere.copy()
+            collection.objects.link(walker)
+            walkers.append(walker)
+        bpy.context.scene.collection.children.link(collection)
+
+    frames = np.arange(steps + 1) * frame_step
+    bpl.assign_shared_action(walkers, "WalkersAction")
+    for index, walker in enumerate(walkers):
+        walker.location = positions[0, index]
+        for axis in range(3):
+            fcurve = bpl.ensure_fcurve(walker, "location", axis)
+            bpl.set_keyframes(fcurve, frames, positions[:, index, axis])
 
-    # Set initial position
-    initial_position = Vector((-4.5, -4.5, -4.5))
-    icosphere.location = initial_position
-    icosphere.keyframe_insert(data_path="location", frame=0)
-
-    # Animate the icosphere
-    current_position = initial_position
-    for step in range(1, steps + 1):
-        direction = generate_random_direction()
-        current_position += direction * size  # Move by the size of the icosphere
-        icosphere.location = current_position
-        icosphere.keyframe_insert(data_path="location", frame=step * 10)  # 10 frames per step
+    return walkers
 
 def main():
     animate_icosphere_in_fog(
@@ -0,0 +1,593 @@
+"""
+Bakes Follow Path and Track To constraints into plain location/rotation F-Curves.
+
+The curves are sampled analytically with NumPy, the same way Blender builds
+the path of a curve (resolution_u points per Bezier segment, evenly spaced
+by arc length), so no frame_set() stepping is needed. After baking, the
+constraints can be removed and playback no longer evaluates them.
+
+Example usage:
+    import bake
+    drones = swarm.distribute_and_animate_objects(drone, curves, 1, 250, linked=True)
+    bake.bake_path_constraints(drones, 1, 250, tolerance=0.001)
+"""
+import numpy as np
+
+import bpy
+from mathutils import Vector
+
+import bpl
+from sweep import minimum_twist_normals, normalized as _normalized
+
+# Column of the object matrix, sign and mathutils axis name for every Follow Path / Track To axis
+AXES = {
+    'X': (0, 1.0, 'X'), 'Y': (1, 1.0, 'Y'), 'Z': (2, 1.0, 'Z'),
+    'NEGATIVE_X': (0, -1.0, '-X'), 'NEGATIVE_Y': (1, -1.0, '-Y'), 'NEGATIVE_Z': (2, -1.0, '-Z'),
+}
+
+
+def parse_axis(name):
+    """
+    Returns (column, sign, mathutils name) for an axis enum like 'FORWARD_Y',
+    'TRACK_NEGATIVE_Z' or 'UP_Z'.
+    """
+    for prefix in ("FORWARD_", "TRACKING_", "TRACK_", "UP_"):
+        if name.startswith(prefix):
+            return AXES[name[len(prefix):]]
+    raise ValueError(f"Unknown axis: {name}")
+
+
+def evaluate_bezier_segments(p0, p1, p2, p3, t):
+    """
+    Evaluates cubic Bezier segments at the parameters t.
+
+    Args:
+    - p0, p1, p2, p3: (S, 3) arrays of control points, one row per segment.
+    - t: (R,) array of parameters in [0, 1].
+
+    Returns:
+    - An (S, R, 3) array of points.
+    """
+    t = t[None, :, None]
+    s = 1 - t
+    return (s**3 * p0[:, None] + 3 * s**2 * t * p1[:, None]
+            + 3 * s * t**2 * p2[:, None] + t**3 * p3[:, None])
+
+
+def spline_path_points(spline, resolution):
+    """
+    Returns the points of the path Blender builds for a spline, in curve space.
+
+    Bezier splines are evaluated at resolution points per segment. Poly and NURBS
+    splines use their control points, so NURBS paths are only approximated. Like in
+    Blender, the path of a cyclic spline starts at its last control point.
+
+    Returns:
+    - A tuple (points, end_directions): the (P, 3) path points and, for open Bezier
+      splines, the (2, 3) tangents at both ends (along the handles), otherwise None.
+    """
+    cyclic = spline.use_cyclic_u
+    if spline.type == 'BEZIER':
+        count = len(spline.bezier_points)
+        co = np.empty(3 * count, dtype=np.float32)
+        left = np.empty(3 * count, dtype=np.float32)
+        right = np.empty(3 * count, dtype=np.float32)
+        spline.bezier_points.foreach_get("co", co)
+        spline.bezier_points.foreach_get("handle_left", left)
+        spline.bezier_points.foreach_get("handle_right", right)
+        co, left, right = co.reshape(-1, 3), left.reshape(-1, 3), right.reshape(-1, 3)
+
+        if cyclic:
+            start, end = np.arange(-1, count - 1) % count, np.arange(count)
+        else:
+            start, end = np.arange(count - 1), np.arange(1, count)
+        t = np.arange(resolution) / resolution
+        points = evaluate_bezier_segments(co[start], right[start], left[end], co[end], t).reshape(-1, 3)
+        if cyclic:
+            return np.concatenate((points, co[-1:])), None
+        return np.concatenate((points, co[-1:])), np.array((right[0] - co[0], co[-1] - left[-1]))
+
+    co = np.empty(4 * len(spline.points), dtype=np.float32)
+    spline.points.foreach_get("co", co)
+    points = co.reshape(-1, 4)[:, :3]
+    return (np.concatenate((points, points[:1])) if cyclic else points), None
+
+
+def curve_path(curve_obj, spline_index=0, forward_axis='FORWARD_Y', up_axis='UP_Z'):
+    """
+    Returns the path of one spline of a curve object in curve space.
+
+    The normals start out like an object tracking the first tangent with forward_axis
+    and up_axis, and are then carried along the path without twisting.
+
+    Returns:
+    - A tuple (points, directions, normals, lengths) with the (P, 3) path points, their
+      unit tangents and normals and the (P,) cumulative arc length at every point.
+    """
+    spline = curve_obj.data.splines[spline_index]
+    resolution = spline.resolution_u or curve_obj.data.resolution_u
+    points, end_directions = spline_path_points(spline, resolution)
+    points = points.astype(np.float64)
+
+    # Tangents bisect the neighbouring segments; open Bezier ends follow their handles
+    segments = np.diff(points, axis=0)
+    lengths = np.concatenate(([0.0], np.cumsum(np.linalg.norm(segments, axis=1))))
+    segments = _normalized(segments)
+    directions = _normalized(np.concatenate((segments[:1], segments[:-1] + segments[1:], segments[-1:])))
+    if spline.use_cyclic_u:
+        # The path closes, so its ends bisect the segments that meet there
+        directions[[0, -1]] = _normalized(segments[0] + segments[-1])
+    elif end_directions is not None:
+        handles = np.linalg.norm(end_directions, axis=1) > 1e-6
+        directions[[0, -1]] = np.where(handles[:, None], _normalized(end_directions), directions[[0, -1]])
+    up, _, _ = parse_axis(up_axis)
+    first_normal = track_matrices(directions[:1], forward_axis, up_axis)[0, :, up]
+    normals = minimum_twist_normals(directions, first_normal)
+    if spline.use_cyclic_u:
+        # Spread the twist left at the seam over the path, so the normals meet again
+        twist = np.arctan2(np.dot(np.cross(normals[-1], normals[0]), directions[0]), np.dot(normals[-1], normals[0]))
+        angles = twist * np.arange(len(lengths)) / (len(lengths) - 1)
+        binormals = np.cross(directions, normals)
+        normals = normals * np.cos(angles)[:, None] + binormals * np.sin(angles)[:, None]
+    return points, directions, normals, lengths
+
+
+def sample_path(path, factors):
+    """
+    Samples a path at fractions of its arc length.
+
+    Args:
+    - path: A path as returned by curve_path.
+    - factors: (F,) array of fractions in [0, 1].
+
+    Returns:
+    - A tuple (positions, tangents, normals) of (F, 3) arrays; tangents and normals
+      are perpendicular unit vectors.
+    """
+    points, directions, normals, lengths = path
+    distance = np.clip(factors, 0.0, 1.0) * lengths[-1]
+
+    def interpolate(values):
+        return np.column_stack([np.interp(distance, lengths, values[:, axis]) for axis in range(3)])
+
+    tangents = _normalized(interpolate(directions))
+    normals = interpolate(normals)
+    normals = _normalized(normals - np.sum(normals * tangents, axis=1, keepdims=True) * tangents)
+    return interpolate(points), tangents, normals
+
+
+def axis_matrices(directions, normals, track_axis, up_axis):
+    """
+    Builds rotation matrices that point one object axis along directions and another
+    along normals, which must be perpendicular to the directions.
+
+    Args:
+    - directions, normals: (F, 3) arrays of unit vectors.
+    - track_axis: The tracking axis enum, e.g. 'FORWARD_Y' or 'TRACK_NEGATIVE_Z'.
+    - up_axis: The up axis enum, e.g. 'UP_Z'.
+
+    Returns:
+    - An (F, 3, 3) array of rotation matrices.
+    """
+    track, sign, _ = parse_axis(track_axis)
+    up, _, _ = parse_axis(up_axis)
+    other = 3 - track - up
+
+    matrices = np.empty((len(directions), 3, 3))
+    matrices[:, :, track] = sign * directions
+    matrices[:, :, up] = normals
+    # Keep the basis right-handed
+    if (up - track) % 3 == 1:
+        matrices[:, :, other] = np.cross(matrices[:, :, track], normals)
+    else:
+        matrices[:, :, other] = np.cross(normals, matrices[:, :, track])
+    return matrices
+
+
+def track_matrices(directions, track_axis, up_axis):
+    """
+    Builds rotation matrices that point an object axis along directions while keeping
+    another object axis as close to world Z as possible, like Track To does.
+
+    Args:
+    - directions: (F, 3) array of directions to track.
+    - track_axis: The tracking axis enum, e.g. 'TRACK_NEGATIVE_Z'.
+    - up_axis: The up axis enum, e.g. 'UP_Y'.
+
+    Returns:
+    - An (F, 3, 3) array of rotation matrices.
+    """
+    directions = _normalized(directions)
+    normals = np.array([0.0, 0.0, 1.0]) - directions[:, 2:3] * directions
+    vertical = np.linalg.norm(normals, axis=1) < 1e-6
+    matrices = axis_matrices(directions, _normalized(normals), track_axis, up_axis)
+
+    # Along world Z the up axis is undefined; use Blender's own choice
+    if vertical.any():
+        track_name, up_name = parse_axis(track_axis)[2], parse_axis(up_axis)[2]
+        for index in np.flatnonzero(vertical):
+            matrices[index] = Vector(directions[index]).to_track_quat(track_name, up_name).to_matrix()
+    return matrices
+
+
+def matrices_to_euler(rotations):
+    """
+    Converts (F, 3, 3) rotation matrices to continuous XYZ Euler angles.
+
+    Returns:
+    - An (F, 3) array of angles, unwrapped along the first axis so that consecutive
+      frames do not jump by 2 pi.
+    """
+    cos_y = np.hypot(rotations[:, 0, 0], rotations[:, 1, 0])
+    gimbal = cos_y < 1e-6
+    x = np.where(gimbal, np.arctan2(-rotations[:, 1, 2], rotations[:, 1, 1]),
+                 np.arctan2(rotations[:, 2, 1], rotations[:, 2, 2]))
+    y = np.arctan2(-rotations[:, 2, 0], cos_y)
+    z = np.where(gimbal, 0.0, np.arctan2(rotations[:, 1, 0], rotations[:, 0, 0]))
+    return np.unwrap(np.column_stack((x, y, z)), axis=0)
+
+
+def simplify_keys(frames, values, tolerance):
+    """
+    Selects the keys needed to reproduce sampled values with linear interpolation
+    (Ramer-Douglas-Peucker on every channel at once).
+
+    Args:
+    - frames: (F,) array of frames.
+    - values: (F, C) array of sampled values.
+    - tolerance: The largest allowed difference on any channel.
+
+    Returns:
+    - The sorted indices of the keys to keep; the first and the last are always kept.
+    """
+    count = len(frames)
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    # All intervals of one subdivision level are checked at once
+    first, last = np.array([0]), np.array([count - 1])
+    while len(first):
+        wide = last - first >= 2
+        first, last = first[wide], last[wide]
+        if not len(first):
+            break
+        sizes = last - first - 1
+        starts = np.cumsum(sizes) - sizes
+        owner = np.repeat(np.arange(len(first)), sizes)
+        inner = np.arange(sizes.sum()) - starts[owner] + first[owner] + 1
+
+        t = (frames[inner] - frames[first[owner]]) / (frames[last[owner]] - frames[first[owner]])
+        line = values[first[owner]] + t[:, None] * (values[last[owner]] - values[first[owner]])
+        error = np.abs(values[inner] - line).max(axis=1)
+
+        split = np.maximum.reduceat(error, starts) > tolerance
+        middle = inner[np.lexsort((-error, owner))[starts]]
+        keep[middle[split]] = True
+        first, last = (np.concatenate((first[split], middle[split])),
+                       np.concatenate((middle[split], last[split])))
+    return np.flatnonzero(keep)
+
+
+def find_fcurve(id_data, data_path, index=0):
+    """
+    Returns the F-Curve animating data_path[index] of a datablock, or None.
+    """
+    animation_data = id_data.animation_data
+    if animation_data is None or animation_data.action is None:
+        return None
+    for fcurve in bpl.action_fcurves(animation_data.action):
+        if fcurve.data_path == data_path and fcurve.array_index == index:
+            return fcurve
+    return None
+
+
+def fcurve_signature(fcurve):
+    """
+    Returns a key that is equal for F-Curves that evaluate the same, or None for
+    F-Curves with modifiers.
+    """
+    if len(fcurve.modifiers):
+        return None
+    keyframe_points = fcurve.keyframe_points
+    count = len(keyframe_points)
+    coordinates = np.empty(6 * count, dtype=np.float32)
+    keyframe_points.foreach_get("co", coordinates[:2 * count])
+    keyframe_points.foreach_get("handle_left", coordinates[2 * count:4 * count])
+    keyframe_points.foreach_get("handle_right", coordinates[4 * count:])
+    modes = np.empty(2 * count, dtype=np.int32)
+    keyframe_points.foreach_get("interpolation", modes[:count])
+    keyframe_points.foreach_get("easing", modes[count:])
+    return fcurve.extrapolation, coordinates.tobytes(), modes.tobytes()
+
+
+def evaluate_property(id_data, data_path, frames, default, cache=None, index=0):
+    """
+    Returns the animated value of a property at every frame, or default where it is not animated.
+
+    Args:
+    - cache: Optional dict that shares the values of identical F-Curves between calls
+      with the same frames.
+    - index: The array index of the property.
+    """
+    fcurve = find_fcurve(id_data, data_path, index)
+    if fcurve is None:
+        return np.full(len(frames), default, dtype=np.float64)
+
+    key = fcurve_signature(fcurve) if cache is not None else None
+    if key is not None and key in cache:
+        return cache[key]
+    values = np.array([fcurve.evaluate(frame) for frame in frames])
+    if key is not None:
+        cache[key] = values
+    return values
+
+
+def follow_path_factors(constraint, frames, cache=None):
+    """
+    Returns the fraction of the path a Follow Path constraint is at on every frame.
+
+    With use_fixed_location the (animated) offset_factor is used; otherwise the
+    (animated) eval_time of the curve, shifted by the constraint offset and divided
+    by the path duration.
+    """
+    if constraint.use_fixed_location:
+        factors = evaluate_property(constraint.id_data, f'constraints["{constraint.name}"].offset_factor',
+                                    frames, constraint.offset_factor, cache)
+    else:
+        curve = constraint.target.data
+        eval_time = evaluate_property(curve, "eval_time", frames, curve.eval_time, cache)
+        factors = (eval_time - constraint.offset) / max(curve.path_duration, 1)
+
+    spline = constraint.target.data.splines[0]
+    return factors % 1.0 if spline.use_cyclic_u else np.clip(factors, 0.0, 1.0)
+
+
+def find_constraint(obj, constraint_type):
+    """
+    Returns the first enabled constraint of the given type with a target, or None.
+    """
+    for constraint in obj.constraints:
+        if constraint.type == constraint_type and constraint.enabled and constraint.target is not None:
+            return constraint
+    return None
+
+
+def bake_frames(frame_start, frame_end, frame_step=1):
+    """
+    Returns the frames sampled by a bake, frame_end included.
+    """
+    frames = np.arange(frame_start, frame_end + frame_step, frame_step, dtype=np.float64)
+    return frames[frames <= frame_end]
+
+
+def cached_path(curve_obj, spline_index, cache, forward_axis='FORWARD_Y', up_axis='UP_Z'):
+    """
+    Returns curve_path(curve_obj, spline_index, forward_axis, up_axis), computed once per cache.
+    """
+    key = (curve_obj.name, spline_index, forward_axis, up_axis)
+    if key not in cache:
+        cache[key] = curve_path(curve_obj, spline_index, forward_axis, up_axis)
+    return cache[key]
+
+
+def path_matrices(curve_obj, path, factors, forward_axis='FORWARD_Y', up_axis='UP_Z', follow=True):
+    """
+    Returns the (F, 4, 4) world matrices at fractions of a path, like Follow Path.
+
+    Args:
+    - curve_obj: The curve object the path belongs to.
+    - path: A path as returned by curve_path.
+    - factors: (F,) array of fractions of the path.
+    - forward_axis, up_axis: The object axes along the path tangent and normal.
+    - follow: If False, the matrices only translate (use_curve_follow disabled).
+    """
+    positions, tangents, normals = sample_path(path, factors)
+    matrices = np.zeros((len(factors), 4, 4))
+    matrices[:, 3, 3] = 1.0
+    matrices[:, :3, 3] = positions
+    if follow:
+        matrices[:, :3, :3] = axis_matrices(tangents, normals, forward_axis, up_axis)
+    else:
+        matrices[:, :3, :3] = np.eye(3)
+    return np.array(curve_obj.matrix_world) @ matrices
+
+
+def parent_matrix(obj):
+    """
+    Returns the matrix that maps the object's basis to world space.
+    """
+    if obj.parent is None:
+        return np.eye(4)
+    return np.array(obj.parent.matrix_world) @ np.array(obj.matrix_parent_inverse)
+
+
+def world_to_basis(parent, world):
+    """
+    Splits (F, 4, 4) world matrices into locations and XYZ Euler rotations in parent space.
+    """
+    basis = np.linalg.inv(parent) @ world
+    rotations = basis[:, :3, :3] / np.maximum(np.linalg.norm(basis[:, :3, :3], axis=1), 1e-12)[:, None, :]
+    return basis[:, :3, 3], matrices_to_euler(rotations)
+
+
+def bake_object_constraints(obj, frames, cache=None):
+    """
+    Computes the transform a Follow Path and/or Track To constraint gives an object.
+
+    The object's own transform is taken as it is now. Track To targets are assumed
+    not to move. Curve tilt, curve radius and constraint influence are ignored.
+
+    Args:
+    - obj: The constrained object.
+    - frames: (F,) array of frames.
+    - cache: Optional dict that shares curve paths and F-Curve values between objects
+      baked over the same frames.
+
+    Returns:
+    - A tuple (locations, rotations) of (F, 3) arrays in the object's parent space,
+      rotations as XYZ Euler angles; or None if the object has neither constraint.
+    """
+    follow_path = find_constraint(obj, 'FOLLOW_PATH')
+    track_to = find_constraint(obj, 'TRACK_TO')
+    if follow_path is None and track_to is None:
+        return None
+    if cache is None:
+        cache = {}
+
+    parent = parent_matrix(obj)
+    world = np.broadcast_to(parent @ np.array(obj.matrix_basis), (len(frames), 4, 4)).copy()
+
+    if follow_path is not None:
+        curve_obj = follow_path.target
+        path = cached_path(curve_obj, 0, cache, follow_path.forward_axis, follow_path.up_axis)
+        factors = follow_path_factors(follow_path, frames, cache)
+        world = path_matrices(curve_obj, path, factors, follow_path.forward_axis, follow_path.up_axis,
+                              follow_path.use_curve_follow) @ world
+
+    scale = np.linalg.norm(world[:, :3, :3], axis=1)
+    if track_to is not None:
+        target = np.array(track_to.target.matrix_world.translation)
+        rotations = track_matrices(target - world[:, :3, 3], track_to.track_axis, track_to.up_axis)
+        world[:, :3, :3] = rotations * scale[:, None, :]
+
+    return world_to_basis(parent, world)
+
+
+def world_locations(obj, frames, cache=None):
+    """
+    Computes the world location of an object on every frame without changing frames.
+
+    The animated location and a Follow Path constraint are evaluated; rotation and
+    scale are taken as they are now, and a Track To constraint does not move the object.
+
+    Args:
+    - obj: The object.
+    - frames: (F,) array of frames.
+    - cache: Optional dict shared with other evaluations over the same frames.
+
+    Returns:
+    - An (F, 3) array of world locations.
+    """
+    if cache is None:
+        cache = {}
+    basis = np.broadcast_to(np.array(obj.matrix_basis), (len(frames), 4, 4)).copy()
+    for axis in range(3):
+        basis[:, axis, 3] = evaluate_property(obj, "location", frames, obj.location[axis], cache, index=axis)
+    world = parent_matrix(obj) @ basis
+
+    follow_path = find_constraint(obj, 'FOLLOW_PATH')
+    if follow_path is not None:
+        curve_obj = follow_path.target
+        path = cached_path(curve_obj, 0, cache, follow_path.forward_axis, follow_path.up_axis)
+        factors = follow_path_factors(follow_path, frames, cache)
+        world = path_matrices(curve_obj, path, factors, follow_path.forward_axis, follow_path.up_axis,
+                              follow_path.use_curve_follow) @ world
+    return world[:, :3, 3]
+
+
+def write_transform_keys(obj, frames, locations, rotations, tolerance=None):
+    """
+    Writes location and rotation_euler keys with linear interpolation.
+
+    Returns:
+    - The number of keyframes written.
+    """
+    keyframes = 0
+    obj.rotation_mode = 'XYZ'
+    for data_path, values in (("location", locations), ("rotation_euler", rotations)):
+        keys = slice(None) if tolerance is None else simplify_keys(frames, values, tolerance)
+        for axis in range(3):
+            fcurve = bpl.ensure_fcurve(obj, data_path, axis)
+            bpl.set_keyframes(fcurve, frames[keys], values[keys, axis], interpolation='LINEAR')
+            keyframes += len(fcurve.keyframe_points)
+    return keyframes
+
+
+def bake_path_constraints(objects, frame_start, frame_end, frame_step=1, tolerance=None, remove_constraints=True):
+    """
+    Bakes the Follow Path and Track To constraints of objects into location and
+    rotation_euler F-Curves with linear interpolation.
+
+    Objects that share their action slot with others (e.g. linked drones, see
+    swarm.distribute_and_animate_objects) get a slot of their own first, see
+    bpl.unshare_animation.
+
+    Args:
+    - objects: The objects to bake. Objects without these constraints are skipped.
+    - frame_start, frame_end: The frame range to bake (both included).
+    - frame_step: The distance between samples.
+    - tolerance: If given, keys are dropped as long as the linear interpolation stays
+      within this distance (in scene units for location, radians for rotation).
+    - remove_constraints: Remove the baked constraints and the offset_factor F-Curve.
+
+    Returns:
+    - The number of keyframes written.
+    """
+    frames = bake_frames(frame_start, frame_end, frame_step)
+    cache = {}
+    keyframes = 0
+
+    # Everything is evaluated before any key is written, while shared F-Curves are intact
+    baked_objects = []
+    for obj in objects:
+        baked = bake_object_constraints(obj, frames, cache)
+        if baked is not None:
+            baked_objects.append((obj, baked))
+    # Objects sharing an action slot (linked swarm drones) would all write into the same F-Curves
+    bpl.unshare_animation([obj for obj, _ in baked_objects], "BakedAction")
+
+    for obj, baked in baked_objects:
+        keyframes += write_transform_keys(obj, frames, *baked, tolerance=tolerance)
+
+        if remove_constraints:
+            for constraint_type in ('FOLLOW_PATH', 'TRACK_TO'):
+                constraint = find_constraint(obj, constraint_type)
+                if constraint is not None:
+                    bpl.remove_fcurve(obj, f'constraints["{constraint.name}"].offset_factor')
+                    obj.constraints.remove(constraint)
+
+    print(f"Baked {keyframes} keyframes for frames {frame_start}-{frame_end}.")
+    return keyframes
+
+
+def bake_spline_paths(objects, curve_obj, frame_start, frame_end, spline_indices=None, forward_axis='FORWARD_Y',
+                      up_axis='UP_Z', ease=True, frame_step=1, tolerance=None):
+    """
+    Animates objects along the splines of one curve object, one spline per object.
+
+    Follow Path only follows the first spline of a curve, so objects on a multi-spline
+    curve are keyed directly instead of being constrained.
+
+    Args:
+    - objects: The objects to animate.
+    - curve_obj: The curve object holding the splines.
+    - frame_start, frame_end: The objects are at the start of their spline at frame_start
+      and at the end at frame_end.
+    - spline_indices: The spline of every object. Defaults to the object's "spline_index"
+      custom property, or its position in objects.
+    - forward_axis, up_axis: The object axes along the path tangent and normal.
+    - ease: Ease in and out like two Bezier keyframes on offset_factor do; otherwise
+      move at constant speed.
+    - frame_step, tolerance: As in bake_path_constraints.
+
+    Returns:
+    - The number of keyframes written.
+    """
+    frames = bake_frames(frame_start, frame_end, frame_step)
+    factors = (frames - frame_start) / max(frame_end - frame_start, 1)
+    if ease:
+        factors = factors * factors * (3 - 2 * factors)
+    cache = {}
+    keyframes = 0
+
+    for position, obj in enumerate(objects):
+        if spline_indices is not None:
+            spline_index = int(spline_indices[position])
+        else:
+            spline_index = obj.get("spline_index", position)
+        path = cached_path(curve_obj, spline_index, cache, forward_axis, up_axis)
+        parent = parent_matrix(obj)
+        world = path_matrices(curve_obj, path, factors, forward_axis, up_axis) @ (parent @ np.array(obj.matrix_basis))
+        keyframes += write_transform_keys(obj, frames, *world_to_basis(parent, world), tolerance=tolerance)
+
+    print(f"Baked {keyframes} keyframes along {len(curve_obj.data.splines)} splines of {curve_obj.name}.")
+    return keyframes
@@ -0,0 +1,1027 @@
+"""
+Benchmarks for the BPL scene generators.
+
+Run in background Blender:
+    blender -b --python bench.py -- [options]
+
+or with the bpy module from pip:
+    python bench.py [options]
+
+Options:
+    --cases NAME [NAME ...]   Only run cases whose name contains one of the given strings.
+    --quick                   Only run the smallest size of every case.
+    --output FILE             Write the results as a baseline (.json or .csv).
+    --compare FILE            Compare the results against a stored baseline and
+                              exit with status 1 when a case regressed.
+    --tolerance FRACTION      Allowed increase in time, peak RSS or datablock counts before a
+                              case counts as a regression (default 0.25). Failing cases and
+                              baseline cases that no longer exist always count.
+    --in-process              Run all cases in this process instead of one subprocess per case.
+                              Faster, but the peak RSS of a single case cannot be measured.
+
+Every case runs in its own subprocess by default, so its peak RSS is the
+high-water mark of that case alone.
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import bpy
+import numpy as np
+from mathutils import Vector
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bpl
+
+
+def reset_blend_data():
+    """
+    Starts from an empty factory scene so every benchmark run is independent.
+    """
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def evaluate_scene():
+    """
+    Forces a depsgraph evaluation so lazily built geometry (modifiers, instances) is timed too.
+    """
+    bpy.context.view_layer.update()
+    bpy.context.evaluated_depsgraph_get()
+
+
+def blend_file_size():
+    """
+    Saves a copy of the current file to a temporary location and returns its size in bytes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=False)
+        return os.path.getsize(path)
+
+
+def benchmark_icosphere_grid(sizes=(5, 10, 20), r=0.8, d=3, subdivisions=4):
+    """
+    Compares bpl.create_icosphere_grid in per-cell and instanced mode.
+
+    Args:
+    - sizes: Grid sizes n to build (n**3 cells each).
+    - r: Radius of each Icosphere.
+    - d: Distance between the centers of adjacent Icospheres.
+    - subdivisions: The subdivision level for each Icosphere.
+
+    Returns:
+    - A list of result dicts with build time, datablock counts and .blend size.
+    """
+    results = []
+    for n in sizes:
+        for instanced in (False, True):
+            reset_blend_data()
+            start = time.perf_counter()
+            bpl.create_icosphere_grid(n, r, d, subdivisions, "SimpleStar", instanced=instanced)
+            evaluate_scene()
+            elapsed = time.perf_counter() - start
+
+            result = {
+                "n": n,
+                "mode": "instanced" if instanced else "per-cell",
+                "seconds": elapsed,
+                "meshes": len(bpy.data.meshes),
+                "materials": len(bpy.data.materials),
+                "blend_bytes": blend_file_size(),
+            }
+            results.append(result)
+            print(f"icosphere grid n={n:<3} {result['mode']:<10} {elapsed:8.3f}s "
+                  f"meshes={result['meshes']:<6} materials={result['materials']:<6} "
+                  f"blend={result['blend_bytes'] / 1e6:.1f} MB")
+    return results
+
+
+def benchmark_animate_fac(counts=(1000, 10000)):
+    """
+    Times bpl.animate_fac_for_materials for a growing number of materials.
+
+    Args:
+    - counts: Numbers of materials to animate.
+
+    Returns:
+    - A list of result dicts with the animation time per material count.
+    """
+    results = []
+    for count in counts:
+        reset_blend_data()
+        materials = [bpl.create_bsdf_emission_material(name="CustomMaterial") for _ in range(count)]
+
+        start = time.perf_counter()
+        bpl.animate_fac_for_materials(materials, start_frame=2, step=1)
+        elapsed = time.perf_counter() - start
+
+        results.append({"materials": count, "seconds": elapsed})
+        print(f"animate fac materials={count:<6} {elapsed:8.3f}s")
+    return results
+
+
+def benchmark_face_capture(sizes=(100, 300, 700)):
+    """
+    Compares swarm.store_selected_faces_data with the vectorized swarm.capture_selected_faces.
+
+    Args:
+    - sizes: Grid sizes; the mesh has size**2 selected faces.
+
+    Returns:
+    - A list of result dicts with the time of both functions.
+    """
+    import swarm
+
+    results = []
+    for size in sizes:
+        reset_blend_data()
+        obj = create_selected_grid_object(size)
+
+        start = time.perf_counter()
+        swarm.store_selected_faces_data(obj)
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        swarm.capture_selected_faces(obj)
+        vectorized_seconds = time.perf_counter() - start
+
+        results.append({"faces": size**2, "loop_seconds": loop_seconds, "vectorized_seconds": vectorized_seconds})
+        print(f"face capture faces={size**2:<7} loop={loop_seconds:8.3f}s vectorized={vectorized_seconds:8.3f}s "
+              f"speedup={loop_seconds / vectorized_seconds:6.1f}x")
+    return results
+
+
+def benchmark_drone_distribution(counts=(1000, 5000)):
+    """
+    Compares swarm.distribute_and_animate_objects with copied and with linked drone meshes.
+
+    Args:
+    - counts: Numbers of drones to distribute.
+
+    Returns:
+    - A list of result dicts with build time and estimated mesh memory per 1k drones.
+    """
+    import swarm
+
+    results = []
+    for count in counts:
+        for linked in (False, True):
+            reset_blend_data()
+            curves = swarm.create_bezier_curves_between_face_pairs(
+                [((Vector((i, 0, 0)), Vector((0, 0, 1))), (Vector((i, 10, 0)), Vector((0, 0, 1))))
+                 for i in range(count)])
+            drone_mesh = bpy.data.meshes.new("Drone")
+            bmesh_ico_sphere(drone_mesh, subdivisions=3, radius=0.1)
+            drone = bpy.data.objects.new("Drone", drone_mesh)
+            bpy.context.collection.objects.link(drone)
+
+            start = time.perf_counter()
+            swarm.distribute_and_animate_objects(drone, curves, 1, 100, linked=linked)
+            evaluate_scene()
+            elapsed = time.perf_counter() - start
+            mesh_bytes = sum(bpl.estimate_datablock_bytes(mesh) for mesh in bpy.data.meshes)
+
+            per_thousand = 1000 / count
+            result = {
+                "drones": count,
+                "mode": "linked" if linked else "copied",
+                "seconds_per_1k": elapsed * per_thousand,
+                "mesh_mb_per_1k": mesh_bytes * per_thousand / 1e6,
+                "meshes": len(bpy.data.meshes),
+            }
+            results.append(result)
+            print(f"drones={count:<6} {result['mode']:<7} {result['seconds_per_1k']:7.3f}s/1k "
+                  f"meshes={result['meshes']:<6} mesh memory={result['mesh_mb_per_1k']:7.2f} MB/1k")
+    return results
+
+
+def benchmark_spiral_sampling(configurations=((5, 10.0), (100, 10.0), (10000, 1.0)), tolerance=0.001):
+    """
+    Compares spiral.create_spiral with one point per degree and with adaptive sampling.
+
+    Args:
+    - configurations: (turns, diameter growth percent) pairs; the initial diameter is 1.
+    - tolerance: The chord error tolerance of the adaptive mode.
+
+    Returns:
+    - A list of result dicts with generation time and point count per mode.
+    """
+    import spiral
+
+    results = []
+    for turns, growth in configurations:
+        for mode, mode_tolerance in (("fixed", None), ("adaptive", tolerance)):
+            reset_blend_data()
+            start = time.perf_counter()
+            curve_obj = spiral.create_spiral(1.0, turns, turns, growth, tolerance=mode_tolerance)
+            elapsed = time.perf_counter() - start
+
+            result = {"turns": turns, "growth": growth, "mode": mode, "seconds": elapsed,
+                      "points": len(curve_obj.data.splines[0].points)}
+            results.append(result)
+            print(f"spiral turns={turns:<5} growth={growth:<5} {mode:<9} {elapsed:8.3f}s points={result['points']}")
+    return results
+
+
+def benchmark_fog_render(configurations=((1, 1, None), (20, 20, None), (20, 2, 2)), steps=50, samples=16,
+                         resolution=(320, 180), frames=(1, 250, 500)):
+    """
+    Compares the CPU Cycles render time of animpart.animate_icosphere_in_fog with the fixed
+    fog cube and with adaptive fog domains.
+
+    Args:
+    - configurations: (walker count, fog clusters, start groups) triples to render; with
+      start groups None the walkers start spread over the whole fog cube, otherwise
+      they start clustered (see animpart.animate_icosphere_in_fog).
+    - steps: The number of walk steps.
+    - samples: Cycles samples per pixel.
+    - resolution: Render resolution (x, y).
+    - frames: The frames rendered per scene; the mean time per frame is reported.
+
+    Returns:
+    - A list of result dicts with the mean render seconds per frame and the fog volume.
+    """
+    import animpart
+
+    results = []
+    for count, clusters, groups in configurations:
+        for adaptive in (False, True):
+            reset_blend_data()
+            animpart.animate_icosphere_in_fog(steps=steps, size=0.1, intensity=10.0, count=count, seed=0,
+                                              adaptive_fog=adaptive, fog_clusters=clusters, start_groups=groups)
+            evaluate_scene()
+            fog_volume = sum(obj.dimensions.x * obj.dimensions.y * obj.dimensions.z
+                             for obj in bpy.data.objects if obj.name.startswith("FogCube"))
+
+            scene = bpy.context.scene
+            bpl.add_camera(12, -12, 8)
+            scene.camera = bpy.context.object
+            scene.render.engine = 'CYCLES'
+            scene.cycles.device = 'CPU'
+            scene.cycles.samples = samples
+            scene.render.resolution_x, scene.render.resolution_y = resolution
+            scene.render.resolution_percentage = 100
+
+            seconds = []
+            for frame in frames:
+                scene.frame_set(frame)
+                start = time.perf_counter()
+                bpy.ops.render.render()
+                seconds.append(time.perf_counter() - start)
+
+            result = {
+                "walkers": count,
+                "start_groups": groups,
+                "mode": "adaptive" if adaptive else "fixed",
+                "fog_domains": sum(obj.name.startswith("FogCube") for obj in bpy.data.objects),
+                "fog_volume": fog_volume,
+                "seconds_per_frame": sum(seconds) / len(seconds),
+            }
+            results.append(result)
+            print(f"fog render walkers={count:<5} groups={groups!s:<5} {result['mode']:<9} domains={result['fog_domains']:<4} "
+                  f"volume={fog_volume:8.1f} {result['seconds_per_frame']:8.3f}s/frame")
+    return results
+
+
+def frame_set_matrices(objects, frames):
+    """
+    Steps the scene through the frames and returns the (O, F, 4, 4) world matrices of the objects.
+    """
+    scene = bpy.context.scene
+    matrices = np.empty((len(objects), len(frames), 4, 4))
+    for index, frame in enumerate(frames):
+        scene.frame_set(int(frame))
+        for position, obj in enumerate(objects):
+            matrices[position, index] = np.array(obj.matrix_world)
+    return matrices
+
+
+def check_bake_accuracy(frame_end=100, location_tolerance=1e-3, rotation_tolerance=0.02, lens_tolerance=1e-3):
+    """
+    Checks the analytic bakes against stepping the scene with frame_set:
+    bake.bake_path_constraints on linked drones that share one action slot but follow
+    different curves and on an empty following an off-centre cyclic Bezier circle, and
+    camrig.bake_camera_focal_length with an elliptical camera path around an off-centre target.
+
+    Args:
+    - frame_end: The last frame; the checks run from frame 1.
+    - location_tolerance, rotation_tolerance, lens_tolerance: The largest errors allowed,
+      in scene units, matrix entries and as a fraction of the focal length.
+
+    Returns:
+    - A list of result dicts with the largest error per check.
+
+    Raises:
+    - AssertionError: If a bake is farther from frame_set than the tolerances.
+    """
+    import bake
+    import camrig
+    import swarm
+
+    frames = bake.bake_frames(1, frame_end)
+    results = []
+
+    def check_baked(name, objects):
+        expected = frame_set_matrices(objects, frames)
+        bake.bake_path_constraints(objects, 1, frame_end)
+        baked = frame_set_matrices(objects, frames)
+        result = {"check": name,
+                  "location_error": np.abs(baked[..., :3, 3] - expected[..., :3, 3]).max(),
+                  "rotation_error": np.abs(baked[..., :3, :3] - expected[..., :3, :3]).max()}
+        results.append(result)
+        print(f"bake accuracy {name:<16} location={result['location_error']:.2e} "
+              f"rotation={result['rotation_error']:.2e}")
+        assert result["location_error"] <= location_tolerance, f"{name}: location error {result['location_error']}"
+        assert result["rotation_error"] <= rotation_tolerance, f"{name}: rotation error {result['rotation_error']}"
+
+    reset_blend_data()
+    scene = bpy.context.scene
+    scene.frame_start, scene.frame_end = 1, frame_end
+    curves = swarm.create_bezier_curves_between_face_pairs(
+        [((Vector((0, 0, 0)), Vector((0, 0, 1))), (Vector((0, 10, 0)), Vector((0, 0, 1)))),
+         ((Vector((5, 0, 0)), Vector((1, 0, 0))), (Vector((-5, 8, 3)), Vector((0, 1, 0))))])
+    bpy.ops.mesh.primitive_cube_add(size=0.1)
+    drones = swarm.distribute_and_animate_objects(bpy.context.object, curves, 1, frame_end, linked=True)
+    for curve in curves:
+        # Curves written through the data API only get the path Follow Path needs once they are re-evaluated
+        curve.data.update_tag()
+    check_baked("linked drones", drones)
+
+    reset_blend_data()
+    scene = bpy.context.scene
+    scene.frame_start, scene.frame_end = 1, frame_end
+    bpy.ops.curve.primitive_bezier_circle_add(radius=5, location=(3, 2, 1))
+    circle = bpy.context.object
+    follower = bpy.data.objects.new("Follower", None)
+    scene.collection.objects.link(follower)
+    constraint = follower.constraints.new('FOLLOW_PATH')
+    constraint.target = circle
+    constraint.use_fixed_location = True
+    constraint.use_curve_follow = True
+    bpl.set_keyframes(bpl.ensure_fcurve(follower, f'constraints["{constraint.name}"].offset_factor'),
+                      [1, frame_end], [0.0, 1.0], interpolation='LINEAR')
+    check_baked("cyclic path", [follower])
+
+    reset_blend_data()
+    scene = bpy.context.scene
+    scene.frame_start, scene.frame_end = 1, frame_end
+    bpy.ops.curve.primitive_bezier_circle_add(radius=10, location=(2, -3, 1))
+    path = bpy.context.object
+    path.name = "CamPath"
+    path.scale = (1.5, 0.6, 1.0)
+    path.data.path_duration = frame_end
+    bpl.set_keyframes(bpl.ensure_fcurve(path.data, "eval_time"), [1, frame_end], [0, frame_end],
+                      interpolation='LINEAR')
+    bpy.ops.mesh.primitive_cube_add(size=2, location=(4, 1, 0))
+    target = bpy.context.object
+    bpy.ops.object.camera_add()
+    camera = bpy.context.object
+    camrig.setup_camera_rig(camera.name, "CamPath", target.name)
+    camrig.bake_camera_focal_length(camera, target)
+    baked_lens = camera.data.animation_data.action
+    camera.data.animation_data.action = None
+    expected, lens = [], camera.data.lens
+    for frame in frames:
+        scene.frame_set(int(frame))
+        distance = (target.matrix_world.translation - camera.matrix_world.translation).length
+        expected.append(camrig.focal_length_for_distance(camera, target, distance, lens=lens))
+    camera.data.animation_data.action = baked_lens
+    baked = []
+    for frame in frames:
+        scene.frame_set(int(frame))
+        baked.append(camera.data.lens)
+    result = {"check": "camera lens", "lens_error": np.abs(np.array(baked) / np.array(expected) - 1).max()}
+    results.append(result)
+    print(f"bake accuracy {'camera lens':<16} relative lens={result['lens_error']:.2e}")
+    assert result["lens_error"] <= lens_tolerance, f"camera lens: error {result['lens_error']}"
+    return results
+
+
+def check_instanced_activation(n=3, step=2, seed=0):
+    """
+    Checks that the cells of an instanced icosphere grid switch on at the same frames
+    as the materials of a per-cell grid keyed with the same schedule
+    (bpl.schedule_instanced_activation vs bpl.keyframe_materials_fac).
+
+    Args:
+    - n: The grid size (n**3 cells).
+    - step: The step of the activation schedule, see bpl.create_activation_schedule.
+    - seed: Seed of the activation schedule.
+
+    Returns:
+    - A list with one result dict holding the number of frames whose active cells differ.
+
+    Raises:
+    - AssertionError: If any frame differs.
+    """
+    reset_blend_data()
+    scene = bpy.context.scene
+    _, materials = bpl.create_icosphere_grid(n, 0.8, 3, 1, "PerCell")
+    grid_object, _ = bpl.create_icosphere_grid(n, 0.8, 3, 1, "Instanced", instanced=True)
+    indices, frames = bpl.create_activation_schedule(n**3, step, seed=seed, start_frame=2)
+    bpl.keyframe_materials_fac([materials[index] for index in indices], frames)
+    bpl.schedule_instanced_activation(grid_object, indices, frames)
+
+    mix_shaders = [next(node for node in material.node_tree.nodes if node.type == 'MIX_SHADER')
+                   for material in materials]
+    mismatches = 0
+    for frame in range(int(frames[-1]) + 2):
+        scene.frame_set(frame)
+        keyed = np.array([mix_shader.inputs['Fac'].default_value for mix_shader in mix_shaders])
+        geometry = grid_object.evaluated_get(bpy.context.evaluated_depsgraph_get()).evaluated_geometry()
+        attribute = geometry.instances_pointcloud().attributes["activation"]
+        instanced = np.empty(len(attribute.data), dtype=np.float32)
+        attribute.data.foreach_get("value", instanced)
+        mismatches += int(not np.array_equal(keyed, instanced))
+
+    result = {"cells": n**3, "activated": len(indices), "frames": int(frames[-1]) + 2, "mismatches": mismatches}
+    print(f"instanced activation cells={result['cells']} activated={result['activated']} "
+          f"frames={result['frames']} mismatches={mismatches}")
+    assert mismatches == 0, f"instanced activation differs from the keyed materials on {mismatches} frames"
+    return [result]
+
+
+def bench_helix(t, radius, height):
+    """
+    A five-turn helix for benchmark_lod.
+    """
+    angle = 2 * np.pi * 5 * t
+    return np.stack((radius * np.cos(angle), radius * np.sin(angle), height * t), axis=-1)
+
+
+def benchmark_lod(counts=(100, 1000), points=1800, camera_distance=200.0, bevel_depth=0.05):
+    """
+    Compares the depsgraph evaluation of bevelled parametric curves without and with
+    levels of detail, seen from a camera beyond their far distance.
+
+    Args:
+    - counts: Numbers of curve objects.
+    - points: The number of points of the "render" level of every curve.
+    - camera_distance: The distance between the camera and the curves.
+    - bevel_depth: The bevel depth of every level, so each curve evaluates to a tube mesh.
+
+    Returns:
+    - A list of result dicts with the evaluation time and the evaluated vertex count.
+    """
+    import parametric
+
+    results = []
+    for count in counts:
+        for lod in (False, True):
+            reset_blend_data()
+            scene = bpy.context.scene
+            bpl.add_camera(camera_distance, 0, 0)
+            scene.camera = bpy.context.object
+            bpy.context.view_layer.update()
+
+            curves = [parametric.create_parametric_curve(f"Helix{index}", bench_helix,
+                                                         {"radius": 1.0, "height": 4.0}, points, lod=lod)
+                      for index in range(count)]
+            for curve_obj in curves:
+                for level in parametric.LOD_FRACTIONS:
+                    curve_obj.get("lod_" + level, curve_obj.data).bevel_depth = bevel_depth
+
+            start = time.perf_counter()
+            evaluate_scene()
+            elapsed = time.perf_counter() - start
+
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            vertices = 0
+            for curve_obj in curves:
+                evaluated = curve_obj.evaluated_get(depsgraph)
+                vertices += len(evaluated.to_mesh().vertices)
+                evaluated.to_mesh_clear()
+
+            result = {"curves": count, "mode": "lod" if lod else "fixed", "seconds": elapsed,
+                      "vertices": vertices}
+            results.append(result)
+            print(f"lod curves={count:<6} {result['mode']:<6} {elapsed:8.3f}s vertices={vertices}")
+    return results
+
+
+def bmesh_ico_sphere(mesh, subdivisions, radius):
+    """
+    Fills a mesh with an icosphere without using operators.
+    """
+    import bmesh
+
+    bm = bmesh.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=subdivisions, radius=radius)
+    bm.to_mesh(mesh)
+    bm.free()
+
+
+# Datablock collections counted after every benchmark case
+COUNTED_DATA_TYPES = (
+    "objects", "meshes", "curves", "materials", "actions",
+    "node_groups", "lights", "cameras", "collections",
+)
+
+# Cases faster than this (in seconds) are never flagged as regressions
+MIN_REGRESSION_SECONDS = 0.01
+
+# Peak RSS increases smaller than this (in MB) are never flagged as regressions
+MIN_REGRESSION_MB = 5.0
+
+
+def datablock_counts():
+    """
+    Returns the number of datablocks in each counted bpy.data collection.
+    """
+    return {data_type: len(getattr(bpy.data, data_type)) for data_type in COUNTED_DATA_TYPES}
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of the process in megabytes. It is a
+    high-water mark over the lifetime of the process, so it only describes a
+    single case when the case runs in its own process (see run_case_isolated).
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def create_selected_grid_object(size, name="BenchGrid"):
+    """
+    Creates a size x size grid mesh object with all faces selected.
+    """
+    import bmesh
+
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=size, y_segments=size, size=size)
+    for face in bm.faces:
+        face.select = True
+    bm.to_mesh(mesh)
+    bm.free()
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+
+# Each case takes a size, builds whatever is not part of the measurement,
+# and returns the callable that is timed.
+
+def case_bpl_main(size):
+    return bpl.main
+
+
+def case_icosphere_grid(size):
+    return lambda: bpl.create_icosphere_grid(size, 0.8, 3, 4, "SimpleStar")
+
+
+def case_icosphere_grid_instanced(size):
+    return lambda: bpl.create_icosphere_grid(size, 0.8, 3, 4, "SimpleStar", instanced=True)
+
+
+def case_spiral(size):
+    import spiral
+    return lambda: spiral.create_spiral(1.0, size, 5.0, 10.0)
+
+
+def case_snail_shell(size):
+    import snailshell
+    return lambda: snailshell.create_snail_shell(size, 0.5, 0.05, 5)
+
+
+def case_randomized_curve(size):
+    import rspline
+    return lambda: rspline.create_randomized_curve(10.0, size, 0.5)
+
+
+def case_randomized_curves(size):
+    import rspline
+    return lambda: rspline.create_randomized_curves(size, 10.0, 20, 0.5, seed=0)
+
+
+def case_icosphere_in_fog(size):
+    import animpart
+    return lambda: animpart.animate_icosphere_in_fog(steps=size, size=0.1, intensity=10.0)
+
+
+def case_icosphere_walkers_in_fog(size):
+    import animpart
+    return lambda: animpart.animate_icosphere_in_fog(steps=50, size=0.1, intensity=10.0, count=size, seed=0)
+
+
+def case_l_shaped_pipe(size):
+    import pipe
+    return lambda: pipe.create_l_shaped_pipe(plane_size=2, bevel_segments=size, curve_depth=0.25, curve_resolution=4)
+
+
+def case_pipe_network(size):
+    import numpy as np
+    import pipe
+    rng = np.random.default_rng(0)
+    # Manhattan-style runs of 6 axis-aligned segments each
+    steps = np.eye(3)[rng.integers(0, 3, (size, 6))] * rng.uniform(1, 3, (size, 6, 1)) * rng.choice([-1, 1], (size, 6, 1))
+    polylines = np.concatenate((np.zeros((size, 1, 3)), np.cumsum(steps, axis=1)), axis=1) + rng.uniform(-50, 50, (size, 1, 3))
+    return lambda: pipe.create_pipe_network(list(polylines), radius=0.1, bend_radius=0.4)
+
+
+def case_bake_camera_focal_length(size):
+    import camrig
+    scene = bpy.context.scene
+    scene.frame_start, scene.frame_end = 1, size
+    bpy.ops.curve.primitive_bezier_circle_add(radius=10)
+    path = bpy.context.object
+    path.name = "CamPath"
+    path.data.path_duration = size
+    bpl.set_keyframes(bpl.ensure_fcurve(path.data, "eval_time"), [1, size], [0, size], interpolation='LINEAR')
+    bpy.ops.mesh.primitive_cube_add(size=2)
+    bpy.ops.object.camera_add()
+    camera = bpy.context.object
+    camrig.setup_camera_rig(camera.name, "CamPath", "Cube")
+    evaluate_scene()
+    return lambda: camrig.bake_camera_focal_length(camera, bpy.data.objects["Cube"])
+
+
+def case_store_selected_faces(size):
+    import swarm
+    obj = create_selected_grid_object(size)
+    return lambda: swarm.store_selected_faces_data(obj)
+
+
+def case_capture_selected_faces(size):
+    import swarm
+    obj = create_selected_grid_object(size)
+    return lambda: swarm.capture_selected_faces(obj)
+
+
+def case_get_captured_faces_hit(size):
+    import swarm
+    obj = create_selected_grid_object(size)
+    swarm.enable_face_capture_tracking()
+    evaluate_scene()
+    swarm.get_captured_faces(obj)
+    return lambda: swarm.get_captured_faces(obj)
+
+
+def case_pair_random_elements(size):
+    import swarm
+    elements = list(range(size))
+    return lambda: swarm.pair_random_elements(elements, size // 2)
+
+
+def case_pair_random_indices(size):
+    import swarm
+    return lambda: swarm.pair_random_indices(size, size // 2, seed=0)
+
+
+def case_bezier_curves_between_face_pairs(size):
+    import swarm
+    obj = create_selected_grid_object(int((2 * size) ** 0.5) + 1)
+    faces = swarm.store_selected_faces_data(obj)
+    pairs = swarm.pair_random_elements(faces, size)
+    return lambda: swarm.create_bezier_curves_between_face_pairs(pairs)
+
+
+def case_bezier_curves_between_face_pairs_single(size):
+    import swarm
+    obj = create_selected_grid_object(int((2 * size) ** 0.5) + 1)
+    faces = swarm.store_selected_faces_data(obj)
+    pairs = swarm.pair_random_elements(faces, size)
+    return lambda: swarm.create_bezier_curves_between_face_pairs(pairs, single_curve=True)
+
+
+def case_bezier_bridges(size):
+    import swarmtools
+    obj = create_selected_grid_object(int(size ** 0.5) + 1)
+    pairs = swarmtools.random_face_pairs(swarmtools.selected_face_indices(obj), size, seed=0)
+    return lambda: swarmtools.create_bezier_bridges(obj, pairs)
+
+
+def create_drone_curves(size):
+    """
+    Creates size curves between random faces of a grid and a small drone cube.
+    """
+    import swarm
+    obj = create_selected_grid_object(int((2 * size) ** 0.5) + 1)
+    faces = swarm.store_selected_faces_data(obj)
+    curves = swarm.create_bezier_curves_between_face_pairs(swarm.pair_random_elements(faces, size))
+    bpy.ops.mesh.primitive_cube_add(size=0.1)
+    return bpy.context.object, curves
+
+
+def case_distribute_and_animate_objects(size):
+    import swarm
+    drone, curves = create_drone_curves(size)
+    return lambda: swarm.distribute_and_animate_objects(drone, curves, 1, 100)
+
+
+def case_distribute_and_animate_objects_linked(size):
+    import swarm
+    drone, curves = create_drone_curves(size)
+    return lambda: swarm.distribute_and_animate_objects(drone, curves, 1, 100, linked=True)
+
+
+def case_bake_path_constraints(size):
+    import bake
+    import swarm
+    drone, curves = create_drone_curves(size)
+    drones = swarm.distribute_and_animate_objects(drone, curves, 1, 100, linked=True)
+    return lambda: bake.bake_path_constraints(drones, 1, 100)
+
+
+# The comparison benchmarks above as cases; their result rows are kept as "details"
+
+def case_compare_icosphere_grid(size):
+    return lambda: benchmark_icosphere_grid((size,))
+
+
+def case_compare_animate_fac(size):
+    return lambda: benchmark_animate_fac((size,))
+
+
+def case_compare_face_capture(size):
+    return lambda: benchmark_face_capture((size,))
+
+
+def case_compare_drone_distribution(size):
+    return lambda: benchmark_drone_distribution((size,))
+
+
+def case_compare_spiral_sampling(size):
+    return lambda: benchmark_spiral_sampling((tuple(size),))
+
+
+def case_compare_fog_render(size):
+    return lambda: benchmark_fog_render((tuple(size),))
+
+
+def case_compare_lod(size):
+    return lambda: benchmark_lod((size,))
+
+
+def case_check_bake_accuracy(size):
+    return lambda: check_bake_accuracy(size)
+
+
+def case_check_instanced_activation(size):
+    return lambda: check_instanced_activation(size)
+
+
+# name: (case function, sizes)
+BENCHMARK_CASES = {
+    "bpl.main": (case_bpl_main, (None,)),
+    "bpl.create_icosphere_grid": (case_icosphere_grid, (2, 3, 4)),
+    "bpl.create_icosphere_grid[instanced]": (case_icosphere_grid_instanced, (5, 10, 20)),
+    "spiral.create_spiral": (case_spiral, (5, 50, 500)),
+    "snailshell.create_snail_shell": (case_snail_shell, (100, 1000, 10000)),
+    "rspline.create_randomized_curve": (case_randomized_curve, (10, 1000, 100000)),
+    "rspline.create_randomized_curves": (case_randomized_curves, (100, 1000, 10000)),
+    "animpart.animate_icosphere_in_fog": (case_icosphere_in_fog, (50, 500, 5000)),
+    "animpart.animate_icosphere_in_fog[walkers]": (case_icosphere_walkers_in_fog, (100, 1000, 5000)),
+    "pipe.create_l_shaped_pipe": (case_l_shaped_pipe, (8, 32, 128)),
+    "pipe.create_pipe_network": (case_pipe_network, (100, 1000, 5000)),
+    "swarm.store_selected_faces_data": (case_store_selected_faces, (10, 100, 300)),
+    "swarm.capture_selected_faces": (case_capture_selected_faces, (10, 100, 300, 700)),
+    "swarm.pair_random_elements": (case_pair_random_elements, (100, 1000, 10000)),
+    "swarm.pair_random_indices": (case_pair_random_indices, (10000, 100000, 1000000)),
+    "swarm.create_bezier_curves_between_face_pairs": (case_bezier_curves_between_face_pairs, (10, 100, 1000)),
+    "swarm.create_bezier_curves_between_face_pairs[single]": (case_bezier_curves_between_face_pairs_single, (10, 100, 1000, 10000)),
+    "swarmtools.create_bezier_bridges": (case_bezier_bridges, (100, 1000, 50000)),
+    "swarm.distribute_and_animate_objects": (case_distribute_and_animate_objects, (10, 100, 1000)),
+    "swarm.distribute_and_animate_objects[linked]": (case_distribute_and_animate_objects_linked, (10, 100, 1000)),
+    "bake.bake_path_constraints": (case_bake_path_constraints, (10, 100, 1000)),
+    "bake.bake_path_constraints[accuracy]": (case_check_bake_accuracy, (100,)),
+    "camrig.bake_camera_focal_length": (case_bake_camera_focal_length, (1000, 10000, 100000)),
+    "bpl.create_icosphere_grid[compare]": (case_compare_icosphere_grid, (5, 10, 20)),
+    "bpl.animate_fac_for_materials[compare]": (case_compare_animate_fac, (1000, 10000)),
+    "bpl.schedule_instanced_activation[accuracy]": (case_check_instanced_activation, (3,)),
+    "swarm.get_captured_faces[hit]": (case_get_captured_faces_hit, (100, 300, 700)),
+    "swarm.capture_selected_faces[compare]": (case_compare_face_capture, (100, 300, 700)),
+    "swarm.distribute_and_animate_objects[compare]": (case_compare_drone_distribution, (1000, 5000)),
+    "spiral.create_spiral[compare]": (case_compare_spiral_sampling, ([5, 10.0], [100, 10.0], [10000, 1.0])),
+    "animpart.animate_icosphere_in_fog[render]": (case_compare_fog_render, ([1, 1, None], [20, 20, None], [20, 2, 2])),
+    "parametric.create_parametric_curve[lod]": (case_compare_lod, (100, 1000)),
+}
+
+
+# Prefix of the line a case subprocess prints its result on
+RESULT_PREFIX = "BENCH_RESULT "
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"{result['case']} size={result['size']}: {result['error']}")
+        return
+    rss = f"{result['peak_rss_mb']:8.1f} MB" if "peak_rss_mb" in result else "       - MB"
+    print(f"{result['case']:<48} size={result['size']!s:<7} {result['seconds']:9.3f}s rss={rss} "
+          f"objects={result['objects']}")
+
+
+def run_case(name, case, size, measure_rss=False):
+    """
+    Runs one benchmark case in a fresh scene and measures it.
+
+    Args:
+    - name: The case name.
+    - case: The case function, see BENCHMARK_CASES.
+    - size: The size passed to the case.
+    - measure_rss: If True, the peak RSS of the process is recorded. Only meaningful
+      when the process runs nothing but this case.
+
+    Returns:
+    - A result dict with wall time, peak RSS and datablock counts, or the error message.
+    """
+    reset_blend_data()
+    result = {"case": name, "size": size}
+    try:
+        run = case(size)
+        start = time.perf_counter()
+        details = run()
+        evaluate_scene()
+        result["seconds"] = time.perf_counter() - start
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+
+    if measure_rss:
+        result["peak_rss_mb"] = peak_rss_mb()
+    result.update(datablock_counts())
+    # Comparison benchmarks return their own result rows
+    if isinstance(details, list) and all(isinstance(row, dict) for row in details):
+        result["details"] = details
+    return result
+
+
+def run_case_isolated(name, size):
+    """
+    Runs one benchmark case in a new Blender process, so its peak RSS is not
+    mixed up with the cases that ran before it.
+
+    Returns:
+    - The result dict of run_case.
+    """
+    arguments = ["--run-case", name, "--size", json.dumps(size)]
+    if bpy.app.binary_path:
+        # Inside Blender, sys.executable is the bundled Python, which cannot import bpy
+        command = [bpy.app.binary_path, "-b", "--factory-startup", "--python", os.path.abspath(__file__),
+                   "--", *arguments]
+    else:
+        command = [sys.executable, os.path.abspath(__file__), *arguments]
+
+    process = subprocess.run(command, capture_output=True, text=True)
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+        # Comparison benchmarks print their own rows
+        if line and not line.startswith(("Info:", "Blender quit")):
+            print(line)
+    output = (process.stderr or process.stdout).strip().splitlines()
+    return {"case": name, "size": size,
+            "error": f"subprocess exited with {process.returncode}: {output[-1] if output else ''}"}
+
+
+def run_benchmarks(patterns=None, quick=False, isolated=True):
+    """
+    Runs every benchmark case over its size sweep.
+
+    Args:
+    - patterns: If given, only cases whose name contains one of these strings are run.
+    - quick: If True, only the smallest size of every case is run.
+    - isolated: If True, every case and size runs in its own subprocess (see run_case_isolated).
+
+    Returns:
+    - A list of result dicts, one per case and size.
+    """
+    results = []
+    for name, (case, sizes) in BENCHMARK_CASES.items():
+        if patterns and not any(pattern in name for pattern in patterns):
+            continue
+        for size in sizes[:1] if quick else sizes:
+            result = run_case_isolated(name, size) if isolated else run_case(name, case, size)
+            print_result(result)
+            results.append(result)
+    return results
+
+
+def write_results(filepath, results):
+    """
+    Writes benchmark results to a .json or .csv file.
+    """
+    if filepath.endswith(".csv"):
+        fields = ["case", "size", "seconds", "peak_rss_mb", *COUNTED_DATA_TYPES, "error"]
+        with open(filepath, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(filepath, "w") as file:
+            json.dump({"blender": bpy.app.version_string, "results": results}, file, indent=2)
+
+
+def read_results(filepath):
+    """
+    Reads benchmark results written by write_results.
+    """
+    if filepath.endswith(".csv"):
+        with open(filepath, newline="") as file:
+            results = list(csv.DictReader(file))
+        for result in results:
+            for field in ("seconds", "peak_rss_mb", *COUNTED_DATA_TYPES):
+                if result.get(field):
+                    result[field] = float(result[field])
+                else:
+                    result.pop(field, None)
+        return results
+
+    with open(filepath) as file:
+        return json.load(file)["results"]
+
+
+def compare_results(results, baseline, tolerance=0.25, patterns=None):
+    """
+    Compares results against a baseline and lists the regressions: cases that got
+    slower, used more peak memory or created more datablocks, cases that failed,
+    and baseline cases that no longer exist.
+
+    Args:
+    - results: The current results.
+    - baseline: The stored baseline results.
+    - tolerance: The allowed relative increase, e.g. 0.25 for 25%.
+    - patterns: The --cases filter of the run; baseline cases outside it are not
+      reported as missing.
+
+    Returns:
+    - A list of (case, size, metric, baseline value, value) tuples for every regression;
+      metric is "seconds", "peak_rss_mb", a datablock type, "error" or "missing".
+    """
+    reference = {(str(item["case"]), str(item["size"])): item for item in baseline}
+    regressions = []
+    for result in results:
+        key = (str(result["case"]), str(result["size"]))
+        if "seconds" not in result or result.get("error"):
+            regressions.append((result["case"], result["size"], "error", None, result.get("error")))
+            continue
+        before = reference.get(key)
+        if before is None:
+            continue
+        for metric, minimum in (("seconds", MIN_REGRESSION_SECONDS), ("peak_rss_mb", MIN_REGRESSION_MB),
+                                *((data_type, 1) for data_type in COUNTED_DATA_TYPES)):
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                # e.g. no peak RSS in --in-process runs
+                continue
+            if new - old >= minimum and new > old * (1 + tolerance):
+                regressions.append((result["case"], result["size"], metric, old, new))
+
+    for item in baseline:
+        name = str(item["case"])
+        if name not in BENCHMARK_CASES and (not patterns or any(pattern in name for pattern in patterns)):
+            regressions.append((name, item["size"], "missing", None, None))
+    return regressions
+
+
+def main():
+    # Blender passes script arguments after '--'
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark the BPL scene generators.")
+    parser.add_argument("--cases", nargs="+", help="only run cases whose name contains one of these strings")
+    parser.add_argument("--quick", action="store_true", help="only run the smallest size of every case")
+    parser.add_argument("--output", help="write the results to a .json or .csv baseline file")
+    parser.add_argument("--compare", help="compare the results against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative increase")
+    parser.add_argument("--in-process", action="store_true", help="run all cases in this process (no peak RSS)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=json.loads, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        # Subprocess of run_case_isolated: run a single case and report it on stdout
+        result = run_case(args.run_case, BENCHMARK_CASES[args.run_case][0], args.size, measure_rss=True)
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+        return
+
+    results = run_benchmarks(args.cases, args.quick, isolated=not args.in_process)
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        regressions = compare_results(results, read_results(args.compare), args.tolerance, args.cases)
+        for case, size, metric, before, after in regressions:
+            if metric == "error":
+                print(f"REGRESSION {case} size={size}: {after}")
+            elif metric == "missing":
+                print(f"REGRESSION {case} size={size}: case no longer exists")
+            else:
+                print(f"REGRESSION {case} size={size}: {metric} {before:.4g} -> {after:.4g}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
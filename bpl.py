@@ -1,15 +1,200 @@
 import bpy
 import random
+import numpy as np
 from mathutils import Vector, Euler
 import bpy
 
-def clear_scene():
+# Datablock collections checked by purge_orphans
+ORPHAN_DATA_TYPES = ("meshes", "materials", "curves", "lights", "cameras", "actions", "node_groups")
+
+# Rough size in bytes of one element of each attribute data type
+ATTRIBUTE_TYPE_BYTES = {
+    'FLOAT': 4, 'INT': 4, 'FLOAT_VECTOR': 12, 'FLOAT_COLOR': 16, 'BYTE_COLOR': 4,
+    'BOOLEAN': 1, 'FLOAT2': 8, 'INT8': 1, 'INT16_2D': 4, 'INT32_2D': 8,
+    'QUATERNION': 16, 'FLOAT4X4': 64,
+}
+
+# Fixed per-datablock overhead used by estimate_datablock_bytes
+DATABLOCK_OVERHEAD_BYTES = 1024
+
+
+def action_fcurves(action):
+    """
+    Returns all F-Curves of an action, for both legacy and slotted (layered) actions.
+    """
+    if getattr(action, "is_action_layered", False):
+        return [fcurve
+                for layer in action.layers
+                for strip in layer.strips
+                for channelbag in strip.channelbags
+                for fcurve in channelbag.fcurves]
+    return list(getattr(action, "fcurves", ()))
+
+
+def estimate_datablock_bytes(datablock):
+    """
+    Roughly estimates the memory used by a datablock from its element counts.
+
+    Args:
+    - datablock: A mesh, curve, action or any other ID.
+
+    Returns:
+    - The estimated size in bytes.
+    """
+    size = DATABLOCK_OVERHEAD_BYTES
+    if isinstance(datablock, bpy.types.Mesh):
+        for attribute in datablock.attributes:
+            size += len(attribute.data) * ATTRIBUTE_TYPE_BYTES.get(attribute.data_type, 4)
+        size += len(datablock.polygons) * 4
+    elif isinstance(datablock, bpy.types.Curve):
+        for spline in datablock.splines:
+            size += len(spline.bezier_points) * 64 + len(spline.points) * 32
+    elif isinstance(datablock, bpy.types.Action):
+        size += sum(len(fcurve.keyframe_points) for fcurve in action_fcurves(datablock)) * 72
+    elif isinstance(datablock, (bpy.types.Material, bpy.types.NodeTree)):
+        node_tree = datablock if isinstance(datablock, bpy.types.NodeTree) else datablock.node_tree
+        if node_tree:
+            size += len(node_tree.nodes) * 1024
+    return size
+
+
+# bpy.data collection of every ID type that purge_orphans can remove
+ORPHAN_ID_TYPES = {
+    'MESH': "meshes", 'MATERIAL': "materials", 'CURVE': "curves", 'LIGHT': "lights",
+    'CAMERA': "cameras", 'ACTION': "actions", 'NODETREE': "node_groups",
+}
+
+
+def purge_orphans(data_types=ORPHAN_DATA_TYPES, candidates=None):
+    """
+    Removes datablocks that are no longer used by anything, without going through operators.
+
+    Removal is repeated until nothing is left to remove, since removing a mesh can orphan its materials.
+
+    Args:
+    - data_types: Names of the bpy.data collections to purge.
+    - candidates: If given, only these datablocks are removed when they have no users
+      (see datablocks_used_by); other orphans in the file are left alone.
+
+    Returns:
+    - A dict with the number of removed datablocks per type and the estimated reclaimed 'bytes'.
+    """
+    report = {data_type: 0 for data_type in data_types}
+    report["bytes"] = 0
+
+    if candidates is not None:
+        candidates = [datablock for datablock in candidates
+                      if ORPHAN_ID_TYPES.get(datablock.id_type) in report]
+
+    while True:
+        orphans = []
+        if candidates is None:
+            for data_type in data_types:
+                unused = [datablock for datablock in getattr(bpy.data, data_type)
+                          if datablock.users == 0 and not datablock.use_fake_user]
+                report[data_type] += len(unused)
+                orphans.extend(unused)
+        else:
+            candidates = [datablock for datablock in candidates if is_datablock_alive(datablock)]
+            for datablock in candidates:
+                if datablock.users == 0 and not datablock.use_fake_user:
+                    report[ORPHAN_ID_TYPES[datablock.id_type]] += 1
+                    orphans.append(datablock)
+
+        if not orphans:
+            return report
+
+        report["bytes"] += sum(estimate_datablock_bytes(datablock) for datablock in orphans)
+        bpy.data.batch_remove(orphans)
+
+
+def datablocks_used_by(objects):
+    """
+    Collects the datablocks objects use directly or through their data: object data,
+    materials, actions, the node groups of material node trees and Geometry Nodes
+    modifiers, and datablocks stored in object ID properties (e.g. the levels of
+    detail of parametric objects).
+
+    Returns:
+    - A list of datablocks, each listed once.
+    """
+    found = {}
+
+    def add(datablock):
+        if datablock is not None and datablock.session_uid not in found:
+            found[datablock.session_uid] = datablock
+            return True
+        return False
+
+    def add_animation(datablock):
+        animation_data = getattr(datablock, "animation_data", None)
+        if animation_data is not None:
+            add(animation_data.action)
+
+    def add_node_tree(node_tree):
+        add_animation(node_tree)
+        for node in node_tree.nodes:
+            group = getattr(node, "node_tree", None)
+            if group is not None and add(group):
+                add_node_tree(group)
+            # Geometry nodes such as Set Material hold materials in their inputs
+            for socket in node.inputs:
+                value = getattr(socket, "default_value", None)
+                if isinstance(value, bpy.types.Material):
+                    add_material(value)
+
+    def add_material(material):
+        if material is not None and add(material):
+            add_animation(material)
+            if material.node_tree is not None:
+                add_node_tree(material.node_tree)
+
+    def add_data(data):
+        if isinstance(data, bpy.types.Material):
+            add_material(data)
+        elif isinstance(data, bpy.types.NodeTree):
+            if add(data):
+                add_node_tree(data)
+        elif data is not None and add(data):
+            add_animation(data)
+            for material in getattr(data, "materials", ()):
+                add_material(material)
+
+    for obj in objects:
+        add_animation(obj)
+        add_data(obj.data)
+        for slot in obj.material_slots:
+            add_material(slot.material)
+        for modifier in obj.modifiers:
+            add_data(getattr(modifier, "node_group", None))
+        for value in obj.values():
+            if isinstance(value, bpy.types.ID) and not isinstance(value, bpy.types.Object):
+                add_data(value)
+    return list(found.values())
+
+
+def clear_scene(purge=False):
     """
     Removes all objects from the current Blender scene.
+
+    Works through the data API, so no valid UI context or selection is needed.
+
+    Args:
+    - purge: If True, also remove the meshes, materials, curves, lights, cameras, actions
+      and node groups that the removed objects left without users (see purge_orphans).
+      Datablocks that were already unused before are kept.
+
+    Returns:
+    - A dict with the number of removed 'objects' and, when purging, the purge_orphans report.
     """
-    bpy.ops.object.select_all(action='DESELECT')
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+    objects = list(bpy.context.scene.objects)
+    released = datablocks_used_by(objects) if purge else None
+    bpy.data.batch_remove(objects)
+
+    report = {"objects": len(objects)}
+    if purge:
+        report.update(purge_orphans(candidates=released))
+    return report
 
 
 def look_at(obj, target_point):
@@ -63,7 +248,59 @@ def add_sun(x, y, z, strength=1.0):
     sun.data.energy = strength
 
 
-def create_bsdf_emission_material(name="BSDF_Emission_Material", color=(1.0, 1.0, 1.0, 1.0), metallic=0.0, roughness=0.5, emission_strength=1.0, default_fac=0.0):
+# Registry of materials created with cached=True, keyed by their shader parameters
+MATERIAL_CACHE = {}
+
+
+def is_datablock_alive(datablock):
+    """
+    Checks whether a datablock reference still points to data that has not been removed.
+    """
+    try:
+        datablock.name
+    except ReferenceError:
+        return False
+    return True
+
+
+def material_cache_key(color, metallic, roughness, emission_strength, default_fac, fac_attribute=None):
+    """
+    Builds the content key of a BSDF/Emission material from its shader parameters.
+    """
+    return (
+        tuple(round(float(c), 6) for c in color),
+        round(float(metallic), 6),
+        round(float(roughness), 6),
+        round(float(emission_strength), 6),
+        round(float(default_fac), 6),
+        fac_attribute,
+    )
+
+
+def purge_material_cache(remove_unused=True):
+    """
+    Evicts cache entries whose material was deleted or is no longer used by anything.
+
+    Args:
+    - remove_unused: If True, materials with no users are also removed from bpy.data.
+
+    Returns:
+    - The number of evicted cache entries.
+    """
+    evicted = 0
+    for key, material in list(MATERIAL_CACHE.items()):
+        if not is_datablock_alive(material):
+            del MATERIAL_CACHE[key]
+            evicted += 1
+        elif material.users == 0:
+            if remove_unused:
+                bpy.data.materials.remove(material)
+            del MATERIAL_CACHE[key]
+            evicted += 1
+    return evicted
+
+
+def create_bsdf_emission_material(name="BSDF_Emission_Material", color=(1.0, 1.0, 1.0, 1.0), metallic=0.0, roughness=0.5, emission_strength=1.0, default_fac=0.0, fac_attribute=None, cached=False):
     """
     Creates a new material with a Principled BSDF and Emission shader mixed together.
 
@@ -74,10 +311,20 @@ def create_bsdf_emission_material(name="BSDF_Emission_Material", color=(1.0, 1.0
     - roughness: The roughness property of the Principled BSDF shader.
     - emission_strength: The strength of the Emission shader.
     - default_fac: The default factor for the Mix Shader node.
+    - fac_attribute: Optional instancer attribute that drives the Mix Shader factor.
+    - cached: If True, return the material already registered for the same parameters
+      instead of creating a new one. Do not use it for materials that are animated or
+      edited individually, since every caller gets the same datablock.
 
     Returns:
-    - The newly created material object.
+    - The newly created (or cached) material object.
     """
+    if cached:
+        key = material_cache_key(color, metallic, roughness, emission_strength, default_fac, fac_attribute)
+        material = MATERIAL_CACHE.get(key)
+        if material is not None and is_datablock_alive(material):
+            return material
+
     # Create a new material
     material = bpy.data.materials.new(name=name)
     material.use_nodes = True
@@ -113,6 +360,12 @@ def create_bsdf_emission_material(name="BSDF_Emission_Material", color=(1.0, 1.0
     links.new(emission.outputs['Emission'], mix_shader.inputs[2])
     links.new(mix_shader.outputs['Shader'], material_output.inputs['Surface'])
 
+    if fac_attribute:
+        use_instancer_attribute_fac(material, fac_attribute)
+
+    if cached:
+        MATERIAL_CACHE[key] = material
+
     return material
 
 
@@ -165,7 +418,7 @@ def create_sphere_with_material(material, radius=1.0, location=(0, 0, 0), subdiv
     return sphere
 
 
-def create_icosphere_grid(n, r, d, subs, name):
+def create_icosphere_grid(n, r, d, subs, name, instanced=False):
     """
     Creates an n x n x n grid of Icospheres with increased subdivisions and applies an existing material named 'SimpleStar' to them.
 
@@ -174,7 +427,15 @@ def create_icosphere_grid(n, r, d, subs, name):
     - r: Radius of each Icosphere.
     - d: Distance between the centers of adjacent Icospheres.
     - subdivisions: The subdivision level for each Icosphere.
+    - instanced: If True, build the grid with create_instanced_icosphere_grid instead
+      of one mesh and one material per cell.
+
+    Returns:
+    - A tuple (spheres, materials), or (grid_object, material) when instanced.
     """
+    if instanced:
+        return create_instanced_icosphere_grid(n, r, d, subs, name)
+
     spheres = []
     materials = []
 
@@ -190,7 +451,7 @@ def create_icosphere_grid(n, r, d, subs, name):
                 y = start_pos + j * d
                 z = start_pos + k * d
 
-                # Example usage:
+                # Every sphere gets its own material, since the Fac of each one is animated separately
                 new_material = create_bsdf_emission_material(
                     name="CustomMaterial",
                     color=(0.9, 0.1, 0.1, 1.0),  # Reddish color
@@ -211,13 +472,393 @@ def create_icosphere_grid(n, r, d, subs, name):
     return spheres, materials
 
 
-def create_list_activated_points(original_list, step):
+def grid_positions(n, d):
+    """
+    Computes the cell centers of an n x n x n grid centered at the origin.
+
+    Args:
+    - n: The number of cells along each axis.
+    - d: Distance between the centers of adjacent cells.
+
+    Returns:
+    - A float32 array of shape (n**3, 3), in the same i, j, k order as create_icosphere_grid.
+    """
+    start_pos = -(n - 1) * d / 2
+    axis = start_pos + np.arange(n) * d
+    i, j, k = np.meshgrid(axis, axis, axis, indexing='ij')
+    return np.stack((i.ravel(), j.ravel(), k.ravel()), axis=1).astype(np.float32)
+
+
+def create_point_mesh(name, positions, attributes=None):
+    """
+    Creates a mesh with one loose vertex per position, storing per-point float attributes.
+
+    Args:
+    - name: The name of the new mesh.
+    - positions: An (N, 3) array of vertex positions.
+    - attributes: Optional dict mapping attribute names to length-N float arrays.
+
+    Returns:
+    - The newly created mesh.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.ravel())
+
+    for attr_name, values in (attributes or {}).items():
+        attribute = mesh.attributes.new(name=attr_name, type='FLOAT', domain='POINT')
+        attribute.data.foreach_set("value", np.asarray(values, dtype=np.float32))
+
+    mesh.update()
+    return mesh
+
+
+def create_mesh(name, positions, faces):
+    """
+    Creates a mesh from vertex and face arrays in one pass, without operators or bmesh.
+
+    Args:
+    - name: The name of the new mesh.
+    - positions: An (N, 3) array of vertex positions.
+    - faces: An (F, K) array of vertex indices for faces with K corners each, or a list
+      of such arrays with different K (e.g. quads and triangles).
+
+    Returns:
+    - The newly created mesh.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    if isinstance(faces, np.ndarray):
+        faces = [faces]
+    faces = [np.asarray(group, dtype=np.int32) for group in faces if len(group)]
+    corner_verts = np.concatenate([group.ravel() for group in faces]) if faces else np.zeros(0, dtype=np.int32)
+    sizes = np.concatenate([np.full(len(group), group.shape[1], dtype=np.int32) for group in faces]) \
+        if faces else np.zeros(0, dtype=np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.loops.add(len(corner_verts))
+    mesh.polygons.add(len(sizes))
+
+    # The generic attributes are much faster to fill than vertices and loops (Blender 4.0+)
+    attributes = mesh.attributes
+    if "position" in attributes and ".corner_vert" in attributes:
+        attributes["position"].data.foreach_set("vector", positions.ravel())
+        attributes[".corner_vert"].data.foreach_set("value", corner_verts)
+    else:
+        mesh.vertices.foreach_set("co", positions.ravel())
+        mesh.loops.foreach_set("vertex_index", corner_verts)
+    # Face sizes follow from consecutive loop starts
+    mesh.polygons.foreach_set("loop_start", np.cumsum(sizes) - sizes)
+
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def create_bezier_curve(name, co, handle_left, handle_right):
+    """
+    Creates a 3D curve with one Bezier spline per row of the point arrays.
+
+    Splines are added one by one (the curve API has no bulk spline creation), but
+    their points and handles are written with one foreach_set per spline and array.
+
+    Args:
+    - name: The name of the new curve.
+    - co, handle_left, handle_right: (S, P, 3) arrays with the P control points and
+      handles of each of the S splines.
+
+    Returns:
+    - The newly created curve.
+    """
+    co = np.asarray(co, dtype=np.float32)
+    handle_left = np.asarray(handle_left, dtype=np.float32)
+    handle_right = np.asarray(handle_right, dtype=np.float32)
+    spline_count, point_count = co.shape[:2]
+
+    curve_data = bpy.data.curves.new(name=name, type='CURVE')
+    curve_data.dimensions = '3D'
+    for index in range(spline_count):
+        # New Bezier points have 'FREE' handles
+        points = curve_data.splines.new('BEZIER').bezier_points
+        points.add(point_count - 1)
+        points.foreach_set("co", co[index].ravel())
+        points.foreach_set("handle_left", handle_left[index].ravel())
+        points.foreach_set("handle_right", handle_right[index].ravel())
+    return curve_data
+
+
+def create_poly_curve(name, co, spline_type='POLY', order=4):
+    """
+    Creates a 3D curve with one POLY (or NURBS) spline per row of the point array.
+
+    Args:
+    - name: The name of the new curve.
+    - co: An (S, P, 3) array with the P points of each of the S splines.
+    - spline_type: 'POLY', or 'NURBS' to use the points as control points of
+      end-point interpolating NURBS splines.
+    - order: The NURBS order, capped at the number of points.
+
+    Returns:
+    - The newly created curve.
+    """
+    co = np.asarray(co, dtype=np.float32)
+    spline_count, point_count = co.shape[:2]
+
+    # POLY and NURBS points are (x, y, z, w) with w = 1
+    homogeneous = np.ones((spline_count, point_count, 4), dtype=np.float32)
+    homogeneous[..., :3] = co
+
+    curve_data = bpy.data.curves.new(name=name, type='CURVE')
+    curve_data.dimensions = '3D'
+    for index in range(spline_count):
+        spline = curve_data.splines.new(spline_type)
+        spline.points.add(point_count - 1)
+        spline.points.foreach_set("co", homogeneous[index].ravel())
+        if spline_type == 'NURBS':
+            spline.order_u = min(order, point_count)
+            spline.use_endpoint_u = True
+    return curve_data
+
+
+def use_instancer_attribute_fac(material, attribute_name="activation"):
+    """
+    Drives the Mix Shader 'Fac' of the material from an attribute of its instancer,
+    so every instance can carry its own value while sharing the material.
+
+    Args:
+    - material: A material created by create_bsdf_emission_material.
+    - attribute_name: The instance attribute to read.
+    """
+    nodes = material.node_tree.nodes
+    mix_shader = next((node for node in nodes if node.type == 'MIX_SHADER'), None)
+    if not mix_shader:
+        print(f"No Mix Shader found in material '{material.name}'.")
+        return
+
+    attribute = nodes.new(type='ShaderNodeAttribute')
+    attribute.location = (-200, 300)
+    attribute.attribute_type = 'INSTANCER'
+    attribute.attribute_name = attribute_name
+    material.node_tree.links.new(attribute.outputs['Fac'], mix_shader.inputs['Fac'])
+
+
+def create_icosphere_instancer_node_group(name, r, subs, material):
+    """
+    Creates a Geometry Nodes group that instances a single icosphere on every point
+    of the input geometry and assigns the given material to it.
+
+    The 'activation' of every point is 1.0 from the scene frame stored in its
+    'activation_frame' attribute on, and 0.0 before it, so the instances switch on
+    during playback without any keyframes (see schedule_instanced_activation).
+
+    Args:
+    - name: The name of the node group.
+    - r: Radius of the instanced Icosphere.
+    - subs: The subdivision level of the instanced Icosphere.
+    - material: The material applied to the Icosphere.
+
+    Returns:
+    - The newly created node group.
+    """
+    tree = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    tree.interface.new_socket(name="Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+    tree.interface.new_socket(name="Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = tree.nodes
+    links = tree.links
+
+    group_input = nodes.new(type='NodeGroupInput')
+    group_input.location = (-400, 0)
+
+    ico_sphere = nodes.new(type='GeometryNodeMeshIcoSphere')
+    ico_sphere.location = (-400, -200)
+    ico_sphere.inputs['Radius'].default_value = r
+    ico_sphere.inputs['Subdivisions'].default_value = subs
+
+    set_material = nodes.new(type='GeometryNodeSetMaterial')
+    set_material.location = (-200, -200)
+    set_material.inputs['Material'].default_value = material
+
+    # activation = frame >= activation_frame, evaluated on every frame change
+    scene_time = nodes.new(type='GeometryNodeInputSceneTime')
+    scene_time.location = (-600, 200)
+
+    activation_frame = nodes.new(type='GeometryNodeInputNamedAttribute')
+    activation_frame.location = (-600, 100)
+    activation_frame.data_type = 'FLOAT'
+    activation_frame.inputs['Name'].default_value = "activation_frame"
+
+    compare = nodes.new(type='FunctionNodeCompare')
+    compare.location = (-400, 200)
+    compare.data_type = 'FLOAT'
+    compare.operation = 'GREATER_EQUAL'
+
+    store_activation = nodes.new(type='GeometryNodeStoreNamedAttribute')
+    store_activation.location = (-200, 100)
+    store_activation.data_type = 'FLOAT'
+    store_activation.domain = 'POINT'
+    store_activation.inputs['Name'].default_value = "activation"
+
+    # Point attributes (e.g. 'activation') are propagated to the instances
+    instance_on_points = nodes.new(type='GeometryNodeInstanceOnPoints')
+    instance_on_points.location = (0, 0)
+
+    group_output = nodes.new(type='NodeGroupOutput')
+    group_output.location = (200, 0)
+
+    links.new(scene_time.outputs['Frame'], compare.inputs['A'])
+    links.new(activation_frame.outputs['Attribute'], compare.inputs['B'])
+    links.new(group_input.outputs[0], store_activation.inputs['Geometry'])
+    links.new(compare.outputs['Result'], store_activation.inputs['Value'])
+    links.new(ico_sphere.outputs['Mesh'], set_material.inputs['Geometry'])
+    links.new(store_activation.outputs['Geometry'], instance_on_points.inputs['Points'])
+    links.new(set_material.outputs['Geometry'], instance_on_points.inputs['Instance'])
+    links.new(instance_on_points.outputs['Instances'], group_output.inputs[0])
+
+    return tree
+
+
+def create_instanced_icosphere_grid(n, r, d, subs, name):
+    """
+    Creates an n x n x n grid of Icospheres as instances of one shared Icosphere and one material.
+
+    Every grid cell is a vertex of a single point mesh. The per-cell 'activation' is
+    computed from the scene frame and the cell's 'activation_frame' attribute (see
+    create_icosphere_instancer_node_group), passed on to the instances and drives the
+    Mix Shader 'Fac' of the shared material, so build time and file size grow with the
+    number of points instead of the number of meshes. No cell is activated until
+    schedule_instanced_activation gives it a frame.
+
+    Args:
+    - n: The number of Icospheres along each axis.
+    - r: Radius of each Icosphere.
+    - d: Distance between the centers of adjacent Icospheres.
+    - subs: The subdivision level of the Icosphere.
+    - name: The name of the grid object.
+
+    Returns:
+    - A tuple (grid_object, material).
+    """
+    material = create_bsdf_emission_material(
+        name="CustomMaterial",
+        color=(0.9, 0.1, 0.1, 1.0),  # Reddish color
+        metallic=0.3,
+        roughness=0.15,
+        emission_strength=9.9,
+        default_fac=0.0,
+        fac_attribute="activation",
+        cached=True
+    )
+
+    positions = grid_positions(n, d)
+    mesh = create_point_mesh(name, positions, {"activation_frame": np.full(len(positions), np.inf)})
+
+    grid_object = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(grid_object)
+
+    modifier = grid_object.modifiers.new(name="IcosphereInstances", type='NODES')
+    modifier.node_group = create_icosphere_instancer_node_group(name + "Instancer", r, subs, material)
+
+    return grid_object, material
+
+
+def schedule_instanced_activation(grid_object, indices, frames):
+    """
+    Sets the frame from which each listed cell of an instanced grid is activated, as
+    keyframe_materials_fac does for the materials of a per-cell grid. A cell listed
+    several times is activated at its earliest frame; unlisted cells keep theirs.
+
+    Args:
+    - grid_object: A grid object created by create_instanced_icosphere_grid.
+    - indices: The indices of the activated cells, e.g. from create_activation_schedule.
+    - frames: The activation frame of each index.
+    """
+    attribute = grid_object.data.attributes["activation_frame"]
+    activation_frames = np.empty(len(attribute.data), dtype=np.float32)
+    attribute.data.foreach_get("value", activation_frames)
+    np.minimum.at(activation_frames, np.asarray(indices, dtype=np.int64), np.asarray(frames, dtype=np.float32))
+    attribute.data.foreach_set("value", activation_frames)
+    grid_object.data.update()
+
+
+def create_activation_schedule(count, step, seed=None, start_frame=0, frame_step=1):
+    """
+    Computes which points of a list get activated, and when.
+
+    Starting at index 0, every next activated index is reached by moving 1, step or step**2
+    positions forward, chosen at random, until the end of the list is passed. The walk is
+    drawn in vectorized chunks, so lists of millions of points take milliseconds.
+
+    Args:
+    - count: The number of points in the list.
+    - step: The base step value used to determine the skip count.
+    - seed: Seed of the random generator; the same seed gives the same schedule.
+    - start_frame: The frame of the first activation.
+    - frame_step: The number of frames between successive activations.
+
+    Returns:
+    - A tuple (indices, frames) of int64 arrays of equal length.
+    """
+    if step < 1:
+        raise ValueError("step must be at least 1")
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    increments = np.array([1, step, step**2], dtype=np.int64)
+    mean_increment = increments.mean()
+
+    chunks = [np.zeros(1, dtype=np.int64)]
+    last = 0
+    while last < count - 1:
+        # Draw enough jumps to most likely reach the end of the list in one go
+        size = int((count - 1 - last) / mean_increment) + 64
+        positions = last + np.cumsum(increments[rng.integers(0, 3, size=size)])
+        in_bounds = positions[positions < count]
+        chunks.append(in_bounds)
+        if len(in_bounds) < size:
+            # The walk went past the end of the list
+            break
+        last = int(in_bounds[-1])
+
+    indices = np.concatenate(chunks)
+    frames = start_frame + np.arange(len(indices), dtype=np.int64) * frame_step
+    return indices, frames
+
+
+def save_activation_schedule(filepath, indices, frames):
+    """
+    Stores an activation schedule in a .npz file.
+
+    Args:
+    - filepath: The file to write.
+    - indices: The activated point indices.
+    - frames: The activation frame of each index.
+    """
+    np.savez(filepath, indices=np.asarray(indices), frames=np.asarray(frames))
+
+
+def load_activation_schedule(filepath):
+    """
+    Loads an activation schedule written by save_activation_schedule.
+
+    Args:
+    - filepath: The .npz file to read.
+
+    Returns:
+    - A tuple (indices, frames).
+    """
+    with np.load(filepath) as data:
+        return data["indices"], data["frames"]
+
+
+def create_list_activated_points(original_list, step, seed=None):
     """
     Processes a list of objects based on specified rules and returns a modified copy.
 
     Args:
     - original_list: The list of objects to process.
     - step: The base step value used to determine the skip count.
+    - seed: Seed of the random generator, see create_activation_schedule.
 
     Returns:
     - A modified copy of the original list based on the processing rules.
@@ -225,46 +866,204 @@ def create_list_activated_points(original_list, step):
     if not original_list:
         return []
 
-    # Initialize the resulting list with the first object
-    result_list = [original_list[0]]
-    i = 0  # Start with the first object
-
-    while i < len(original_list) - 1:
-        rand_choice = random.randint(0, 2)  # Get a random number (0, 1, or 2)
-
-        if rand_choice == 0:
-            # Copy the next object
-            i += 1
-        elif rand_choice == 1:
-            # Skip step-1 objects
-            i += step
-        elif rand_choice == 2:
-            # Skip step^2-1 objects
-            i += step**2
-
-        # Check if the index is within the bounds of the list
-        if i < len(original_list):
-            result_list.append(original_list[i])
+    indices, _ = create_activation_schedule(len(original_list), step, seed=seed)
+    return [original_list[i] for i in indices]
+
+
+def ensure_fcurve(id_data, data_path, index=0):
+    """
+    Returns the F-Curve animating data_path[index] of a datablock, creating the action
+    and the F-Curve when needed. Works with both the legacy and the slotted action API.
+
+    Args:
+    - id_data: The datablock to animate (object, material node tree, camera data, ...).
+    - data_path: The RNA path of the animated property, relative to id_data.
+    - index: The array index of the property.
+
+    Returns:
+    - The F-Curve.
+    """
+    animation_data = id_data.animation_data or id_data.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(name=id_data.name + "Action")
+    action = animation_data.action
+
+    # Blender 4.4+ stores F-Curves per action slot
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        return action.fcurve_ensure_for_datablock(id_data, data_path, index=index)
+
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index)
+    return fcurve
+
+
+def assign_shared_action(datablocks, name):
+    """
+    Assigns one action to several datablocks, so the F-Curves that ensure_fcurve
+    creates for them are stored in a single action, in one slot per datablock,
+    instead of one action per datablock.
+
+    Needs the slotted action API (Blender 4.4+). With the legacy API nothing is
+    assigned, and ensure_fcurve creates one action per datablock as before.
+
+    Args:
+    - datablocks: The datablocks to animate, without an action yet.
+    - name: The name of the action.
+
+    Returns:
+    - The shared action, or None with the legacy API.
+    """
+    action = bpy.data.actions.new(name=name)
+    if not hasattr(action, "fcurve_ensure_for_datablock"):
+        bpy.data.actions.remove(action)
+        return None
+    # The slots are created by ensure_fcurve; creating them up front with
+    # action.slots.new is quadratic in the slot count
+    for datablock in datablocks:
+        animation_data = datablock.animation_data or datablock.animation_data_create()
+        animation_data.action = action
+    return action
+
+
+def share_animation(source, targets):
+    """
+    Makes datablocks play the animation of another one by assigning its action (and,
+    with the slotted action API, its action slot), without copying any F-Curve.
+
+    Args:
+    - source: The animated datablock.
+    - targets: The datablocks to animate the same way.
+    """
+    animation_data = source.animation_data
+    for target in targets:
+        target_data = target.animation_data or target.animation_data_create()
+        target_data.action = animation_data.action
+        if hasattr(target_data, "action_slot"):
+            target_data.action_slot = animation_data.action_slot
+
+
+def unshare_animation(datablocks, name):
+    """
+    Gives the datablocks that play the same action slot (or, with the legacy API, the
+    same action) as another datablock a slot of their own in a new action, so keys
+    written with ensure_fcurve only animate them. The new slots start out empty; the
+    shared F-Curves stay with the other users.
+
+    Args:
+    - datablocks: The datablocks about to get their own keys.
+    - name: The name of the new action.
+
+    Returns:
+    - The list of datablocks that were separated.
+    """
+    shared = []
+    for datablock in datablocks:
+        animation_data = datablock.animation_data
+        if animation_data is None or animation_data.action is None:
+            continue
+        if hasattr(animation_data, "action_slot"):
+            slot = animation_data.action_slot
+            users = len(slot.users()) if slot is not None else 1
         else:
-            # If the index goes beyond the list, stop the loop
-            break
+            users = animation_data.action.users
+        if users > 1:
+            shared.append(datablock)
 
-    return result_list
+    if shared and assign_shared_action(shared, name) is None:
+        # Legacy API: ensure_fcurve creates one action per datablock
+        for datablock in shared:
+            datablock.animation_data.action = None
+    return shared
 
-def animate_fac_for_materials(materials, start_frame, step):
+
+def remove_fcurve(id_data, data_path, index=0):
     """
-    Animate the 'Fac' property of the Mix Shader node in each material. Sets 'Fac' to 0.0 at frame 0,
-    then to 1.0 for each material starting from 'start_frame', incrementing by 'step'. The interpolation
-    type for these keyframes is set to 'CONSTANT' for a step-like transition.
+    Removes the F-Curve animating data_path[index] of a datablock, if there is one.
+    Works with both the legacy and the slotted action API.
+
+    Returns:
+    - True if an F-Curve was removed.
+    """
+    animation_data = id_data.animation_data
+    if animation_data is None or animation_data.action is None:
+        return False
+    action = animation_data.action
+
+    if getattr(action, "is_action_layered", False):
+        containers = [channelbag.fcurves
+                      for layer in action.layers
+                      for strip in layer.strips
+                      for channelbag in strip.channelbags
+                      if channelbag.slot == animation_data.action_slot]
+    else:
+        containers = [action.fcurves]
+
+    for fcurves in containers:
+        fcurve = fcurves.find(data_path, index=index)
+        if fcurve is not None:
+            fcurves.remove(fcurve)
+            return True
+    return False
+
+
+def set_keyframes(fcurve, frames, values, interpolation='BEZIER', merge=False):
+    """
+    Replaces all keyframes of an F-Curve in one pass, without changing the current frame.
+
+    Args:
+    - fcurve: The F-Curve to fill.
+    - frames: A sequence of frame numbers, in increasing order.
+    - values: A sequence of values, one per frame.
+    - interpolation: The interpolation type of every keyframe, e.g. 'CONSTANT' or 'LINEAR'.
+    - merge: If True, the existing keyframes are kept, except on the given frames,
+      as keyframe_insert would do. All keyframes get the given interpolation.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32)
+
+    if merge and len(fcurve.keyframe_points):
+        existing = np.empty(2 * len(fcurve.keyframe_points), dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", existing)
+        keys = dict(zip(existing[0::2].tolist(), existing[1::2].tolist()))
+        keys.update(zip(frames.tolist(), values.tolist()))
+        frames = np.array(sorted(keys), dtype=np.float32)
+        values = np.array([keys[frame] for frame in frames.tolist()], dtype=np.float32)
+    count = len(frames)
+
+    co = np.empty(2 * count, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+
+    interpolation_value = bpy.types.Keyframe.bl_rna.properties['interpolation'].enum_items[interpolation].value
+
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.clear()
+    keyframe_points.add(count)
+    keyframe_points.foreach_set("co", co)
+    keyframe_points.foreach_set("interpolation", np.full(count, interpolation_value, dtype=np.int32))
+    fcurve.update()
+
+
+def keyframe_materials_fac(materials, frames):
+    """
+    Animates the 'Fac' of the Mix Shader node in each material from 0.0 at frame 0
+    to 1.0 at the material's frame, with 'CONSTANT' interpolation.
+
+    The F-Curves are written directly, one pass per material, so the scene frame
+    is never changed. Existing keys of the 'Fac' are kept, and a material listed
+    several times gets the keys of every entry.
 
     Args:
     - materials: A list of Blender material objects.
-    - start_frame: The starting frame for the animation.
-    - step: The step between keyframes for successive materials.
+    - frames: The activation frame of each material.
     """
-    bpy.context.scene.frame_set(0)  # Start at frame 0
+    # Frames per material, in order of appearance
+    material_frames = {}
+    for material, frame in zip(materials, frames):
+        material_frames.setdefault(material, []).append(float(frame))
 
-    for index, material in enumerate(materials):
+    for material, activation_frames in material_frames.items():
         if not material.use_nodes:
             print(f"Material '{material.name}' does not use nodes.")
             continue
@@ -274,26 +1073,33 @@ def animate_fac_for_materials(materials, start_frame, step):
             print(f"No Mix Shader found in material '{material.name}'.")
             continue
 
-        # Set 'Fac' to 0.0 at frame 0 for all materials
-        mix_shader.inputs['Fac'].default_value = 0.0
-        mix_shader.inputs['Fac'].keyframe_insert(data_path="default_value", frame=0)
+        # Every entry keys 0.0 at frame 0 and 1.0 at its frame; a later key on the
+        # same frame wins, as with keyframe_insert
+        keys = {}
+        for frame in activation_frames:
+            keys[0.0] = 0.0
+            keys[frame] = 1.0
+        key_frames = sorted(keys)
 
-        # Find the F-Curve for the 'Fac' property and set interpolation to 'CONSTANT'
-        fcurve = material.node_tree.animation_data.action.fcurves.find('nodes["' + mix_shader.name + '"].inputs[0].default_value')
-        if fcurve:  # Check if the F-Curve exists
-            for kf in fcurve.keyframe_points:
-                kf.interpolation = 'CONSTANT'
+        fcurve = ensure_fcurve(material.node_tree, 'nodes["' + mix_shader.name + '"].inputs[0].default_value')
+        # The keys drive the 'Fac' when the frame is evaluated, so its default_value is
+        # not set: every change runs a node tree update over the whole file
+        set_keyframes(fcurve, key_frames, [keys[f] for f in key_frames], interpolation='CONSTANT', merge=True)
 
-        # Set 'Fac' to 1.0 at the specified frame for each material
-        frame = start_frame + (index * step)
-        bpy.context.scene.frame_set(frame)  # Go to the specified frame
-        mix_shader.inputs['Fac'].default_value = 1.0
-        mix_shader.inputs['Fac'].keyframe_insert(data_path="default_value", frame=frame)
 
-        # Again, set interpolation to 'CONSTANT' for the new keyframe
-        if fcurve:  # Ensure the F-Curve still exists
-            for kf in fcurve.keyframe_points:
-                kf.interpolation = 'CONSTANT'
+def animate_fac_for_materials(materials, start_frame, step):
+    """
+    Animate the 'Fac' property of the Mix Shader node in each material. Sets 'Fac' to 0.0 at frame 0,
+    then to 1.0 for each material starting from 'start_frame', incrementing by 'step'. The interpolation
+    type for these keyframes is set to 'CONSTANT' for a step-like transition.
+
+    Args:
+    - materials: A list of Blender material objects.
+    - start_frame: The starting frame for the animation.
+    - step: The step between keyframes for successive materials.
+    """
+    frames = start_frame + np.arange(len(materials)) * step
+    keyframe_materials_fac(materials, frames)
 
 def main():
     n = 5  # Grid size
@@ -303,7 +1109,7 @@ def main():
     subdivisions = 4  # Subdivision level to increase mesh density
 
     # Call the function to create the grid
-    clear_scene()
+    clear_scene(purge=True)
     add_camera(25, -35, 20)
     add_sun(60, 60, 60, 10)
     add_sun(-30, -80, -30, 10)
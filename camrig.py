@@ -1,6 +1,35 @@
 import bpy
+import numpy as np
 from mathutils import Vector
 
+import bake
+import bpl
+
+def focal_length_for_distance(camera, target_object, distance, scale_factor=0.7, lens=None):
+    """
+    Returns the focal length that makes the target object's largest dimension fill
+    scale_factor of the frame at the given distance(s), see update_camera_focal_length.
+
+    Args:
+    - camera: The camera object.
+    - target_object: The target object the camera focuses on.
+    - distance: A distance or a NumPy array of distances.
+    - scale_factor (float): The share of the frame the target should occupy.
+    - lens (float): The focal length the formula scales; defaults to the camera's current lens.
+    """
+    # Calculate dimensions of the target object
+    dimensions = target_object.dimensions
+    max_dimension = max(dimensions.x, dimensions.y, dimensions.z)
+
+    # Assuming a sensor width of 36mm (default in Blender) and frame aspect ratio
+    sensor_width = camera.data.sensor_width
+    aspect_ratio = bpy.context.scene.render.resolution_x / bpy.context.scene.render.resolution_y
+    frame_dimension = sensor_width if aspect_ratio >= 1 else sensor_width / aspect_ratio
+
+    # Calculate focal length to fit the object within the specified scale factor of the frame
+    lens = camera.data.lens if lens is None else lens
+    return (distance * lens) / (max_dimension / frame_dimension * scale_factor)
+
 def update_camera_focal_length(camera, target_object, scale_factor=0.7):
     """
     Updates the camera's focal length based on the target object's size and distance,
@@ -17,20 +46,47 @@ def update_camera_focal_length(camera, target_object, scale_factor=0.7):
     target_loc = target_object.matrix_world.translation
     distance = (target_loc - camera_loc).length
 
-    # Calculate dimensions of the target object
-    dimensions = target_object.dimensions
-    max_dimension = max(dimensions.x, dimensions.y, dimensions.z)
+    camera.data.lens = focal_length_for_distance(camera, target_object, distance, scale_factor)
 
-    # Assuming a sensor width of 36mm (default in Blender) and frame aspect ratio
-    sensor_width = camera.data.sensor_width
-    aspect_ratio = bpy.context.scene.render.resolution_x / bpy.context.scene.render.resolution_y
-    frame_dimension = sensor_width if aspect_ratio >= 1 else sensor_width / aspect_ratio
+def bake_camera_focal_length(camera, target_object, frame_start=None, frame_end=None, scale_factor=0.7,
+                             frame_step=1, lens=None, tolerance=None):
+    """
+    Bakes update_camera_focal_length over a frame range into one lens F-Curve.
 
-    # Calculate focal length to fit the object within the specified scale factor of the frame
-    focal_length = (distance * camera.data.lens) / (max_dimension / frame_dimension * scale_factor)
-    camera.data.lens = focal_length
+    The camera and target locations of all frames are evaluated at once from their
+    F-Curves and Follow Path constraints (see bake.world_locations), so no frame is
+    ever set. Every frame scales the same base lens, unlike repeated calls of
+    update_camera_focal_length, which would compound.
 
-def setup_camera_rig(camera_name, curve_name, target_object_name, initial_focal_length=50):
+    Args:
+    - camera: The camera object.
+    - target_object: The target object the camera focuses on.
+    - frame_start, frame_end: The frame range (both included); defaults to the scene range.
+    - scale_factor (float): The share of the frame the target should occupy.
+    - frame_step: The distance between keys.
+    - lens (float): The base focal length; defaults to the camera's current lens.
+    - tolerance (float): If given, keys are dropped as long as the linear interpolation
+      stays within this many millimeters (see bake.simplify_keys).
+
+    Returns:
+    - The number of keyframes written.
+    """
+    scene = bpy.context.scene
+    frames = bake.bake_frames(scene.frame_start if frame_start is None else frame_start,
+                              scene.frame_end if frame_end is None else frame_end, frame_step)
+
+    cache = {}
+    offsets = bake.world_locations(target_object, frames, cache) - bake.world_locations(camera, frames, cache)
+    distances = np.linalg.norm(offsets, axis=1)
+    lenses = focal_length_for_distance(camera, target_object, distances, scale_factor, lens)
+
+    keys = slice(None) if tolerance is None else bake.simplify_keys(frames, lenses[:, None], tolerance)
+    fcurve = bpl.ensure_fcurve(camera.data, "lens")
+    bpl.set_keyframes(fcurve, frames[keys], lenses[keys], interpolation='LINEAR')
+    return len(fcurve.keyframe_points)
+
+def setup_camera_rig(camera_name, curve_name, target_object_name, initial_focal_length=50, bake_constraints=False, tolerance=None,
+                     bake_focal_length=False):
     """
     Sets up a camera rig that moves along a Bézier curve focusing on a specified object,
     adjusting the camera's focal length dynamically.
@@ -39,6 +95,11 @@ def setup_camera_rig(camera_name, curve_name, target_object_name, initial_focal_
     - curve_name (str): The name of the Bézier curve object.
     - target_object_name (str): The name of the object to focus on.
     - initial_focal_length (float): The initial focal length of the camera.
+    - bake_constraints (bool): Bake the constraints into keyframes over the scene frame range
+      and remove them (see bake.bake_path_constraints).
+    - tolerance (float): Key reduction tolerance used when baking.
+    - bake_focal_length (bool): Bake the focal length over the scene frame range
+      (see bake_camera_focal_length), starting from initial_focal_length.
     """
     curve = bpy.data.objects.get(curve_name)
     target_object = bpy.data.objects.get(target_object_name)
@@ -61,6 +122,14 @@ def setup_camera_rig(camera_name, curve_name, target_object_name, initial_focal_
     track_constrain = camera.constraints.new(type='TRACK_TO')
     track_constrain.target = target_object
 
+    scene = bpy.context.scene
+    if bake_focal_length:
+        # Evaluated before the constraints are baked and removed
+        bake_camera_focal_length(camera, target_object, lens=initial_focal_length)
+
+    if bake_constraints:
+        bake.bake_path_constraints([camera], scene.frame_start, scene.frame_end, tolerance=tolerance)
+
     print("Camera rig setup complete.")
 
 def main():
@@ -0,0 +1,368 @@
+"""
+Parametric curves with levels of detail.
+
+A curve is described by a vectorized function f(t) that returns the points for an
+array of parameters. sample_curve evaluates it, and write_curve turns the samples
+into POLY, Bezier or NURBS splines. create_lod_object builds one datablock per level
+of detail ("render", "viewport", "far"), stores them on the object and lets
+update_lod_objects pick a level from the camera distance, in the viewport and at
+render time. Built datablocks are cached by a key over the generator parameters,
+so an unchanged curve is never sampled twice.
+
+Example usage:
+    import numpy as np
+    import parametric
+
+    def helix(t, radius, height):
+        angle = 2 * np.pi * 5 * t
+        return np.stack((radius * np.cos(angle), radius * np.sin(angle), height * t), axis=-1)
+
+    parametric.create_parametric_curve("Helix", helix, {"radius": 1.0, "height": 4.0}, 1800, lod=True)
+    parametric.enable_lod_switching()
+"""
+import hashlib
+
+import bpy
+import numpy as np
+from mathutils import Vector
+
+import bpl
+
+# Levels of detail and their resolution relative to the "render" level
+LOD_FRACTIONS = {"render": 1.0, "viewport": 0.25, "far": 0.05}
+
+# Distance from the camera beyond which objects in 'AUTO' mode use the "far" level
+DEFAULT_FAR_DISTANCE = 50.0
+
+# Registry of built datablocks: {key: {level: datablock}}
+LOD_CACHE = {}
+
+# Whether a render job is running, set by the render handlers
+_rendering = False
+
+
+def parametric_key(name, params):
+    """
+    Builds a cache key from a generator name and its parameters.
+
+    NumPy arrays are hashed by content, so large parameter arrays (e.g. origins)
+    are keyed exactly.
+
+    Returns:
+    - A hex digest.
+    """
+    digest = hashlib.sha1(name.encode())
+    for param_name, value in sorted(params.items()):
+        digest.update(param_name.encode())
+        if isinstance(value, np.ndarray):
+            digest.update(str((value.dtype, value.shape)).encode())
+            digest.update(np.ascontiguousarray(value))
+        else:
+            digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def lod_parameters(t, fraction):
+    """
+    Thins out an increasing parameter array for a lower level of detail, keeping both ends.
+
+    Args:
+    - t: The parameters of the full resolution.
+    - fraction: The share of parameters to keep, in (0, 1].
+
+    Returns:
+    - The parameters of the level.
+    """
+    t = np.asarray(t, dtype=float)
+    count = max(2, int(round(len(t) * fraction)))
+    if count >= len(t):
+        return t
+    return t[np.round(np.linspace(0, len(t) - 1, count)).astype(np.int64)]
+
+
+def sample_curve(function, t, params=None):
+    """
+    Evaluates a vectorized curve function.
+
+    Args:
+    - function: f(t, **params) returning a (P, 3) array for P parameters, or an
+      (S, P, 3) array for S splines sharing the parameters.
+    - t: The parameters, or a point count for evenly spaced parameters in [0, 1].
+    - params: Keyword arguments for function.
+
+    Returns:
+    - An (S, P, 3) array of points.
+    """
+    if np.ndim(t) == 0:
+        t = np.linspace(0.0, 1.0, int(t))
+    points = np.asarray(function(np.asarray(t, dtype=float), **(params or {})), dtype=float)
+    return points.reshape(-1, len(t), 3)
+
+
+def bezier_handles(points, t):
+    """
+    Computes Bezier handles that make the splines through the points follow the
+    derivative of the sampled function (cubic Hermite to Bezier conversion).
+
+    Args:
+    - points: An (S, P, 3) array of points.
+    - t: The P parameters of the points.
+
+    Returns:
+    - A tuple (handle_left, handle_right) of (S, P, 3) arrays.
+    """
+    t = np.asarray(t, dtype=float)
+    derivatives = np.gradient(points, t, axis=1)
+    spacing = np.diff(t)
+    before = np.concatenate((spacing[:1], spacing))[None, :, None]
+    after = np.concatenate((spacing, spacing[-1:]))[None, :, None]
+    return points - derivatives * before / 3, points + derivatives * after / 3
+
+
+def write_curve(name, points, t, spline_type='POLY'):
+    """
+    Writes sampled points into a new curve datablock.
+
+    Args:
+    - name: The name of the curve.
+    - points: An (S, P, 3) array of points, see sample_curve.
+    - t: The P parameters of the points (used for Bezier handles).
+    - spline_type: 'POLY', 'BEZIER' or 'NURBS'.
+
+    Returns:
+    - The new curve.
+    """
+    if spline_type == 'BEZIER':
+        handle_left, handle_right = bezier_handles(points, t)
+        return bpl.create_bezier_curve(name, points, handle_left, handle_right)
+    return bpl.create_poly_curve(name, points, spline_type=spline_type)
+
+
+def _collection_for(datablock):
+    return bpy.data.meshes if isinstance(datablock, bpy.types.Mesh) else bpy.data.curves
+
+
+def cached_datablock(key, level):
+    """
+    Returns the datablock built for a key and level in this session, or None if
+    there is none or it was deleted.
+    """
+    datablock = LOD_CACHE.get(key, {}).get(level)
+    if datablock is not None and bpl.is_datablock_alive(datablock):
+        return datablock
+    return None
+
+
+def purge_lod_cache(remove_unused=True):
+    """
+    Evicts cache entries whose datablock was deleted or is no longer used.
+
+    Args:
+    - remove_unused: If True, datablocks without users are also removed from bpy.data.
+
+    Returns:
+    - The number of evicted entries.
+    """
+    evicted = 0
+    for key, levels in list(LOD_CACHE.items()):
+        for level, datablock in list(levels.items()):
+            if not bpl.is_datablock_alive(datablock):
+                del levels[level]
+                evicted += 1
+            elif datablock.users == 0:
+                if remove_unused:
+                    _collection_for(datablock).remove(datablock)
+                del levels[level]
+                evicted += 1
+        if not levels:
+            del LOD_CACHE[key]
+    return evicted
+
+
+def create_lod_object(name, build, key=None, lod=False, far_distance=DEFAULT_FAR_DISTANCE):
+    """
+    Creates an object whose data is built per level of detail.
+
+    Args:
+    - name: The name of the object and of its datablocks.
+    - build: A function build(fraction) that returns a new curve or mesh at the given
+      resolution relative to the "render" level.
+    - key: Optional cache key (see parametric_key). Levels already built for the same
+      key are reused instead of rebuilt.
+    - lod: If True, all levels in LOD_FRACTIONS are built and the object switches between
+      them in 'AUTO' mode (see update_lod_objects). Otherwise only the "render" level is built.
+    - far_distance: The camera distance beyond which the "far" level is used.
+
+    Returns:
+    - The new object, linked to the active collection.
+    """
+    levels = LOD_FRACTIONS if lod else {"render": 1.0}
+    datablocks = {}
+    for level, fraction in levels.items():
+        datablock = cached_datablock(key, level) if key is not None else None
+        if datablock is None:
+            datablock = build(fraction)
+            if key is not None:
+                LOD_CACHE.setdefault(key, {})[level] = datablock
+        datablocks[level] = datablock
+
+    obj = bpy.data.objects.new(name, datablocks["render"])
+    bpy.context.collection.objects.link(obj)
+
+    if lod:
+        for level, datablock in datablocks.items():
+            obj["lod_" + level] = datablock
+        obj["lod_mode"] = 'AUTO'
+        obj["lod_far_distance"] = far_distance
+        set_object_lod(obj, lod_level(obj, bpy.context.scene))
+    return obj
+
+
+def create_parametric_curve(name, function, params, t, spline_type='POLY', lod=False, cached=False,
+                            far_distance=DEFAULT_FAR_DISTANCE, data_name=None):
+    """
+    Samples a vectorized curve function into a new curve object.
+
+    Args:
+    - name: The name of the object and its curves.
+    - function: f(t, **params), see sample_curve.
+    - params: Keyword arguments for function; together with name, t and spline_type
+      they form the cache key.
+    - t: The parameters of the "render" level, or a point count for evenly spaced
+      parameters in [0, 1]. Lower levels keep a share of them, see lod_parameters.
+    - spline_type: 'POLY', 'BEZIER' or 'NURBS'.
+    - lod: If True, "viewport" and "far" levels are built too, see create_lod_object.
+    - cached: If True, curves already built for the same parameters are reused.
+    - far_distance: The camera distance beyond which the "far" level is used.
+    - data_name: The name of the curves, if different from name.
+
+    Returns:
+    - The curve object.
+    """
+    if np.ndim(t) == 0:
+        t = np.linspace(0.0, 1.0, int(t))
+    t = np.asarray(t, dtype=float)
+
+    def build(fraction):
+        level_t = lod_parameters(t, fraction)
+        return write_curve(data_name or name, sample_curve(function, level_t, params), level_t, spline_type)
+
+    key = None
+    if cached:
+        key = parametric_key(f"{function.__module__}.{function.__qualname__}",
+                             {**params, "__name": data_name or name, "__t": t, "__spline_type": spline_type})
+    return create_lod_object(name, build, key=key, lod=lod, far_distance=far_distance)
+
+
+def set_object_lod(obj, level):
+    """
+    Shows the given level of detail on an object created with lod=True.
+    """
+    datablock = obj.get("lod_" + level)
+    if datablock is not None and obj.data != datablock:
+        obj.data = datablock
+
+
+def camera_distance(obj, camera):
+    """
+    Returns the distance from the camera to the nearest point of the object's bounding
+    box, so objects whose splines spread far from their origin are measured by the
+    part closest to the camera. Inside the box the distance is 0.
+    """
+    camera_position = camera.matrix_world.translation
+    # The bounding box is axis aligned in object space, so the camera is clamped to it there
+    local_camera = obj.matrix_world.inverted_safe() @ camera_position
+    corners = np.array(obj.bound_box)
+    nearest = np.clip(np.array(local_camera), corners.min(axis=0), corners.max(axis=0))
+    return (obj.matrix_world @ Vector(nearest) - camera_position).length
+
+
+def lod_level(obj, scene, rendering=False):
+    """
+    Returns the level of detail an object should show.
+
+    Objects in 'AUTO' mode use "far" when their bounding box is farther than their far
+    distance from the scene camera (see camera_distance), otherwise "render" while
+    rendering and "viewport" in the viewport. Any other "lod_mode" value names a fixed level.
+    """
+    mode = obj.get("lod_mode", 'AUTO')
+    if mode != 'AUTO':
+        return mode
+    camera = scene.camera
+    if camera is not None and camera_distance(obj, camera) > obj.get("lod_far_distance", DEFAULT_FAR_DISTANCE):
+        return "far"
+    return "render" if rendering else "viewport"
+
+
+def can_switch_lod(scene):
+    """
+    Checks whether object data may be swapped now. During a render started from the
+    UI, the render thread reads the scene while handlers run, so data is only swapped
+    when the interface is locked (Render > Lock Interface) or Blender runs in background.
+    """
+    return not _rendering or bpy.app.background or scene.render.use_lock_interface
+
+
+@bpy.app.handlers.persistent
+def update_lod_objects(scene, *args):
+    """
+    frame_change_pre handler that shows the right level of detail on every LOD object.
+    Only the objects whose level changed get new data, and nothing is swapped while
+    that is unsafe (see can_switch_lod).
+    """
+    if not can_switch_lod(scene):
+        return
+    for obj in scene.objects:
+        if "lod_mode" in obj:
+            set_object_lod(obj, lod_level(obj, scene, rendering=_rendering))
+
+
+@bpy.app.handlers.persistent
+def _start_lod_render(scene, *args):
+    global _rendering
+    _rendering = True
+    update_lod_objects(scene)
+
+
+@bpy.app.handlers.persistent
+def _end_lod_render(scene, *args):
+    global _rendering
+    _rendering = False
+    update_lod_objects(scene)
+
+
+# (handler list name, handler) pairs added by enable_lod_switching
+LOD_HANDLERS = (
+    ("frame_change_pre", update_lod_objects),
+    ("render_init", _start_lod_render),
+    ("render_complete", _end_lod_render),
+    ("render_cancel", _end_lod_render),
+)
+
+
+def enable_lod_switching(lock_interface=True):
+    """
+    Adds the LOD handlers to bpy.app.handlers, once.
+
+    Args:
+    - lock_interface: If True, Lock Interface is turned on for the current scene, so the
+      levels can also switch during renders started from the UI (see can_switch_lod).
+    """
+    if lock_interface:
+        bpy.context.scene.render.use_lock_interface = True
+    for handler_list, handler in LOD_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_list)
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def disable_lod_switching():
+    """
+    Removes the LOD handlers from bpy.app.handlers.
+    """
+    global _rendering
+    for handler_list, handler in LOD_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_list)
+        if handler in handlers:
+            handlers.remove(handler)
+    _rendering = False
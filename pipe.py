@@ -1,59 +1,382 @@
-# Creating an L-shaped pipe programmatically in Blender
-# involves several steps, including mesh editing,
-# vertex beveling, converting the mesh to a curve,
-# and then adjusting the curve's properties to give it
-# depth and resolution before finally converting it back
-# to a mesh.
-# The following function encapsulates this process:import bpy
+# Pipes and pipe networks built directly as meshes.
+#
+# Every pipe run is a polyline whose corners are rounded with a bend radius.
+# The runs are swept with a shared circular cross-section in NumPy and written
+# into one mesh, so no operators, edit mode or UI context are involved.
+#
+# Runs are independent tubes: where runs meet at a joint (e.g. a T-joint of a
+# graph) their ends simply overlap and are not merged into one surface. The ends
+# are open unless caps are requested.
+import bpy
+import math
+import numpy as np
+
+import bpl
+
+
+def graph_to_polylines(joints, edges):
+    """
+    Splits a graph of pipe joints into polylines. Joints with exactly two edges are
+    passed through (and get a bend), every other joint ends the runs that meet there.
+
+    Args:
+    - joints: A (J, 3) array of joint positions.
+    - edges: An (E, 2) array of joint indices.
+
+    Returns:
+    - A list of (P, 3) point arrays, one per pipe run. Closed loops of pass-through
+      joints end on the joint they start with (see closed_runs).
+    """
+    joints = np.asarray(joints, dtype=float)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    neighbors = [[] for _ in range(len(joints))]
+    for index, (first, second) in enumerate(edges):
+        neighbors[first].append((second, index))
+        neighbors[second].append((first, index))
+
+    used = np.zeros(len(edges), dtype=bool)
+
+    def walk(start, edge_index):
+        chain = [start]
+        joint = start
+        while not used[edge_index]:
+            used[edge_index] = True
+            joint = edges[edge_index, 1] if edges[edge_index, 0] == joint else edges[edge_index, 0]
+            chain.append(joint)
+            if len(neighbors[joint]) != 2:
+                break
+            edge_index = next(index for _, index in neighbors[joint] if index != edge_index)
+        return chain
+
+    chains = []
+    # Runs start at joints that are not pass-through joints
+    for joint, joint_neighbors in enumerate(neighbors):
+        if len(joint_neighbors) != 2:
+            for _, edge_index in joint_neighbors:
+                if not used[edge_index]:
+                    chains.append(walk(joint, edge_index))
+    # Whatever is left forms closed loops of pass-through joints
+    for edge_index in np.flatnonzero(~used):
+        if not used[edge_index]:
+            chains.append(walk(edges[edge_index, 0], edge_index))
+    return [joints[chain] for chain in chains]
+
+
+def split_reversals(points, lengths, tolerance=1e-6):
+    """
+    Splits paths at the corners where they turn back on themselves (180 degree turns).
+    Such a corner has no bend plane and no tangent, so a pipe through it would pinch
+    to zero radius; the two halves become separate runs that share the corner point.
+
+    Args:
+    - points: The (M, 3) points of all paths one after the other.
+    - lengths: The number of points of every path.
+    - tolerance: How close the cosine of the turn has to be to -1 to count as a reversal.
+
+    Returns:
+    - A tuple (points, lengths) in the same layout, with the corner points repeated.
+    """
+    starts = np.cumsum(lengths) - lengths
+    run = np.repeat(np.arange(len(lengths)), lengths)
+    index_in_run = np.arange(len(points)) - starts[run]
+    inner = np.flatnonzero((index_in_run > 0) & (index_in_run < lengths[run] - 1))
+    incoming, outgoing = points[inner] - points[inner - 1], points[inner + 1] - points[inner]
+    norms = np.linalg.norm(incoming, axis=1) * np.linalg.norm(outgoing, axis=1)
+    cos = np.einsum('ij,ij->i', incoming, outgoing) / np.maximum(norms, 1e-12)
+    corners = inner[cos < -1 + tolerance]
+    if not len(corners):
+        return points, lengths
+
+    # Every corner gets a copy that ends its run; the original starts the next one
+    points = np.insert(points, corners, points[corners], axis=0)
+    run_starts = starts + np.searchsorted(corners, starts)
+    piece_starts = np.sort(np.concatenate((run_starts, corners + np.arange(len(corners)) + 1)))
+    return points, np.diff(np.append(piece_starts, len(points)))
+
+
+def closed_runs(points, lengths, tolerance=1e-9):
+    """
+    Returns which paths are closed loops: paths of at least three distinct points
+    whose last point repeats the first, like the loops of graph_to_polylines. A path
+    that turns back on itself where it closes is left open.
+    """
+    starts = np.cumsum(lengths) - lengths
+    closed = lengths >= 4
+    if closed.any():
+        first, last = starts[closed], starts[closed] + lengths[closed] - 1
+        outgoing, incoming = points[first + 1] - points[first], points[last] - points[last - 1]
+        norms = np.linalg.norm(incoming, axis=1) * np.linalg.norm(outgoing, axis=1)
+        cos = np.einsum('ij,ij->i', incoming, outgoing) / np.maximum(norms, 1e-12)
+        closed[closed] = (np.linalg.norm(points[last] - points[first], axis=1) <= tolerance) & (cos > -1 + 1e-6)
+    return closed
+
+
+def fillet_polylines(polylines, bend_radius, bend_segments=8):
+    """
+    Rounds the corners of polylines with circular arcs.
+
+    The tangent length of every bend is limited to half of the shorter adjacent
+    segment, so tight corners get a smaller radius instead of overlapping bends.
+    Polylines that turn back on themselves are split there first (see split_reversals),
+    so the result can have more runs than the input. Closed polylines (see closed_runs)
+    get their seam corner rounded as well and still end where they start.
+
+    A bend_radius of 0 keeps sharp corners; sweep_pipes miters them.
+
+    Args:
+    - polylines: A list of (P, 3) point arrays.
+    - bend_radius: The radius of the bends.
+    - bend_segments: The number of segments per bend.
+
+    Returns:
+    - A tuple (points, lengths): the (M, 3) points of all filleted runs one after the
+      other, and the number of points of every run.
+    """
+    polylines = [np.asarray(polyline, dtype=float).reshape(-1, 3) for polyline in polylines]
+    counts = np.array([len(polyline) for polyline in polylines], dtype=np.int64)
+    points = np.concatenate(polylines) if polylines else np.zeros((0, 3))
+    points, counts = split_reversals(points, counts)
+    # Closed loops get their first two points appended again, so the seam is an inner corner too
+    closed = closed_runs(points, counts)
+    if closed.any():
+        closing = (np.cumsum(counts) - counts)[closed]
+        points = np.insert(points, (np.cumsum(counts) - 1)[closed] + 1, points[closing + 1], axis=0)
+        counts = counts + closed
+    starts = np.cumsum(counts) - counts
+
+    # Corners are the inner points of every polyline
+    corner_counts = np.maximum(counts - 2, 0)
+    corner = np.concatenate([np.arange(start + 1, start + count - 1) for start, count in zip(starts, counts)]) \
+        if corner_counts.sum() else np.zeros(0, dtype=np.int64)
+    previous, current, following = points[corner - 1], points[corner], points[corner + 1]
+    incoming, outgoing = current - previous, following - current
+    incoming_length = np.linalg.norm(incoming, axis=1)
+    outgoing_length = np.linalg.norm(outgoing, axis=1)
+    incoming /= np.maximum(incoming_length, 1e-12)[:, None]
+    outgoing /= np.maximum(outgoing_length, 1e-12)[:, None]
+
+    # Turning angle at every corner and the distance from the corner to the arc ends
+    turn = np.arccos(np.clip(np.einsum('ij,ij->i', incoming, outgoing), -1.0, 1.0))
+    bent = turn > 1e-6
+    tangent_length = np.where(bent, bend_radius * np.tan(turn / 2), 0.0)
+    tangent_length = np.minimum(tangent_length, np.minimum(incoming_length, outgoing_length) / 2)
+    radius = np.where(bent, tangent_length / np.maximum(np.tan(turn / 2), 1e-12), 0.0)
+
+    # Arc points: rotate the arc start around the bend center by fractions of the turn
+    arc_start = current - incoming * tangent_length[:, None]
+    axis = np.cross(incoming, outgoing)
+    axis /= np.maximum(np.linalg.norm(axis, axis=1), 1e-12)[:, None]
+    to_center = np.cross(axis, incoming)
+    center = arc_start + to_center * radius[:, None]
+    fractions = np.linspace(0.0, 1.0, bend_segments + 1)
+    angles = turn[:, None] * fractions[None, :]
+    radial = (arc_start - center)[:, None, :]
+    arcs = (center[:, None, :] + radial * np.cos(angles)[..., None]
+            + np.cross(axis[:, None, :], radial) * np.sin(angles)[..., None])
+    arcs[~bent] = current[~bent, None, :]
+
+    # Runs are laid out as: first point, (bend_segments + 1) points per corner, last point
+    arc_size = bend_segments + 1
+    run_lengths = np.where(counts >= 2, 2 + corner_counts * arc_size, counts)
+    run_starts = np.cumsum(run_lengths) - run_lengths
+    result = np.empty((run_lengths.sum(), 3))
+    result[run_starts] = points[starts]
+    has_end = counts >= 2
+    result[(run_starts + run_lengths - 1)[has_end]] = points[(starts + counts - 1)[has_end]]
+    corner_run = np.repeat(np.arange(len(counts)), corner_counts)
+    corner_in_run = np.arange(len(corner)) - np.repeat(np.cumsum(corner_counts) - corner_counts, corner_counts)
+    arc_rows = (run_starts[corner_run] + 1 + corner_in_run * arc_size)[:, None] + np.arange(arc_size)[None, :]
+    result[arc_rows.ravel()] = arcs.reshape(-1, 3)
+
+    # Loops run from the arc of their second corner around to the one of the seam,
+    # and end where they start
+    run_of_point = np.repeat(np.arange(len(counts)), run_lengths)
+    if closed.any():
+        result[(run_starts + run_lengths - 1)[closed]] = result[(run_starts + 1)[closed]]
+        inside = np.ones(len(result), dtype=bool)
+        inside[run_starts[closed]] = False
+        result, run_of_point = result[inside], run_of_point[inside]
+
+    # Straight corners and arcs that touch each other leave repeated points
+    keep = np.ones(len(result), dtype=bool)
+    keep[1:] = (np.linalg.norm(np.diff(result, axis=0), axis=1) > 1e-9) | (np.diff(run_of_point) != 0)
+    return result[keep], np.bincount(run_of_point[keep], minlength=len(counts))
+
+
+def sweep_pipes(points, lengths, radius, segments=12, caps=False):
+    """
+    Sweeps a circular cross-section along many paths at once.
+
+    Frames are parallel transported along all paths together, one step per point,
+    so the cost of the Python loop depends on the longest path, not on their number.
+    Paths that turn back on themselves are split there (see split_reversals). Paths
+    that end where they start are closed loops (see closed_runs): their last ring is
+    joined to the first one and they get no caps.
+
+    Every ring lies in the plane that bisects the segments meeting at its point and is
+    stretched across the turn, so sharp corners get a mitered joint of full thickness.
+
+    Args:
+    - points: The (M, 3) points of all paths one after the other.
+    - lengths: The number of points of every path.
+    - radius: The pipe radius.
+    - segments: The number of vertices around the pipe.
+    - caps: If True, both ends of every open pipe are closed with an n-gon.
+
+    Returns:
+    - A tuple (positions, faces) for bpl.create_mesh; with caps, faces is a list of
+      the quads and the cap n-gons.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    points, lengths = split_reversals(points, lengths)
+    # The repeated end point of a closed run gets no ring of its own
+    closed = closed_runs(points, lengths)
+    if closed.any():
+        points = np.delete(points, (np.cumsum(lengths) - 1)[closed], axis=0)
+        lengths = lengths - closed
+    valid = lengths >= 2
+    starts = np.cumsum(lengths) - lengths
+    run = np.repeat(np.arange(len(lengths)), lengths)
+    index_in_run = np.arange(len(points)) - starts[run]
+    is_first = index_in_run == 0
+    is_last = index_in_run == lengths[run] - 1
+    point_closed = closed[run]
+
+    # Neighbours along the run; closed runs wrap around, open runs stop at their ends
+    index = np.arange(len(points))
+    following = np.where(is_last, np.where(point_closed, starts[run], index), index + 1)
+    previous = np.where(is_first, np.where(point_closed, starts[run] + lengths[run] - 1, index), index - 1)
+    incoming = points - points[previous]
+    outgoing = points[following] - points
+    incoming /= np.maximum(np.linalg.norm(incoming, axis=1), 1e-12)[:, None]
+    outgoing /= np.maximum(np.linalg.norm(outgoing, axis=1), 1e-12)[:, None]
+    # Tangents bisect the neighbouring segments; at open ends there is only one
+    tangents = incoming + outgoing
+    tangents /= np.maximum(np.linalg.norm(tangents, axis=1), 1e-12)[:, None]
+
+    # Start normals perpendicular to the first tangent of every run
+    first_tangents = tangents[starts[valid]]
+    helper = np.where((np.abs(first_tangents[:, 2]) < 0.9)[:, None], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0])
+    normal = np.cross(np.cross(first_tangents, helper), first_tangents)
+    normal /= np.linalg.norm(normal, axis=1)[:, None]
+
+    # Parallel transport: project the previous normal onto the plane of the next tangent
+    normals = np.zeros_like(points)
+    valid_starts = starts[valid]
+    valid_lengths = lengths[valid]
+    normals[valid_starts] = normal
+    for step in range(1, int(valid_lengths.max(initial=0))):
+        # Only runs that are longer than step continue
+        active = valid_lengths > step
+        valid_starts, valid_lengths, normal = valid_starts[active], valid_lengths[active], normal[active]
+        rows = valid_starts + step
+        tangent = tangents[rows]
+        normal = normal - tangent * np.einsum('ij,ij->i', normal, tangent)[:, None]
+        normal /= np.maximum(np.linalg.norm(normal, axis=1), 1e-12)[:, None]
+        normals[rows] = normal
+    binormals = np.cross(tangents, normals)
+
+    loops = np.flatnonzero(closed & valid)
+    if len(loops):
+        # Transporting once more around a loop does not return to the start normal;
+        # the twist left at the seam is spread over the loop so the rings line up
+        loop_starts, loop_ends = starts[loops], starts[loops] + lengths[loops] - 1
+        tangent = tangents[loop_starts]
+        carried = normals[loop_ends] - tangent * np.einsum('ij,ij->i', normals[loop_ends], tangent)[:, None]
+        twist = np.arctan2(np.einsum('ij,ij->i', np.cross(carried, normals[loop_starts]), tangent),
+                           np.einsum('ij,ij->i', carried, normals[loop_starts]))
+        rows = np.flatnonzero(point_closed & valid[run])
+        lookup = np.zeros(len(lengths))
+        lookup[loops] = twist
+        angle = lookup[run[rows]] * index_in_run[rows] / lengths[run[rows]]
+        normals[rows], binormals[rows] = (normals[rows] * np.cos(angle)[:, None] + binormals[rows] * np.sin(angle)[:, None],
+                                          binormals[rows] * np.cos(angle)[:, None] - normals[rows] * np.sin(angle)[:, None])
+
+    # Miter: stretch the rings across the turn by 1 / cos(turn / 2), so a ring in the
+    # bisecting plane meets both segments at full radius
+    across = outgoing - incoming
+    across_length = np.linalg.norm(across, axis=1)
+    across /= np.maximum(across_length, 1e-12)[:, None]
+    stretch = np.where(across_length > 1e-9, 1 / np.maximum(np.einsum('ij,ij->i', tangents, outgoing), 1e-3) - 1, 0.0)
+    ring_x = normals + (stretch * np.einsum('ij,ij->i', normals, across))[:, None] * across
+    ring_y = binormals + (stretch * np.einsum('ij,ij->i', binormals, across))[:, None] * across
+
+    angles = np.arange(segments) * (2 * math.pi / segments)
+    offsets = (np.cos(angles)[None, :, None] * ring_x[:, None, :]
+               + np.sin(angles)[None, :, None] * ring_y[:, None, :])
+    positions = (points[:, None, :] + radius * offsets).reshape(-1, 3)
+
+    # Quads between every ring and the next ring of the same run
+    ring_rows = np.flatnonzero(~is_last | point_closed)
+    ring = ring_rows[:, None] * segments
+    next_ring = following[ring_rows][:, None] * segments
+    segment = np.arange(segments)[None, :]
+    next_segment = (segment + 1) % segments
+    faces = np.stack((ring + segment, ring + next_segment, next_ring + next_segment, next_ring + segment),
+                     axis=-1).reshape(-1, 4)
+    if not caps:
+        return positions, faces
+
+    # Rings wind counterclockwise around the tangent, so the start caps are reversed to face outward
+    open_runs = valid & ~closed
+    first_rings = starts[open_runs][:, None] * segments
+    last_rings = (starts + lengths - 1)[open_runs][:, None] * segments
+    cap_faces = np.concatenate((first_rings + segment[:, ::-1], last_rings + segment))
+    return positions, [faces, cap_faces]
+
+
+def create_pipe_network(polylines=None, joints=None, edges=None, radius=0.1, bend_radius=0.5, bend_segments=8,
+                        segments=12, caps=False, name="PipeNetwork"):
+    """
+    Creates one mesh with a pipe along every polyline or every run of a joint graph.
+
+    Runs that meet at a joint overlap there; they are not merged into one surface.
+
+    Args:
+    - polylines: A list of (P, 3) point arrays.
+    - joints, edges: Alternatively, a graph of joint positions and joint index pairs,
+      see graph_to_polylines.
+    - radius: The pipe radius.
+    - bend_radius: The radius the corners are rounded with; 0 gives mitered corners.
+    - bend_segments: The number of segments per bend.
+    - segments: The number of vertices around the pipe.
+    - caps: If True, the ends of every open run are closed, see sweep_pipes.
+    - name: The name of the mesh and the object.
+
+    Returns:
+    - The pipe network object.
+    """
+    if polylines is None:
+        polylines = graph_to_polylines(joints, edges)
+    points, lengths = fillet_polylines(polylines, bend_radius, bend_segments)
+    positions, faces = sweep_pipes(points, lengths, radius, segments, caps=caps)
+
+    mesh = bpl.create_mesh(name, positions, faces)
+    pipe = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(pipe)
+    return pipe
+
 
 def create_l_shaped_pipe(plane_size=2, bevel_segments=8, curve_depth=0.5, curve_resolution=4):
     """
-    Creates an L-shaped pipe from a plane by deleting two adjacent edges, beveling a vertex,
-    converting to a curve, and adding depth and resolution to the curve.
+    Creates an L-shaped pipe along two adjacent edges of a square, with the corner
+    rounded over half the edge length.
 
     Parameters:
-    - plane_size: The size of the initial plane.
-    - bevel_segments: Number of segments in the bevel.
-    - curve_depth: The depth of the curve to represent the pipe's thickness.
-    - curve_resolution: The resolution of the curve.
-    """
-    bpy.ops.object.select_all(action='DESELECT')  # Deselect all objects
-
-    # Add a plane and enter edit mode
-    bpy.ops.mesh.primitive_plane_add(size=plane_size, location=(0, 0, 0))
-    plane = bpy.context.object
-    bpy.ops.object.mode_set(mode='EDIT')
-
-    # Delete two adjacent edges to create an L shape
-    bpy.ops.mesh.select_mode(type='EDGE')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.delete(type='EDGE')
-    bpy.ops.mesh.select_all(action='SELECT')
-
-    # Bevel the vertex
-    bpy.ops.mesh.select_mode(type='VERT')
-    bpy.ops.mesh.bevel(offset=plane_size / 2, segments=bevel_segments, vertex_only=True)
-
-    # Return to object mode and convert to curve
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.convert(target='CURVE')
-
-    # Set curve properties
-    curve = bpy.context.object
-    curve.data.dimensions = '3D'
-    curve.data.fill_mode = 'FULL'
-    curve.data.bevel_depth = curve_depth
-    curve.data.bevel_resolution = curve_resolution
-    curve.data.resolution_u = curve_resolution
-
-    # Convert the curve to a mesh and rename to "Pipe"
-    bpy.ops.object.convert(target='MESH')
-    pipe = bpy.context.object
-    pipe.name = "Pipe"
+    - plane_size: The size of the square.
+    - bevel_segments: Number of segments in the bend.
+    - curve_depth: The radius of the pipe.
+    - curve_resolution: The round resolution of the cross-section, as for a curve
+      bevel: the pipe has 4 + 2 * curve_resolution sides.
+    """
+    half = plane_size / 2
+    corners = np.array(((-half, half, 0.0), (half, half, 0.0), (half, -half, 0.0)))
+    # A corner beveled by half the edge length is a quarter circle of radius half
+    return create_pipe_network([corners], radius=curve_depth, bend_radius=half, bend_segments=bevel_segments,
+                               segments=4 + 2 * curve_resolution, name="Pipe")
+
 
-    return pipe
-    
-    
 def main():
     pipe = create_l_shaped_pipe(plane_size=2, bevel_segments=8, curve_depth=0.25, curve_resolution=4)
 
@@ -0,0 +1,297 @@
+"""
+Opt-in profiling of the BPL library functions.
+
+Wraps the public functions of the library modules and counts, per call,
+the bpy.ops operators run, frame changes, depsgraph updates, keyframes
+written and datablocks created. Calls are collected in a tree, so nested
+library calls show up under their caller.
+
+All metrics are running counters, so a wrapped call costs the same no matter
+how large the file is, and the bookkeeping time is left out of the timings.
+Keyframes are counted as they are written by bpl.set_keyframes, which every
+library module uses; keys inserted any other way are not counted.
+
+Example usage:
+    import bpl
+    import profiling
+
+    with profiling.profile(bpl):
+        bpl.main()
+    print(profiling.report_table())
+    profiling.write_report("profile.json")
+"""
+import functools
+import inspect
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+import bpy
+
+import bpl
+
+# Library modules instrumented by enable() when no modules are given
+LIBRARY_MODULES = (
+    "bpl", "swarm", "swarmtools", "studiolights", "hdr", "animpart", "spiral",
+    "snailshell", "rspline", "pipe", "camrig", "mist", "lightprobe", "compositor", "bake", "parametric",
+    "sweep",
+)
+
+# Datablock collections whose size change is counted per call
+COUNTED_DATA_TYPES = (
+    "objects", "meshes", "curves", "materials", "actions",
+    "node_groups", "lights", "cameras", "collections", "images",
+)
+
+METRICS = ("operators", "frame_changes", "depsgraph_updates", "keyframes", "datablocks")
+
+# Global event counters, updated by the operator patch, the app handlers and the keyframe patch
+COUNTERS = {"operators": 0, "frame_changes": 0, "depsgraph_updates": 0, "keyframes": 0}
+
+# Seconds spent in profiling bookkeeping, subtracted from the measured calls
+_overhead = 0.0
+
+# (owner, attribute name, original) for everything replaced by enable()
+_patched = []
+_original_operator_call = None
+_original_set_keyframes = None
+
+
+class CallNode:
+    """
+    Aggregated measurements of one function at one place in the call tree.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.metrics = {metric: 0 for metric in METRICS}
+        self.children = {}
+
+    def child(self, name):
+        if name not in self.children:
+            self.children[name] = CallNode(name)
+        return self.children[name]
+
+    def self_seconds(self):
+        return self.seconds - sum(child.seconds for child in self.children.values())
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "self_seconds": self.self_seconds(),
+            **self.metrics,
+            "children": [child.to_dict() for child in self.children.values()],
+        }
+
+
+root = CallNode("root")
+_stack = [root]
+
+
+def datablock_count():
+    """
+    Returns the total number of datablocks in the counted bpy.data collections.
+    """
+    return sum(len(getattr(bpy.data, data_type)) for data_type in COUNTED_DATA_TYPES)
+
+
+def snapshot():
+    """
+    Returns the current value of every metric.
+    """
+    return {**COUNTERS, "datablocks": datablock_count()}
+
+
+def wrap(function, name):
+    """
+    Returns a version of function that records its time and metrics in the call tree.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        global _overhead
+        enter = time.perf_counter()
+        node = _stack[-1].child(name)
+        _stack.append(node)
+        before = snapshot()
+        start = time.perf_counter()
+        _overhead += start - enter
+        # Bookkeeping of nested calls happens inside this call and is subtracted below
+        nested_overhead = _overhead
+        try:
+            return function(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            node.seconds += end - start - (_overhead - nested_overhead)
+            node.calls += 1
+            after = snapshot()
+            for metric in METRICS:
+                node.metrics[metric] += after[metric] - before[metric]
+            _stack.pop()
+            _overhead += time.perf_counter() - end
+
+    wrapper.__profiled__ = function
+    return wrapper
+
+
+def _counting_operator_call(self, *args, **kwargs):
+    COUNTERS["operators"] += 1
+    return _original_operator_call(self, *args, **kwargs)
+
+
+def _counting_set_keyframes(fcurve, frames, *args, **kwargs):
+    COUNTERS["keyframes"] += len(frames)
+    return _original_set_keyframes(fcurve, frames, *args, **kwargs)
+
+
+@bpy.app.handlers.persistent
+def _count_frame_change(scene, *args):
+    COUNTERS["frame_changes"] += 1
+
+
+@bpy.app.handlers.persistent
+def _count_depsgraph_update(scene, *args):
+    COUNTERS["depsgraph_updates"] += 1
+
+
+# (handler list name, handler) pairs added by enable
+COUNTING_HANDLERS = (
+    ("frame_change_pre", _count_frame_change),
+    ("depsgraph_update_post", _count_depsgraph_update),
+)
+
+
+def _patch(owner, attribute, replacement):
+    _patched.append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, replacement)
+
+
+def _instrument_module(module):
+    for attribute, value in list(vars(module).items()):
+        if attribute.startswith("_"):
+            continue
+        if inspect.isfunction(value) and value.__module__ == module.__name__:
+            if not hasattr(value, "__profiled__"):
+                _patch(module, attribute, wrap(value, f"{module.__name__}.{attribute}"))
+        elif inspect.isclass(value) and value.__module__ == module.__name__:
+            # Registered Blender classes (operators, panels) are left alone
+            if issubclass(value, bpy.types.bpy_struct):
+                continue
+            for method_name, method in list(vars(value).items()):
+                if method_name.startswith("__") or not inspect.isfunction(method):
+                    continue
+                if not hasattr(method, "__profiled__"):
+                    _patch(value, method_name, wrap(method, f"{module.__name__}.{attribute}.{method_name}"))
+
+
+def enable(*modules):
+    """
+    Starts profiling the public functions of the given modules.
+
+    Args:
+    - modules: Modules or module names to instrument. Defaults to every library
+      module in LIBRARY_MODULES that is already imported.
+    """
+    global _original_operator_call, _original_set_keyframes
+
+    # Patched before the modules are instrumented, so the profiled bpl.set_keyframes counts too
+    if _original_set_keyframes is None:
+        _original_set_keyframes = bpl.set_keyframes
+        _patch(bpl, "set_keyframes", functools.wraps(_original_set_keyframes)(_counting_set_keyframes))
+
+    if not modules:
+        modules = [name for name in LIBRARY_MODULES if name in sys.modules]
+    for module in modules:
+        if isinstance(module, str):
+            module = sys.modules[module]
+        _instrument_module(module)
+
+    if _original_operator_call is None:
+        operator_class = type(bpy.ops.object.select_all)
+        _original_operator_call = operator_class.__call__
+        operator_class.__call__ = _counting_operator_call
+        for handler_list, handler in COUNTING_HANDLERS:
+            handlers = getattr(bpy.app.handlers, handler_list)
+            if handler not in handlers:
+                handlers.append(handler)
+
+
+def disable():
+    """
+    Stops profiling and restores every instrumented function. The collected report is kept.
+    """
+    global _original_operator_call, _original_set_keyframes
+
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+    _original_set_keyframes = None
+
+    if _original_operator_call is not None:
+        type(bpy.ops.object.select_all).__call__ = _original_operator_call
+        _original_operator_call = None
+        for handler_list, handler in COUNTING_HANDLERS:
+            handlers = getattr(bpy.app.handlers, handler_list)
+            if handler in handlers:
+                handlers.remove(handler)
+
+
+def reset():
+    """
+    Discards the collected report.
+    """
+    global root
+    root = CallNode("root")
+    _stack[:] = [root]
+
+
+@contextmanager
+def profile(*modules):
+    """
+    Profiles the given modules for the duration of a with-block.
+    """
+    enable(*modules)
+    try:
+        yield root
+    finally:
+        disable()
+
+
+def report():
+    """
+    Returns the call tree as a list of nested dicts.
+    """
+    return [child.to_dict() for child in root.children.values()]
+
+
+def write_report(filepath):
+    """
+    Writes the call tree as JSON.
+    """
+    with open(filepath, "w") as file:
+        json.dump(report(), file, indent=2)
+
+
+def report_table():
+    """
+    Formats the call tree as an indented text table.
+    """
+    header = f"{'function':<56}{'calls':>8}{'total s':>10}{'self s':>10}{'ops':>8}{'frames':>8}{'depsgr':>8}{'keys':>8}{'blocks':>8}"
+    lines = [header, "-" * len(header)]
+
+    def add_rows(node, depth):
+        for child in sorted(node.children.values(), key=lambda n: n.seconds, reverse=True):
+            metrics = child.metrics
+            lines.append(
+                f"{'  ' * depth + child.name:<56}{child.calls:>8}{child.seconds:>10.3f}{child.self_seconds():>10.3f}"
+                f"{metrics['operators']:>8}{metrics['frame_changes']:>8}{metrics['depsgraph_updates']:>8}"
+                f"{metrics['keyframes']:>8}{metrics['datablocks']:>8}"
+            )
+            add_rows(child, depth + 1)
+
+    add_rows(root, 0)
+    return "\n".join(lines)
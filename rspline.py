@@ -1,48 +1,88 @@
 import bpy
-import random
-from mathutils import Vector
-
-def create_randomized_curve(length, num_segments, max_displacement):
-    # Calculate the height increment per segment
-    height_increment = length / num_segments
-    
-    # Initialize the starting point
-    current_point = Vector((0.0, 0.0, 0.0))
-    
-    # Create a new curve data block
-    curve_data = bpy.data.curves.new('RandomCurve', type='CURVE')
-    curve_data.dimensions = '3D'
-    spline = curve_data.splines.new('POLY')
-    spline.points.add(num_segments)  # Add points; one is already there by default
-    
-    # Set the first point at the origin
-    spline.points[0].co = (current_point.x, current_point.y, current_point.z, 1)
-
-    # Generate and set each subsequent point
-    for i in range(1, num_segments + 1):
-        # Random displacement in X and Y
-        displacement_x = random.uniform(-max_displacement, max_displacement)
-        displacement_y = random.uniform(-max_displacement, max_displacement)
-        
-        # Update current point
-        current_point.x += displacement_x
-        current_point.y += displacement_y
-        current_point.z += height_increment
-        
-        # Set the point coordinates (the fourth value, w, must be 1 for POLY type splines)
-        spline.points[i].co = (current_point.x, current_point.y, current_point.z, 1)
-
-    # Create a new object with the curve
-    curve_obj = bpy.data.objects.new('RandomCurveObject', curve_data)
-    bpy.context.collection.objects.link(curve_obj)
+import numpy as np
+
+import parametric
+
+def random_vine_points(count, length, num_segments, max_displacement, seed=None, origins=None):
+    """
+    Generates count random vines at once. Every segment rises by length / num_segments
+    and moves by a uniform random displacement in X and Y.
+
+    Args:
+    - count: The number of vines.
+    - length: The height of every vine.
+    - num_segments: The number of segments per vine.
+    - max_displacement: The largest displacement per segment along X and Y.
+    - seed: Seed of the random generator.
+    - origins: Optional (count, 3) array with the start point of every vine (default the origin).
+
+    Returns:
+    - A (count, num_segments + 1, 3) float array of points.
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.empty((count, num_segments, 3))
+    steps[..., :2] = rng.uniform(-max_displacement, max_displacement, size=(count, num_segments, 2))
+    steps[..., 2] = length / num_segments
+
+    points = np.zeros((count, num_segments + 1, 3))
+    np.cumsum(steps, axis=1, out=points[:, 1:])
+    if origins is not None:
+        points += np.asarray(origins, dtype=float).reshape(-1, 1, 3)
+    return points
+
+def vine_function(t, count, length, num_segments, max_displacement, seed, origins=None):
+    """
+    Returns the vine points at the segment numbers t, for parametric.sample_curve.
+
+    The walks are generated from the seed, so every level of detail picks its points
+    from the same vines.
+
+    Returns:
+    - A (count, len(t), 3) array of points.
+    """
+    points = random_vine_points(count, length, num_segments, max_displacement, seed=seed, origins=origins)
+    return points[:, np.round(t).astype(np.int64)]
+
+def create_randomized_curves(count, length, num_segments, max_displacement, seed=None, origins=None,
+                             name='RandomCurve', spline_type='POLY', lod=False, cached=False):
+    """
+    Creates count random vines as splines of a single curve object.
+
+    Args:
+    - count: The number of vines.
+    - length, num_segments, max_displacement, seed, origins: See random_vine_points.
+    - name: The name of the curve; the object is named name + "Object".
+    - spline_type: 'POLY', 'BEZIER' or 'NURBS'.
+    - lod: If True, viewport and far levels of detail with fewer points per vine are built too.
+    - cached: If True, vines with the same parameters and seed reuse the existing curves.
+
+    Returns:
+    - The curve object.
+    """
+    if seed is None:
+        # Every level of detail must draw the same vines
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+    params = {"count": count, "length": length, "num_segments": num_segments,
+              "max_displacement": max_displacement, "seed": seed,
+              "origins": None if origins is None else np.asarray(origins, dtype=float)}
+    curve_obj = parametric.create_parametric_curve(name + 'Object', vine_function, params,
+                                                   np.arange(num_segments + 1), spline_type=spline_type,
+                                                   lod=lod, cached=cached, data_name=name)
     bpy.context.view_layer.objects.active = curve_obj
     curve_obj.select_set(True)
 
     return curve_obj
 
+def create_randomized_curve(length, num_segments, max_displacement, seed=None):
+    """
+    Creates a single random vine, see create_randomized_curves.
+    """
+    return create_randomized_curves(1, length, num_segments, max_displacement, seed=seed)
+
 # Example usage
-length = 10.0  # Total length of the curve
-num_segments = 10  # Number of segments
-max_displacement = 0.5  # Maximum displacement for each segment
+if __name__ == "__main__":
+    length = 10.0  # Total length of the curve
+    num_segments = 10  # Number of segments
+    max_displacement = 0.5  # Maximum displacement for each segment
 
-create_randomized_curve(length, num_segments, max_displacement)
\ No newline at end of file
+    create_randomized_curve(length, num_segments, max_displacement)
@@ -1,50 +1,175 @@
 import bpy
 import math
+import numpy as np
 
-def create_snail_shell(steps, initial_radius, growth_factor, angle_step):
-    # Create a new curve
-    curve_data = bpy.data.curves.new('SnailShell', type='CURVE')
-    curve_data.dimensions = '3D'
-    spline = curve_data.splines.new('BEZIER')
-    spline.bezier_points.add(steps - 1)
+import bpl
+import parametric
+from sweep import minimum_twist_normals, normalized, start_normal
 
-    # Variables for the spiral calculation
-    radius = initial_radius
-    angle = 0.0
+def snail_shell_radii(t, initial_radius, growth_factor, logarithmic=False):
+    """
+    Returns the spiral radius of a snail shell at the (fractional) steps t.
+    """
+    if logarithmic:
+        return initial_radius * (1 + growth_factor) ** t
+    return initial_radius + growth_factor * t
 
-    # Height increment per step along the z-axis
-    height_increment = 0.1
-    z = 0.0
+def snail_shell_function(t, initial_radius, growth_factor, angle_step, height_increment=0.1, logarithmic=False):
+    """
+    Evaluates the spiral a snail shell is swept along, for parametric.sample_curve.
 
-    # Setting points for the spiral
-    for i, point in enumerate(spline.bezier_points):
-        x = radius * math.cos(angle)
-        y = radius * math.sin(angle)
-        point.co = (x, y, z, 1)
-        point.handle_right_type = 'VECTOR'
-        point.handle_left_type = 'VECTOR'
+    Args:
+    - t: The (fractional) step numbers, from 0 to steps - 1.
+    - initial_radius: The spiral radius at the first step.
+    - growth_factor: The radius added per step, or with logarithmic=True the relative
+      radius growth per step (0.05 grows the radius by 5% per step).
+    - angle_step: The angle between consecutive steps, in degrees.
+    - height_increment: The height added per step.
+    - logarithmic: If True, the spiral is logarithmic instead of linear (Archimedean).
 
-        radius += growth_factor
-        angle += math.radians(angle_step)
-        z += height_increment
+    Returns:
+    - A (len(t), 3) array of points.
+    """
+    radii = snail_shell_radii(t, initial_radius, growth_factor, logarithmic)
+    angles = t * math.radians(angle_step)
+    return np.column_stack((radii * np.cos(angles), radii * np.sin(angles), t * height_increment))
 
-    # Create the curve object
-    curve_obj = bpy.data.objects.new('SnailShell', curve_data)
-    bpy.context.collection.objects.link(curve_obj)
+def snail_shell_tube_limit(t, steps, initial_radius, growth_factor, angle_step, height_increment=0.1,
+                           logarithmic=False):
+    """
+    Returns the largest tube radius at every step for which the tube does not run
+    into the previous or the next turn of the spiral: half the distance to the
+    spiral point one turn away on either side.
 
-    # Convert curve to mesh
-    bpy.context.view_layer.objects.active = curve_obj
-    curve_obj.select_set(True)
-    bpy.ops.object.convert(target='MESH')
+    Args:
+    - t: The step numbers, from 0 to steps - 1.
+    - steps: The number of steps of the shell.
+    - The other arguments are those of snail_shell_function.
 
-    # Apply Solidify modifier
-    solidify = curve_obj.modifiers.new(name='Solidify', type='SOLIDIFY')
-    solidify.thickness = 0.1  # Set the thickness as desired
+    Returns:
+    - An array of radii, inf where the spiral has no neighbouring turn.
+    """
+    params = {"initial_radius": initial_radius, "growth_factor": growth_factor, "angle_step": angle_step,
+              "height_increment": height_increment, "logarithmic": logarithmic}
+    t = np.asarray(t, dtype=float)
+    limit = np.full(len(t), np.inf)
+    if angle_step == 0:
+        return limit
+    steps_per_turn = 360 / abs(angle_step)
+    here = snail_shell_function(t, **params)
+    for shift in (-steps_per_turn, steps_per_turn):
+        neighbour = t + shift
+        inside = (neighbour >= 0) & (neighbour <= steps - 1)
+        gap = np.linalg.norm(snail_shell_function(neighbour[inside], **params) - here[inside], axis=1)
+        limit[inside] = np.minimum(limit[inside], gap / 2)
+    return limit
 
-    # Apply the Solidify modifier
-    bpy.ops.object.modifier_apply(modifier='Solidify')
+def tube_sweep(points, radii, segments, thickness=None):
+    """
+    Sweeps a circular cross-section along a path with parallel transport frames.
 
-    return curve_obj
+    Args:
+    - points: A (P, 3) array of path points.
+    - radii: The outer radius of the cross-section at every point.
+    - segments: The number of vertices of every cross-section.
+    - thickness: If given, an inner wall at radii - thickness is added and both ends are
+      closed with rings, so the tube is a closed solid. Otherwise the tube is open.
+
+    Returns:
+    - A tuple (positions, faces) for bpl.create_mesh: a (V, 3) array and an (F, 4) array
+      of quads. Both are empty for paths with fewer than two points.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=float)
+    path_length = len(points)
+    if path_length < 2:
+        return np.zeros((0, 3)), np.zeros((0, 4), dtype=np.int64)
+
+    tangents = normalized(np.gradient(points, axis=0))
+    normals = minimum_twist_normals(tangents, start_normal(tangents[0]))
+    binormals = np.cross(tangents, normals)
+
+    angles = np.arange(segments) * (2 * math.pi / segments)
+    # Unit offsets of every ring vertex, shape (P, segments, 3)
+    offsets = (np.cos(angles)[None, :, None] * normals[:, None, :]
+               + np.sin(angles)[None, :, None] * binormals[:, None, :])
+
+    walls = [points[:, None, :] + offsets * radii[:, None, None]]
+    if thickness is not None:
+        inner_radii = np.maximum(radii - thickness, 0.0)
+        walls.append(points[:, None, :] + offsets * inner_radii[:, None, None])
+    positions = np.concatenate([wall.reshape(-1, 3) for wall in walls])
+
+    # Quads between consecutive rings: ring i, segment j -> vertex i * segments + j
+    ring = np.arange(path_length - 1)[:, None] * segments
+    segment = np.arange(segments)[None, :]
+    following = (segment + 1) % segments
+    quads = np.stack((ring + segment, ring + following, ring + segments + following, ring + segments + segment),
+                     axis=-1).reshape(-1, 4)
+    faces = [quads]
+
+    if thickness is not None:
+        inner = path_length * segments
+        # The inner wall faces the tube axis, so its corners run the other way
+        faces.append(quads[:, ::-1] + inner)
+        # Rings joining the outer and inner wall at both ends
+        for start, flip in ((0, False), ((path_length - 1) * segments, True)):
+            cap = np.stack((start + segment, start + inner + segment, start + inner + following, start + following),
+                           axis=-1).reshape(-1, 4)
+            faces.append(cap[:, ::-1] if flip else cap)
+    return positions, np.concatenate(faces)
+
+def create_snail_shell(steps, initial_radius, growth_factor, angle_step, thickness=0.1, tube_ratio=0.5,
+                       segments=16, height_increment=0.1, logarithmic=False, lod=False, cached=False):
+    """
+    Creates a snail shell mesh by sweeping a circular tube along a spiral.
+
+    The vertices and faces are computed with NumPy and written straight into the mesh,
+    with the wall thickness built in, so no operator or modifier is used and the
+    function works in background mode.
+
+    Args:
+    - steps: The number of points along the spiral.
+    - initial_radius: The spiral radius at the first point.
+    - growth_factor: The spiral radius growth per step, see snail_shell_function.
+    - angle_step: The angle between consecutive points, in degrees.
+    - thickness: The wall thickness of the tube, or None for a single open surface.
+    - tube_ratio: The tube radius relative to the spiral radius. It is limited to half
+      the distance between neighbouring turns (see snail_shell_tube_limit), so the
+      tube never runs into itself.
+    - segments: The number of vertices around the tube.
+    - height_increment: The height added per step.
+    - logarithmic: If True, the spiral is logarithmic instead of linear.
+    - lod: If True, viewport and far levels of detail are built too (see
+      parametric.create_lod_object); their face count shrinks by the level fraction.
+    - cached: If True, a shell with the same parameters reuses the existing meshes.
+
+    Returns:
+    - The shell mesh object. With fewer than two steps its mesh is empty.
+    """
+    params = {"initial_radius": initial_radius, "growth_factor": growth_factor, "angle_step": angle_step,
+              "height_increment": height_increment, "logarithmic": logarithmic}
+
+    def build(fraction):
+        if steps < 2:
+            # A single point (or none) does not make a tube
+            return bpl.create_mesh('SnailShell', np.zeros((0, 3)), np.zeros((0, 4), dtype=np.int64))
+        # Steps and segments both shrink by the square root, so the face count shrinks by fraction
+        scale = math.sqrt(fraction)
+        t = parametric.lod_parameters(np.arange(steps), scale)
+        points = parametric.sample_curve(snail_shell_function, t, params)[0]
+        radii = np.minimum(snail_shell_radii(t, initial_radius, growth_factor, logarithmic) * tube_ratio,
+                           snail_shell_tube_limit(t, steps, **params))
+        positions, faces = tube_sweep(points, radii, max(3, round(segments * scale)), thickness=thickness)
+        return bpl.create_mesh('SnailShell', positions, faces)
+
+    key = None
+    if cached:
+        key = parametric.parametric_key("snailshell.create_snail_shell",
+                                        {**params, "steps": steps, "thickness": thickness,
+                                         "tube_ratio": tube_ratio, "segments": segments})
+    return parametric.create_lod_object('SnailShell', build, key=key, lod=lod)
 
 # Example usage
-create_snail_shell(100, 0.5, 0.05, 5)
\ No newline at end of file
+if __name__ == "__main__":
+    create_snail_shell(100, 0.5, 0.05, 5)
@@ -1,38 +1,106 @@
 import bpy
 import math
+import numpy as np
 
-def create_spiral(initial_diameter, turns, height, diameter_growth_percent):
+import parametric
+
+# Points per turn of the fixed sampling (one per degree)
+STEPS_PER_TURN = 360
+
+# Sparsest adaptive sampling, in points per turn
+MIN_STEPS_PER_TURN = 8
+
+def spiral_steps_per_turn(radii, tolerance=None):
+    """
+    Returns the number of points for each turn of a spiral.
+
+    Args:
+    - radii: The largest radius of every turn (at its end).
+    - tolerance: If given, the largest allowed distance between a chord and the circle
+      arc it replaces; the angle step of a turn is chosen for its largest radius. If
+      None, every turn gets STEPS_PER_TURN points.
+
+    Returns:
+    - An int array with the point count of every turn.
+    """
+    radii = np.asarray(radii, dtype=float)
+    if tolerance is None:
+        return np.full(len(radii), STEPS_PER_TURN)
+    # The chord error of an arc of angle a and radius r is r * (1 - cos(a / 2))
+    cosine = 1 - tolerance / np.maximum(radii, tolerance)
+    steps = np.ceil(2 * np.pi / np.maximum(2 * np.arccos(cosine), 1e-9))
+    return np.maximum(steps, MIN_STEPS_PER_TURN).astype(np.int64)
+
+def spiral_parameters(turns, steps_per_turn=STEPS_PER_TURN):
+    """
+    Returns the curve parameters t in [0, 1) of the points of a spiral.
+
+    Args:
+    - turns: The number of turns.
+    - steps_per_turn: The number of points per turn, or a sequence with the point count
+      of every turn (see spiral_steps_per_turn).
+
+    Returns:
+    - An increasing float array, with t = 1 at the end of the last turn.
+    """
+    turn_count = math.ceil(turns)
+    counts = np.broadcast_to(np.asarray(steps_per_turn, dtype=np.int64), (turn_count,))
+
+    # Angles are evenly spaced within every turn; the last turn may be partial
+    turn = np.repeat(np.arange(turn_count), counts)
+    step_in_turn = np.arange(len(turn)) - np.repeat(np.cumsum(counts) - counts, counts)
+    turn_positions = turn + step_in_turn / counts[turn]
+    return turn_positions[turn_positions < turns] / turns
+
+def spiral_function(t, initial_radius, turns, height, diameter_growth_percent):
+    """
+    Evaluates a spiral whose radius and height grow linearly with the angle, for
+    parametric.sample_curve.
+
+    Args:
+    - t: The curve parameters in [0, 1].
+    - initial_radius: The radius at t = 0.
+    - turns: The number of turns.
+    - height: The height at t = 1.
+    - diameter_growth_percent: The radius growth per turn, in percent of the initial radius.
+
+    Returns:
+    - A (len(t), 3) array of points.
+    """
+    angles = 2 * math.pi * turns * t
+    radii = initial_radius * (1 + diameter_growth_percent / 100 * turns * t)
+    return np.column_stack((radii * np.cos(angles), radii * np.sin(angles), height * t))
+
+def create_spiral(initial_diameter, turns, height, diameter_growth_percent, tolerance=None, spline_type='POLY',
+                  lod=False, cached=False):
+    """
+    Creates a spiral curve with parametric.create_parametric_curve.
+
+    Args:
+    - initial_diameter: The diameter at the start of the spiral.
+    - turns: The number of turns.
+    - height: The height of the spiral.
+    - diameter_growth_percent: The diameter growth per turn, in percent of the initial diameter.
+    - tolerance: If given, the point count of every turn is chosen so that no chord
+      deviates more than tolerance from the exact spiral (see spiral_steps_per_turn),
+      instead of using one point per degree.
+    - spline_type: 'POLY', 'BEZIER' or 'NURBS'.
+    - lod: If True, viewport and far levels of detail are built too.
+    - cached: If True, a spiral with the same parameters reuses the existing curves.
+
+    Returns:
+    - The spiral curve object.
+    """
     # Calculate the initial radius from the diameter
     initial_radius = initial_diameter / 2.0
+    turn_end_radii = initial_radius * (1 + np.arange(1, math.ceil(turns) + 1) * diameter_growth_percent / 100)
+    t = spiral_parameters(turns, spiral_steps_per_turn(turn_end_radii, tolerance))
 
-    # Calculate the total number of steps (one step per degree for smoothness)
-    total_steps = int(turns * 360)
-    z_step = height / total_steps  # Height increment per step
-    angle_step = 2 * math.pi / 360  # Radians per step
-
-    # Radius increment per step based on growth percent
-    radius_growth_per_step = initial_radius * (diameter_growth_percent / 100) / 360
-
-    # Create a new curve
-    curve_data = bpy.data.curves.new('SpiralCurve', type='CURVE')
-    curve_data.dimensions = '3D'
-    spline = curve_data.splines.new('POLY')
-    spline.points.add(total_steps - 1)  # total_steps points, one is already there
-
-    # Populate the spline with points
-    radius = initial_radius
-    for i in range(total_steps):
-        x = radius * math.cos(i * angle_step)
-        y = radius * math.sin(i * angle_step)
-        z = i * z_step
-        spline.points[i].co = (x, y, z, 1)  # The fourth value (w) must be 1 for POLY type splines
-
-        # Increase the radius for the next point
-        radius += radius_growth_per_step
-
-    # Create a new object with the curve
-    curve_obj = bpy.data.objects.new('SpiralObject', curve_data)
-    bpy.context.collection.objects.link(curve_obj)
+    params = {"initial_radius": initial_radius, "turns": turns, "height": height,
+              "diameter_growth_percent": diameter_growth_percent}
+    curve_obj = parametric.create_parametric_curve('SpiralObject', spiral_function, params, t,
+                                                   spline_type=spline_type, lod=lod, cached=cached,
+                                                   data_name='SpiralCurve')
     bpy.context.view_layer.objects.active = curve_obj
     curve_obj.select_set(True)
 
@@ -48,4 +116,4 @@ def main():
     create_spiral(initial_diameter, turns, height, diameter_growth_percent)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
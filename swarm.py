@@ -2,13 +2,55 @@ import bpy
 from bpy.props import IntProperty, FloatProperty
 from bpy.types import Operator, Panel
 from mathutils import Vector
+from contextlib import contextmanager
+import hashlib
+import numpy as np
+import os
 import random
 
-def distribute_and_animate_objects(obj, curve_list, start_frame, end_frame):
+import bake
+import bpl
+import swarmsim
+
+def distribute_and_animate_objects(obj, curve_list, start_frame, end_frame, linked=False, collection_name="Swarm",
+                                   bake_constraints=False, tolerance=None):
+    """
+    Duplicates the object once per curve and animates every duplicate along its curve
+    with a Follow Path constraint.
+
+    Args:
+    - obj: The object to duplicate (mesh, curve, surface or text).
+    - curve_list: The curve objects to follow.
+    - start_frame: The frame at which the duplicates are at the start of their curve.
+    - end_frame: The frame at which the duplicates reach the end of their curve.
+    - linked: If True, all duplicates share the object's data instead of copying it and are
+      linked into a new collection named collection_name, which is added to the scene once.
+      They start without the object's animation and share one action whose offset keys
+      are written once. Without linked, duplicates keep the object's animation data, as
+      copies do.
+    - bake_constraints: If True, the Follow Path constraints are baked into location and
+      rotation keyframes and removed (see bake.bake_path_constraints). The duplicates
+      are then keyed in one new action with a slot each, which replaces the action
+      they got from the object.
+    - tolerance: Key reduction tolerance used when baking.
+
+    Returns:
+    - The list of duplicated objects.
+    """
     # Ensure the input object is a mesh or another appropriate type
     if obj.type not in ['MESH', 'CURVE', 'SURFACE', 'FONT']:
         raise TypeError("Unsupported object type. Please use a mesh or curve object.")
 
+    if linked:
+        # Objects are linked to a collection that is not in the scene yet, so the
+        # depsgraph is only rebuilt once when the collection is added
+        collection = bpy.data.collections.new(collection_name)
+    else:
+        collection = bpy.context.collection
+
+    new_objects = []
+    constraints = []
+
     # Loop through each curve in the curve list
     for curve in curve_list:
         if curve.type != 'CURVE':
@@ -17,8 +59,11 @@ def distribute_and_animate_objects(obj, curve_list, start_frame, end_frame):
 
         # Duplicate the object
         new_obj = obj.copy()
-        new_obj.data = obj.data.copy()
-        bpy.context.collection.objects.link(new_obj)
+        if linked:
+            new_obj.animation_data_clear()
+        else:
+            new_obj.data = obj.data.copy()
+        collection.objects.link(new_obj)
 
         # Create and configure the Follow Path constraint
         follow_path_constraint = new_obj.constraints.new(type='FOLLOW_PATH')
@@ -28,32 +73,174 @@ def distribute_and_animate_objects(obj, curve_list, start_frame, end_frame):
         follow_path_constraint.forward_axis = 'FORWARD_Y'  # Assuming the object's forward direction is along Y
         follow_path_constraint.up_axis = 'UP_Z'  # Assuming Z is up
 
-        # Set the animation
-        follow_path_constraint.offset_factor = 0.0  # Start at the beginning of the curve
-        follow_path_constraint.keyframe_insert(data_path="offset_factor", frame=start_frame)
-        follow_path_constraint.offset_factor = 1.0  # End at the end of the curve
-        follow_path_constraint.keyframe_insert(data_path="offset_factor", frame=end_frame)
-
-        print(f"Object {new_obj.name} animated on curve {curve.name} from frame {start_frame} to {end_frame}.")
+        new_objects.append(new_obj)
+        constraints.append(follow_path_constraint)
 
+    # Set the animation: from the beginning to the end of the curve
+    if linked and not bake_constraints and new_objects:
+        # Every duplicate has the same offset keys, so one action slot is keyed once and shared
+        animate_offset_factor(new_objects[0], constraints[0], start_frame, end_frame)
+        bpl.share_animation(new_objects[0], new_objects[1:])
+    else:
+        if bake_constraints:
+            # Baking writes different keys per duplicate, so each gets its own slot
+            bpl.assign_shared_action(new_objects, collection_name + "Action")
+        for new_obj, follow_path_constraint in zip(new_objects, constraints):
+            animate_offset_factor(new_obj, follow_path_constraint, start_frame, end_frame)
+
+    if bake_constraints:
+        bake.bake_path_constraints(new_objects, start_frame, end_frame, tolerance=tolerance)
+
+    if linked:
+        bpy.context.scene.collection.children.link(collection)
+
+    print(f"{len(new_objects)} copies of {obj.name} animated from frame {start_frame} to {end_frame}.")
+    return new_objects
+
+
+def animate_offset_factor(obj, constraint, start_frame, end_frame):
+    """
+    Keys the offset_factor of a Follow Path constraint of the object from 0.0 at
+    start_frame to 1.0 at end_frame.
+    """
+    fcurve = bpl.ensure_fcurve(obj, f'constraints["{constraint.name}"].offset_factor')
+    bpl.set_keyframes(fcurve, [start_frame, end_frame], [0.0, 1.0])
+
+
+def distribute_along_splines(obj, curve_obj, start_frame, end_frame, linked=True, collection_name="Swarm",
+                             tolerance=None):
+    """
+    Duplicates the object once per spline of a multi-spline curve (see
+    create_bezier_curves_between_face_pairs with single_curve=True) and keys every
+    duplicate along its spline with bake.bake_spline_paths.
+
+    Every duplicate stores its spline in the "spline_index" custom property. The
+    duplicates are keyed in one shared action with a slot each (see
+    bpl.assign_shared_action); with linked=True they start without the object's
+    animation data, otherwise only its action is replaced.
+
+    Args:
+    - obj: The object to duplicate (mesh, curve, surface or text).
+    - curve_obj: The curve object holding one spline per drone.
+    - start_frame: The frame at which the duplicates are at the start of their spline.
+    - end_frame: The frame at which the duplicates reach the end of their spline.
+    - linked: If True, all duplicates share the object's data instead of copying it.
+    - collection_name: The collection the duplicates are linked into; it is added to the scene once.
+    - tolerance: Key reduction tolerance, see bake.bake_path_constraints.
+
+    Returns:
+    - The list of duplicated objects, in spline order.
+    """
+    if obj.type not in ['MESH', 'CURVE', 'SURFACE', 'FONT']:
+        raise TypeError("Unsupported object type. Please use a mesh or curve object.")
 
-def pair_random_elements(input_list, N):
-    if 2 * N > len(input_list):
+    collection = bpy.data.collections.new(collection_name)
+    new_objects = []
+    for spline_index in range(len(curve_obj.data.splines)):
+        new_obj = obj.copy()
+        if linked:
+            new_obj.animation_data_clear()
+        else:
+            new_obj.data = obj.data.copy()
+            # Drivers and NLA tracks are kept, but every duplicate is keyed separately
+            if new_obj.animation_data is not None:
+                new_obj.animation_data.action = None
+        new_obj["spline_index"] = spline_index
+        collection.objects.link(new_obj)
+        new_objects.append(new_obj)
+
+    bpl.assign_shared_action(new_objects, collection_name + "Action")
+    bake.bake_spline_paths(new_objects, curve_obj, start_frame, end_frame, tolerance=tolerance)
+    bpy.context.scene.collection.children.link(collection)
+
+    print(f"{len(new_objects)} copies of {obj.name} animated from frame {start_frame} to {end_frame}.")
+    return new_objects
+
+
+def pair_random_indices(elements, N, seed=None, positions=None, min_distance=None, max_distance=None, max_attempts=100):
+    """
+    Randomly pairs 2 * N distinct elements by shuffling an index permutation once.
+
+    Args:
+    - elements: The number of elements, or an array of element ids (e.g. face indices).
+    - N: The number of pairs.
+    - seed: Seed of the random generator.
+    - positions: Optional (len(elements), 3) array with the position of every element,
+      required by min_distance and max_distance.
+    - min_distance: Optional minimum distance between paired elements.
+    - max_distance: Optional maximum distance between paired elements.
+    - max_attempts: How many times pairs breaking the distance limits are re-drawn.
+
+    Returns:
+    - An (N, 2) array of paired element ids.
+    """
+    ids = np.arange(elements) if np.ndim(elements) == 0 else np.asarray(elements)
+    if 2 * N > len(ids):
         raise ValueError("N must be less than half the length of the input list")
 
-    # Randomly select N elements for the first group
-    first_group = random.sample(input_list, N)
-
-    # Create a list of remaining elements
-    remaining_elements = [item for item in input_list if item not in first_group]
-
-    # Randomly select N elements from the remaining elements for the second group
-    second_group = random.sample(remaining_elements, N)
-
-    # Pair elements from the first group with elements from the second group
-    paired_elements = list(zip(first_group, second_group))
-
-    return paired_elements
+    rng = np.random.default_rng(seed)
+    permutation = rng.permutation(len(ids))
+    first = permutation[:N]
+    second = permutation[N:2 * N].copy()
+
+    if min_distance is not None or max_distance is not None:
+        if positions is None:
+            raise ValueError("positions are required for distance constrained pairing")
+        positions = np.asarray(positions, dtype=np.float32)
+
+        def out_of_limits(a, b):
+            distance = np.linalg.norm(positions[a] - positions[b], axis=1)
+            result = np.zeros(len(a), dtype=bool)
+            if min_distance is not None:
+                result |= distance < min_distance
+            if max_distance is not None:
+                result |= distance > max_distance
+            return result
+
+        spare = permutation[2 * N:]
+        invalid = np.flatnonzero(out_of_limits(first, second))
+        for _ in range(max_attempts):
+            if len(invalid) == 0:
+                break
+            # Re-draw the partners of invalid pairs from their own partners and the unused elements
+            candidates = rng.permutation(np.concatenate((second[invalid], spare)))
+            second[invalid] = candidates[:len(invalid)]
+            spare = candidates[len(invalid):]
+            invalid = invalid[out_of_limits(first[invalid], second[invalid])]
+
+            # Swap partners with random other pairs when both pairs end up within the limits
+            other = rng.integers(0, N, size=len(invalid))
+            unique_other = np.zeros(len(invalid), dtype=bool)
+            unique_other[np.unique(other, return_index=True)[1]] = True
+            swap = (unique_other & ~np.isin(other, invalid)
+                    & ~out_of_limits(first[invalid], second[other])
+                    & ~out_of_limits(first[other], second[invalid]))
+            swapped, other = invalid[swap], other[swap]
+            second[swapped], second[other] = second[other], second[swapped].copy()
+            invalid = invalid[~swap]
+        else:
+            if len(invalid):
+                raise ValueError(f"Could not satisfy the distance limits for {len(invalid)} pairs")
+
+    return np.stack((ids[first], ids[second]), axis=1)
+
+
+def pair_random_elements(input_list, N, seed=None):
+    """
+    Randomly pairs N elements of the list with N other elements of the list.
+
+    Works on positions in the list, so unhashable and duplicate items are fine.
+
+    Args:
+    - input_list: The elements to pair.
+    - N: The number of pairs.
+    - seed: Seed of the random generator.
+
+    Returns:
+    - A list of N (element, element) tuples.
+    """
+    pairs = pair_random_indices(len(input_list), N, seed=seed)
+    return [(input_list[first], input_list[second]) for first, second in pairs]
 
 def animate_object_along_curve(obj, curve, start_frame, end_frame):
     # Check if the curve is a valid curve object
@@ -72,43 +259,63 @@ def animate_object_along_curve(obj, curve, start_frame, end_frame):
 
     # Set the curve target and options
     follow_path_constraint.target = curve
+    # offset_factor is only used with a fixed location; the path already places the
+    # object, so its own location is not keyed
+    follow_path_constraint.use_fixed_location = True
     follow_path_constraint.use_curve_follow = True
     follow_path_constraint.forward_axis = 'FORWARD_Y'
     follow_path_constraint.up_axis = 'UP_Z'
 
-    # Set the object at the start of the curve
-    obj.location = curve.splines[0].bezier_points[0].co
-    obj.keyframe_insert(data_path="location", frame=start_frame)
-
-    # Insert keyframe for the constraint influence
-    follow_path_constraint.offset_factor = 0.0
-    follow_path_constraint.keyframe_insert(data_path="offset_factor", frame=start_frame)
+    # Move along the whole curve from start_frame to end_frame
+    fcurve = bpl.ensure_fcurve(obj, f'constraints["{follow_path_constraint.name}"].offset_factor')
+    bpl.set_keyframes(fcurve, [start_frame, end_frame], [0.0, 1.0])
 
-    # Set the object at the end of the curve
-    obj.location = curve.splines[0].bezier_points[-1].co
-    obj.keyframe_insert(data_path="location", frame=end_frame)
+    print("Animation setup completed.")
 
-    # Insert keyframe for the constraint influence
-    follow_path_constraint.offset_factor = 1.0
-    follow_path_constraint.keyframe_insert(data_path="offset_factor", frame=end_frame)
 
-    print("Animation setup completed.")
+def create_bezier_curves_between_face_pairs(face_pairs, min_separation=None, single_curve=False):
+    """
+    Creates one Bezier curve per face pair, leaving each face along its normal.
 
+    With min_separation set, the handles are nudged apart (see
+    swarmsim.nudge_bezier_paths) so drones flying the curves over the same
+    time span keep at least that distance from each other.
 
-def create_bezier_curves_between_face_pairs(face_pairs):
+    With single_curve set, all paths are written as splines of one curve object
+    instead, spline i belonging to face pair i, and a list holding only that
+    object is returned. Follow Path only follows the first spline of a curve,
+    so use distribute_along_splines to animate drones along it.
+    """
     curve_objects = []
     # To store references to the created curve objects
     # todo reat global faces
-    for face_data_1, face_data_2 in face_pairs:
-        center1, normal1 = face_data_1
-        center2, normal2 = face_data_2
-
-        # Calculate handle positions
-        distance = (center1 - center2).length
-        height_factor = 4
-        handle1 = center1 + normal1.normalized() * distance * height_factor
-        handle2 = center2 + normal2.normalized() * distance * height_factor
+    centers1 = np.array([face_data_1[0] for face_data_1, _ in face_pairs], dtype=np.float32).reshape(-1, 3)
+    normals1 = np.array([face_data_1[1] for face_data_1, _ in face_pairs], dtype=np.float32).reshape(-1, 3)
+    centers2 = np.array([face_data_2[0] for _, face_data_2 in face_pairs], dtype=np.float32).reshape(-1, 3)
+    normals2 = np.array([face_data_2[1] for _, face_data_2 in face_pairs], dtype=np.float32).reshape(-1, 3)
+
+    # Calculate handle positions
+    distance = np.linalg.norm(centers1 - centers2, axis=1)[:, None]
+    height_factor = 4
+    handles1 = centers1 + normals1 / np.linalg.norm(normals1, axis=1, keepdims=True) * distance * height_factor
+    handles2 = centers2 + normals2 / np.linalg.norm(normals2, axis=1, keepdims=True) * distance * height_factor
+
+    if min_separation is not None and len(face_pairs) > 1:
+        handles1, handles2, violations = swarmsim.nudge_bezier_paths(
+            centers1, handles1, handles2, centers2, min_separation)
+        if violations:
+            print(f"{violations} close approaches below {min_separation} left after nudging")
+
+    if single_curve:
+        # The outer handles are unused and collapsed onto their points
+        co = np.stack((centers1, centers2), axis=1)
+        curve_data = bpl.create_bezier_curve("BezierCurves", co, np.stack((centers1, handles2), axis=1),
+                                             np.stack((handles1, centers2), axis=1))
+        curve_obj = bpy.data.objects.new("BezierCurvesObj", curve_data)
+        bpy.context.scene.collection.objects.link(curve_obj)
+        return [curve_obj]
 
+    for center1, handle1, handle2, center2 in zip(centers1, handles1, handles2, centers2):
         # Create and configure the curve
         curve_data = bpy.data.curves.new(name="BezierCurve", type='CURVE')
         curve_data.dimensions = '3D'
@@ -130,9 +337,6 @@ def create_bezier_curves_between_face_pairs(face_pairs):
 
     return curve_objects
 
-# Global variable to store the data of selected faces
-GLOBAL_FACE_DATA = []
-
 def store_selected_faces_data(obj):
     """Store the center and normal of selected faces."""
     selected_faces_info = []
@@ -145,6 +349,403 @@ def store_selected_faces_data(obj):
                 selected_faces_info.append((center, normal))
     return selected_faces_info
 
+def read_face_selection(mesh):
+    """
+    Returns the selection state of every face of a mesh as a boolean array.
+    """
+    select = np.empty(len(mesh.polygons), dtype=bool)
+    select_attribute = mesh.attributes.get(".select_poly")
+    if select_attribute is not None:
+        select_attribute.data.foreach_get("value", select)
+    else:
+        mesh.polygons.foreach_get("select", select)
+    return select
+
+
+def capture_selected_faces(obj, selected_only=True):
+    """
+    Captures the world-space centers and normals of the selected faces in one vectorized pass.
+
+    Mesh buffers are read with foreach_get, so this scales to meshes with hundreds of
+    thousands of faces. The results match store_selected_faces_data.
+
+    Args:
+    - obj: The mesh object to read.
+    - selected_only: If False, all faces are captured.
+
+    Returns:
+    - A tuple (centers, normals) of float32 arrays of shape (N, 3).
+    """
+    empty = np.zeros((0, 3), dtype=np.float32)
+    if obj.type != 'MESH' or len(obj.data.polygons) == 0:
+        return empty, empty.copy()
+
+    mesh = obj.data
+    polygon_count = len(mesh.polygons)
+
+    # Polygon.center is the mean of the face's vertices, as in store_selected_faces_data
+    centers = np.empty(polygon_count * 3, dtype=np.float32)
+    mesh.polygons.foreach_get("center", centers)
+    centers = centers.reshape(-1, 3)
+
+    # Blender 4.1+ exposes cached face normals as a contiguous array
+    normals = np.empty(polygon_count * 3, dtype=np.float32)
+    if hasattr(mesh, "polygon_normals"):
+        mesh.polygon_normals.foreach_get("vector", normals)
+    else:
+        mesh.polygons.foreach_get("normal", normals)
+    normals = normals.reshape(-1, 3)
+
+    if selected_only:
+        select = read_face_selection(mesh)
+        centers = centers[select]
+        normals = normals[select]
+
+    matrix = np.array(obj.matrix_world, dtype=np.float32)
+    rotation = matrix[:3, :3].T
+    centers = centers @ rotation + matrix[:3, 3]
+    normals = normals @ rotation
+
+    return centers.astype(np.float32), normals.astype(np.float32)
+
+
+def read_mesh_attribute(mesh, name, fallback, attribute, dtype, size=1):
+    """
+    Reads a mesh attribute into a flat array, using the fallback collection and
+    property when the attribute does not exist in this Blender version.
+    """
+    mesh_attribute = mesh.attributes.get(name)
+    collection = mesh_attribute.data if mesh_attribute is not None else fallback
+    values = np.empty(len(collection) * size, dtype=dtype)
+    if mesh_attribute is not None:
+        collection.foreach_get("vector" if size == 3 else "value", values)
+    else:
+        collection.foreach_get(attribute, values)
+    return values
+
+
+def face_capture_key(obj, selected_only=True):
+    """
+    Hashes everything a face capture depends on: the vertex positions, the face
+    topology, the face selection and the world matrix of the object.
+
+    The generic "position" and ".corner_vert" attributes are read instead of
+    vertices and loops, which is about a hundred times faster on large meshes.
+
+    Returns:
+    - A hex digest that changes whenever the capture would change.
+    """
+    mesh = obj.data
+    digest = hashlib.sha1()
+    digest.update(np.array((len(mesh.vertices), len(mesh.loops), len(mesh.polygons), selected_only), dtype=np.int64))
+    digest.update(read_mesh_attribute(mesh, "position", mesh.vertices, "co", np.float32, size=3))
+    digest.update(read_mesh_attribute(mesh, ".corner_vert", mesh.loops, "vertex_index", np.int32))
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    digest.update(loop_starts)
+    if selected_only:
+        digest.update(read_face_selection(mesh))
+    digest.update(np.ascontiguousarray(obj.matrix_world, dtype=np.float32))
+    return digest.hexdigest()
+
+
+# Number of depsgraph updates seen per mesh (by session_uid) while tracking is enabled
+MESH_GENERATIONS = {}
+
+# Cheap stamps of the last capture per object (by session_uid), see face_capture_stamp
+FACE_CAPTURE_STAMPS = {}
+
+
+@bpy.app.handlers.persistent
+def track_mesh_updates(scene, depsgraph):
+    """
+    depsgraph_update_post handler that counts the updates of every mesh, so
+    get_captured_faces can tell an unchanged mesh without hashing it.
+    """
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Mesh):
+            uid = update.id.original.session_uid
+            MESH_GENERATIONS[uid] = MESH_GENERATIONS.get(uid, 0) + 1
+
+
+def enable_face_capture_tracking():
+    """
+    Adds track_mesh_updates to the depsgraph update handlers, once.
+    """
+    if track_mesh_updates not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(track_mesh_updates)
+
+
+def disable_face_capture_tracking():
+    """
+    Removes track_mesh_updates from the depsgraph update handlers and forgets the stamps.
+    """
+    if track_mesh_updates in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(track_mesh_updates)
+    MESH_GENERATIONS.clear()
+    FACE_CAPTURE_STAMPS.clear()
+
+
+def face_capture_stamp(obj, selected_only=True):
+    """
+    Returns the cheap invariants of a face capture: the mesh, its update count,
+    its element counts and the world matrix. Nothing per element is read.
+
+    Returns:
+    - A tuple, or None when mesh updates are not tracked (see enable_face_capture_tracking).
+    """
+    if track_mesh_updates not in bpy.app.handlers.depsgraph_update_post:
+        return None
+    mesh = obj.data
+    return (mesh.session_uid, MESH_GENERATIONS.get(mesh.session_uid, 0), len(mesh.vertices), len(mesh.loops),
+            len(mesh.polygons), selected_only, np.array(obj.matrix_world, dtype=np.float32).tobytes())
+
+
+def get_captured_faces(obj, selected_only=True):
+    """
+    Returns the captured centers and normals of the selected faces of an object,
+    capturing them only when the mesh, the selection or the transform changed.
+
+    The capture is stored on the object in the custom properties "swarm_face_key",
+    "swarm_face_centers" and "swarm_face_normals", so it is saved with the file and
+    kept separately for every object.
+
+    While mesh updates are tracked (see enable_face_capture_tracking), an object whose
+    stamp (see face_capture_stamp) did not change is served without reading the mesh;
+    only on a stamp miss is the content hashed with face_capture_key. Mesh edits made
+    by scripts are seen after the next depsgraph update, e.g. view_layer.update().
+
+    Args:
+    - obj: The mesh object to read.
+    - selected_only: If False, all faces are captured.
+
+    Returns:
+    - A tuple (centers, normals) of float32 arrays of shape (N, 3).
+    """
+    if obj.type != 'MESH':
+        return capture_selected_faces(obj, selected_only)
+
+    stamp = face_capture_stamp(obj, selected_only)
+    hit = stamp is not None and FACE_CAPTURE_STAMPS.get(obj.session_uid) == stamp and "swarm_face_key" in obj
+    if not hit:
+        key = face_capture_key(obj, selected_only)
+        hit = obj.get("swarm_face_key") == key
+    if hit:
+        # ID property arrays support the buffer protocol, so this does not copy per element
+        centers = np.asarray(memoryview(obj["swarm_face_centers"]), dtype=np.float32).reshape(-1, 3)
+        normals = np.asarray(memoryview(obj["swarm_face_normals"]), dtype=np.float32).reshape(-1, 3)
+    else:
+        centers, normals = capture_selected_faces(obj, selected_only)
+        obj["swarm_face_centers"] = centers.ravel()
+        obj["swarm_face_normals"] = normals.ravel()
+        obj["swarm_face_key"] = key
+    if stamp is not None:
+        FACE_CAPTURE_STAMPS[obj.session_uid] = stamp
+    return centers, normals
+
+
+def simulate_swarm_between_faces(obj, N, frames, seed=None, **settings):
+    """
+    Simulates N drones flying between random pairs of the selected faces of an object.
+
+    Args:
+    - obj: The mesh object with the selected faces.
+    - N: The number of drones; 2 * N faces must be selected.
+    - frames: The number of frames to simulate.
+    - seed: Seed used for pairing the faces and for the simulation.
+    - settings: Further keyword arguments for swarmsim.simulate_swarm.
+
+    Returns:
+    - A (frames, N, 3) float32 array of drone positions.
+    """
+    centers, normals = get_captured_faces(obj)
+    pairs = pair_random_indices(len(centers), N, seed=seed)
+    start, goal = pairs[:, 0], pairs[:, 1]
+    return swarmsim.simulate_swarm(centers[start], centers[goal], frames,
+                                   start_normals=normals[start], goal_normals=normals[goal],
+                                   seed=seed, **settings)
+
+
+def write_trajectory_cache(filepath, face_data, N, frames, seed=None, **settings):
+    """
+    Simulates N drones flying between random pairs of faces and streams their positions
+    into a memory-mapped .npy file of shape (frames, N, 3), one frame at a time.
+
+    Args:
+    - filepath: The .npy file to write.
+    - face_data: A list of (center, normal) tuples, as returned by store_selected_faces_data.
+    - N: The number of drones; at least 2 * N faces are needed.
+    - frames: The number of frames to simulate.
+    - seed: Seed used for pairing the faces and for the simulation.
+    - settings: Further keyword arguments for swarmsim.simulate_swarm.
+
+    Returns:
+    - The file path.
+    """
+    centers = np.array([center for center, _ in face_data], dtype=np.float32).reshape(-1, 3)
+    normals = np.array([normal for _, normal in face_data], dtype=np.float32).reshape(-1, 3)
+    pairs = pair_random_indices(len(centers), N, seed=seed)
+    start, goal = pairs[:, 0], pairs[:, 1]
+
+    with new_trajectory_cache(filepath, (frames, N, 3)) as cache:
+        swarmsim.simulate_swarm(centers[start], centers[goal], frames,
+                                start_normals=normals[start], goal_normals=normals[goal],
+                                seed=seed, out=cache, **settings)
+    return filepath
+
+
+def write_spline_trajectory_cache(filepath, curve_obj, frames, ease=True, chunk_size=1024):
+    """
+    Samples every spline of a curve object over frames frames (see
+    create_bezier_curves_between_face_pairs with single_curve=True) and writes the
+    positions to a memory-mapped .npy file of shape (frames, splines, 3).
+
+    Args:
+    - filepath: The .npy file to write.
+    - curve_obj: The curve object with one spline per drone.
+    - frames: The number of frames from the start to the end of the splines.
+    - ease: Ease in and out like the Follow Path animation does.
+    - chunk_size: The number of splines sampled before they are written.
+
+    Returns:
+    - The file path.
+    """
+    factors = np.linspace(0.0, 1.0, frames)
+    if ease:
+        factors = factors * factors * (3 - 2 * factors)
+    matrix = np.array(curve_obj.matrix_world)
+    count = len(curve_obj.data.splines)
+
+    with new_trajectory_cache(filepath, (frames, count, 3)) as cache:
+        for first in range(0, count, chunk_size):
+            last = min(first + chunk_size, count)
+            chunk = np.empty((frames, last - first, 3), dtype=np.float32)
+            for index in range(first, last):
+                positions = bake.sample_path(bake.curve_path(curve_obj, index), factors)[0]
+                chunk[:, index - first] = positions @ matrix[:3, :3].T + matrix[:3, 3]
+            cache[:, first:last] = chunk
+    return filepath
+
+
+# Open trajectory caches by file path, as (modification time, memmap) pairs;
+# only the pages of the frames played are read
+TRAJECTORY_CACHES = {}
+
+
+@contextmanager
+def new_trajectory_cache(filepath, shape):
+    """
+    Creates a float32 trajectory cache as a writable memmap for a with-block.
+
+    The data is written to a temporary file next to filepath, which then replaces
+    filepath. A cache that is still memory-mapped for playback keeps reading the
+    old file instead of a truncated one, and is reopened on its next use.
+    """
+    temporary = f"{filepath}.{os.getpid()}.tmp"
+    cache = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float32, shape=shape)
+    try:
+        yield cache
+        cache.flush()
+    except BaseException:
+        del cache
+        os.remove(temporary)
+        raise
+    del cache
+    os.replace(temporary, filepath)
+    close_trajectory_cache(filepath)
+
+
+def open_trajectory_cache(filepath):
+    """
+    Returns the (frames, drones, 3) trajectory cache memory-mapped read-only.
+    The file is mapped again when it was modified since it was opened.
+    """
+    modified = os.stat(filepath).st_mtime_ns
+    entry = TRAJECTORY_CACHES.get(filepath)
+    if entry is None or entry[0] != modified:
+        entry = TRAJECTORY_CACHES[filepath] = (modified, np.load(filepath, mmap_mode='r'))
+    return entry[1]
+
+
+def close_trajectory_cache(filepath):
+    """
+    Forgets the memmap of a trajectory cache; the file is unmapped once no array uses it.
+    """
+    TRAJECTORY_CACHES.pop(filepath, None)
+
+
+@bpy.app.handlers.persistent
+def update_swarm_playback(scene, *args):
+    """
+    frame_change_pre handler that moves the vertices of every swarm playback object
+    to the positions of the current frame in its trajectory cache.
+    """
+    for obj in scene.objects:
+        filepath = obj.get("swarm_cache")
+        if filepath is None or obj.type != 'MESH':
+            continue
+        cache = open_trajectory_cache(filepath)
+        index = min(max(scene.frame_current - obj.get("swarm_frame_start", 1), 0), len(cache) - 1)
+        mesh = obj.data
+        if len(mesh.vertices) != cache.shape[1]:
+            continue
+        mesh.vertices.foreach_set("co", np.ascontiguousarray(cache[index]).ravel())
+        mesh.update()
+
+
+def enable_swarm_playback():
+    """
+    Adds update_swarm_playback to the frame change handlers, once.
+    """
+    if update_swarm_playback not in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.append(update_swarm_playback)
+
+
+def disable_swarm_playback():
+    """
+    Removes update_swarm_playback from the frame change handlers and closes the caches.
+    """
+    if update_swarm_playback in bpy.app.handlers.frame_change_pre:
+        bpy.app.handlers.frame_change_pre.remove(update_swarm_playback)
+    TRAJECTORY_CACHES.clear()
+
+
+def create_swarm_playback(filepath, drone, name="SwarmPlayback", frame_start=1):
+    """
+    Plays a trajectory cache back on a single point mesh with one vertex per drone.
+    A copy of the drone object is instanced onto the vertices, so no per-drone objects exist.
+
+    Args:
+    - filepath: A (frames, drones, 3) .npy trajectory cache, see write_trajectory_cache.
+    - drone: The object shown at every drone position. It is left unchanged; a copy
+      sharing its data is parented to the point object at its origin.
+    - name: The name of the point mesh and object.
+    - frame_start: The scene frame that shows the first cached frame.
+
+    Returns:
+    - The point object.
+    """
+    filepath = bpy.path.abspath(filepath)
+    cache = open_trajectory_cache(filepath)
+    mesh = bpl.create_point_mesh(name, cache[0])
+    points_obj = bpy.data.objects.new(name, mesh)
+    points_obj["swarm_cache"] = filepath
+    points_obj["swarm_frame_start"] = frame_start
+    points_obj.instance_type = 'VERTS'
+    bpy.context.scene.collection.objects.link(points_obj)
+
+    instance = drone.copy()
+    bpy.context.scene.collection.objects.link(instance)
+    instance.parent = points_obj
+    instance.matrix_parent_inverse.identity()
+    instance.location = (0, 0, 0)
+
+    enable_swarm_playback()
+    update_swarm_playback(bpy.context.scene)
+    print(f"Playing {cache.shape[1]} drones over {cache.shape[0]} frames from {filepath}.")
+    return points_obj
+
+
 class SWARM_OT_CaptureFaces(Operator):
     bl_idname = "swarm.capture_faces"
     bl_label = "Capture Faces"
@@ -155,9 +756,11 @@ class SWARM_OT_CaptureFaces(Operator):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
     def execute(self, context):
-        global GLOBAL_FACE_DATA
-        GLOBAL_FACE_DATA = store_selected_faces_data(context.active_object)
-        self.report({'INFO'}, F"Captured {len(GLOBAL_FACE_DATA)} faces")
+        obj = context.active_object
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+        centers, _ = get_captured_faces(obj)
+        self.report({'INFO'}, F"Captured {len(centers)} faces")
         return {'FINISHED'}
 
 class SWARM_OT_animate(Operator):
@@ -166,13 +769,35 @@ class SWARM_OT_animate(Operator):
     bl_description = "Animate a swarm of objects between selected faces"
     bl_options = {'REGISTER', 'UNDO'}
 
+    drone_count: IntProperty(name="Drones", default=10, min=1)
+    start_frame: IntProperty(name="Start Frame", default=1)
+    end_frame: IntProperty(name="End Frame", default=20)
+    seed: IntProperty(name="Seed", default=0)
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
     def execute(self, context):
-        st = 1
-        en = 20
-        # to do - pass object and create curves from faces
-        obj = bpy.context.scene.objects.get("ObjectName")  # Replace "ObjectName" with your object's name
-        for c in GLOBAL_FACE_DATA:
-            animate_object_along_curve(obj,c,st,en)
+        # The active object holds the faces, the other selected object is the drone
+        obj = context.active_object
+        drones = [o for o in context.selected_objects if o != obj]
+        if not drones:
+            self.report({'ERROR'}, "Select the drone object and make the face mesh active")
+            return {'CANCELLED'}
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+
+        # Unchanged meshes reuse the capture stored on the object
+        centers, normals = get_captured_faces(obj)
+        if len(centers) < 2 * self.drone_count:
+            self.report({'ERROR'}, F"{2 * self.drone_count} selected faces needed, {len(centers)} captured")
+            return {'CANCELLED'}
+
+        pairs = pair_random_indices(len(centers), self.drone_count, seed=self.seed)
+        face_pairs = [((centers[a], normals[a]), (centers[b], normals[b])) for a, b in pairs]
+        curve_obj = create_bezier_curves_between_face_pairs(face_pairs, single_curve=True)[0]
+        distribute_along_splines(drones[0], curve_obj, self.start_frame, self.end_frame)
         return {'FINISHED'}
 
 class SWARM_PT_Panel(Panel):
@@ -191,11 +816,15 @@ def register():
     bpy.utils.register_class(SWARM_OT_CaptureFaces)
     bpy.utils.register_class(SWARM_OT_animate)
     bpy.utils.register_class(SWARM_PT_Panel)
+    enable_swarm_playback()
+    enable_face_capture_tracking()
 
 def unregister():
     bpy.utils.unregister_class(SWARM_OT_CaptureFaces)
     bpy.utils.unregister_class(SWARM_OT_animate)
     bpy.utils.unregister_class(SWARM_PT_Panel)
+    disable_swarm_playback()
+    disable_face_capture_tracking()
 
 if __name__ == "__main__":
     register()
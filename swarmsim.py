@@ -0,0 +1,431 @@
+"""
+Vectorized swarm simulation (flocking/boids) for drone shows.
+
+Agents take off from start faces, cruise to goal faces and land on them,
+while separation, alignment and cohesion forces act between neighbors.
+All agents are stepped at once with NumPy; neighbors are found with a
+uniform cell grid (SpatialHash) that is updated incrementally every
+frame. The module does not use bpy, so it can be tested and benchmarked
+outside Blender:
+
+    python swarmsim.py
+"""
+import time
+
+import numpy as np
+
+# Flight phases of an agent
+CLIMB, CRUISE, LAND, LANDED = 0, 1, 2, 3
+
+def half_neighbor_cell_offsets(ring=1):
+    """
+    Returns the cell offsets that cover every pair of cells at most ring cells apart
+    once: the cell itself (listed first) and the neighbors that come after it in
+    lexicographic order.
+    """
+    steps = range(-ring, ring + 1)
+    return np.array([(x, y, z) for x in steps for y in steps for z in steps if (x, y, z) >= (0, 0, 0)],
+                    dtype=np.int64)
+
+
+# The cell itself and the 13 neighbors after it, for radii up to the cell size
+HALF_NEIGHBOR_CELL_OFFSETS = half_neighbor_cell_offsets(1)
+
+
+class SpatialHash:
+    """
+    Uniform cell grid for fixed-radius neighbor queries between moving points.
+
+    Points are kept sorted by cell. When update() is called with the next positions
+    of the same points, the previous order is re-sorted with a stable sort, which is
+    close to linear time because only points that changed cell move.
+    """
+
+    def __init__(self, cell_size):
+        """
+        Args:
+        - cell_size: The edge length of a cell. Queries up to this radius search the
+          neighboring cells; larger radii search a wider ring of cells.
+        """
+        self.cell_size = cell_size
+        self.positions = None
+        self.order = None
+        self.cells = None
+        self.keys = None
+        self.dims = None
+
+    def update(self, positions):
+        """
+        Re-buckets the points for the given positions.
+
+        Args:
+        - positions: An (N, 3) array of points.
+
+        Returns:
+        - The spatial hash itself.
+        """
+        positions = np.asarray(positions)
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        # Shift cells so that every neighbor cell index stays positive
+        cells -= cells.min(axis=0) - 1
+        self.dims = cells.max(axis=0) + 2
+        self.keys = (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+        self.cells = cells
+
+        if self.order is not None and len(self.order) == len(positions):
+            # Incremental: the previous order is already almost sorted
+            self.order = self.order[np.argsort(self.keys[self.order], kind='stable')]
+        else:
+            self.order = np.argsort(self.keys, kind='stable')
+        self.positions = positions
+        return self
+
+    def pairs(self, radius=None):
+        """
+        Finds every pair of points closer than radius, each pair once.
+
+        Args:
+        - radius: The query distance (default cell_size). Radii larger than cell_size
+          search ceil(radius / cell_size) cells in every direction, which gets slow
+          quickly; pick the cell size for the radius that is queried most.
+
+        Returns:
+        - A tuple (i, j, offset, distance): index arrays of the pairs,
+          positions[i] - positions[j], and its length.
+        """
+        radius = self.cell_size if radius is None else radius
+        positions, order, keys, dims = self.positions, self.order, self.keys, self.dims
+        count = len(positions)
+        ring = max(1, int(np.ceil(radius / self.cell_size - 1e-9)))
+        offsets = HALF_NEIGHBOR_CELL_OFFSETS
+        if ring > 1:
+            offsets = half_neighbor_cell_offsets(ring)
+            # Pad the grid so that no neighbor cell index wraps into another row; the
+            # sort order by cell stays the same
+            cells = self.cells + (ring - 1)
+            dims = cells.max(axis=0) + ring + 1
+            keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        offset_keys = (offsets[:, 0] * dims[1] + offsets[:, 1]) * dims[2] + offsets[:, 2]
+
+        occupied, cell_start, cell_count = np.unique(keys[order], return_index=True, return_counts=True)
+        agent_cell = np.repeat(np.arange(len(occupied)), cell_count)
+
+        # Range of sorted points in every neighbor cell of every occupied cell
+        query = occupied[None, :] + offset_keys[:, None]
+        found = np.minimum(np.searchsorted(occupied, query), len(occupied) - 1)
+        exists = occupied[found] == query
+        range_start = np.where(exists, cell_start[found], 0)[:, agent_cell].ravel()
+        range_count = np.where(exists, cell_count[found], 0)[:, agent_cell].ravel()
+
+        total = int(range_count.sum())
+        first = np.repeat(np.tile(np.arange(count), len(offsets)), range_count)
+        second = np.repeat(range_start - (np.cumsum(range_count) - range_count), range_count) + np.arange(total)
+
+        # Within the same cell (offset 0, listed first) keep each pair once
+        same_cell = np.arange(total) < range_count[:count].sum()
+        keep = ~same_cell | (second > first)
+        first, second = order[first[keep]], order[second[keep]]
+
+        offset = positions[first] - positions[second]
+        distance = np.sqrt(np.einsum('ij,ij->i', offset, offset))
+        close = distance < radius
+        return first[close], second[close], offset[close], distance[close]
+
+
+def neighbor_pairs(positions, radius, spatial_hash=None):
+    """
+    Finds all pairs of points closer than radius.
+
+    Args:
+    - positions: An (N, 3) array of points.
+    - radius: The neighbor distance.
+    - spatial_hash: Optional SpatialHash from the previous step, updated incrementally.
+
+    Returns:
+    - A tuple (i, j, offset, distance): index arrays of every ordered pair (both
+      (i, j) and (j, i) are listed), positions[i] - positions[j], and its length.
+    """
+    spatial_hash = spatial_hash or SpatialHash(radius)
+    first, second, offset, distance = spatial_hash.update(positions).pairs(radius)
+    return (np.concatenate((first, second)), np.concatenate((second, first)),
+            np.concatenate((offset, -offset)), np.concatenate((distance, distance)))
+
+
+def separation_report(trajectory, min_distance):
+    """
+    Checks a trajectory for agents that come closer than min_distance.
+
+    Args:
+    - trajectory: A (frames, N, 3) array of positions.
+    - min_distance: The required separation.
+
+    Returns:
+    - A dict with per-frame arrays 'min_distance' (the smallest distance between any
+      two agents, inf with fewer than two agents) and 'violations' (number of pairs
+      closer than min_distance).
+    """
+    frames = len(trajectory)
+    closest = np.full(frames, np.inf)
+    violations = np.zeros(frames, dtype=np.int64)
+    spatial_hash = SpatialHash(min_distance)
+
+    for frame in range(frames):
+        positions = trajectory[frame]
+        _, _, _, distance = spatial_hash.update(positions).pairs()
+        violations[frame] = len(distance)
+        if len(distance) == 0 and len(positions) > 1:
+            # No pair is that close: search again with a doubled cell size until one is
+            # found, which happens at the latest when the radius spans the bounding box
+            diagonal = np.linalg.norm(np.ptp(positions, axis=0))
+            radius = min_distance
+            while len(distance) == 0:
+                radius = max(2 * radius, 1e-6)
+                _, _, _, distance = SpatialHash(radius).update(positions).pairs()
+                if radius > diagonal:
+                    break
+        if len(distance):
+            closest[frame] = distance.min()
+
+    return {"min_distance": closest, "violations": violations}
+
+
+def evaluate_bezier(p0, p1, p2, p3, t):
+    """
+    Evaluates cubic Bezier segments at the parameters t.
+
+    Args:
+    - p0, p1, p2, p3: (N, 3) arrays of control points (start, start handle, end handle, end).
+    - t: A 1D array of parameters in [0, 1].
+
+    Returns:
+    - A (len(t), N, 3) array of points.
+    """
+    t = np.asarray(t, dtype=np.float32)[:, None, None]
+    u = 1.0 - t
+    return u**3 * p0 + 3 * u**2 * t * p1 + 3 * u * t**2 * p2 + t**3 * p3
+
+
+def nudge_bezier_paths(p0, p1, p2, p3, min_distance, samples=64, iterations=20):
+    """
+    Moves the handles of Bezier paths apart where drones flying them would come too close.
+
+    All drones are assumed to fly their path over the same time span, so sample k of
+    every path is reached at the same moment. For every pair closer than min_distance
+    the handles of both paths are pushed sideways, away from each other, and the path
+    with the higher index is lifted along its handle directions, so crossing paths end
+    up at different heights. Pushes are weighted by how much each handle influences
+    that point of the curve; end points stay on their faces.
+
+    Args:
+    - p0, p1, p2, p3: (N, 3) arrays of control points (start, start handle, end handle, end).
+    - min_distance: The required separation.
+    - samples: The number of time samples along each path.
+    - iterations: The maximum number of nudging passes.
+
+    Returns:
+    - A tuple (p1, p2, violations) with the nudged handles and the number of close
+      sample pairs the returned handles still have.
+    """
+    p0, p3 = np.asarray(p0, dtype=np.float32), np.asarray(p3, dtype=np.float32)
+    p1, p2 = np.array(p1, dtype=np.float32), np.array(p2, dtype=np.float32)
+    count = len(p0)
+    lift1 = _unit(p1 - p0)
+    lift2 = _unit(p2 - p3)
+    # End points cannot move, so samples right at the faces are not checked
+    t = np.linspace(0.0, 1.0, samples + 2)[1:-1]
+    weight1 = 3 * (1 - t)**2 * t
+    weight2 = 3 * (1 - t) * t**2
+    spatial_hash = SpatialHash(min_distance)
+
+    # One more pass than pushes, so the count returned is measured after the last push
+    for iteration in range(iterations + 1):
+        points = evaluate_bezier(p0, p1, p2, p3, t)
+        push1 = np.zeros((count, 3))
+        push2 = np.zeros((count, 3))
+        violations = 0
+        for sample in range(len(t)):
+            first, second, offset, distance = spatial_hash.update(points[sample]).pairs()
+            if len(first) == 0:
+                continue
+            violations += len(first)
+            missing = min_distance - distance
+
+            # Push both paths sideways by half of the missing distance
+            shift = offset / np.maximum(distance, 1e-6)[:, None] * (missing * 0.5)[:, None]
+            shift = _sum_per_agent(first, shift, count) - _sum_per_agent(second, shift, count)
+            # Lift one path of the pair by the missing distance
+            lift = np.bincount(np.maximum(first, second), weights=missing, minlength=count)[:, None]
+
+            push1 += (shift + lift * lift1) * weight1[sample]
+            push2 += (shift + lift * lift2) * weight2[sample]
+        if violations == 0 or iteration == iterations:
+            break
+        p1 += push1.astype(np.float32)
+        p2 += push2.astype(np.float32)
+
+    return p1, p2, violations
+
+
+def _sum_per_agent(index, values, count):
+    """
+    Sums rows of values into the agents given by index.
+    """
+    if values.ndim == 1:
+        return np.bincount(index, weights=values, minlength=count)
+    return np.stack([np.bincount(index, weights=values[:, axis], minlength=count)
+                     for axis in range(values.shape[1])], axis=1)
+
+
+def _unit(vectors):
+    length = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(length, 1e-9)
+
+
+def simulate_swarm(starts, goals, frames, start_normals=None, goal_normals=None,
+                   max_speed=0.2, max_force=0.05, neighbor_radius=1.0, separation_radius=0.5,
+                   separation_weight=1.5, alignment_weight=0.5, cohesion_weight=0.2, goal_weight=1.0,
+                   cruise_height=2.0, arrive_radius=0.1, seed=None, out=None):
+    """
+    Simulates a flock of agents flying from start points to goal points.
+
+    Every agent climbs along its start normal to cruise_height, flies to cruise_height
+    above its goal, then descends along the goal normal and stays there once landed.
+    Distances and speeds are in scene units per frame.
+
+    Args:
+    - starts: An (N, 3) array of start positions, e.g. captured face centers.
+    - goals: An (N, 3) array of goal positions.
+    - frames: The number of frames to simulate.
+    - start_normals: Optional (N, 3) takeoff directions (default +Z).
+    - goal_normals: Optional (N, 3) landing directions (default +Z).
+    - max_speed: The maximum speed of an agent.
+    - max_force: The maximum change of velocity per frame.
+    - neighbor_radius: The distance within which agents align and cohere.
+    - separation_radius: The distance within which agents push each other apart.
+    - separation_weight, alignment_weight, cohesion_weight, goal_weight: Force weights.
+    - cruise_height: The flight height above the start and goal faces.
+    - arrive_radius: The distance at which a waypoint counts as reached.
+    - seed: Seed of the small random jitter added to the initial velocities.
+    - out: Optional (frames, N, 3) array to write into, e.g. a memory-mapped cache.
+
+    Returns:
+    - A (frames, N, 3) float32 array of positions.
+    """
+    starts = np.asarray(starts, dtype=np.float32)
+    goals = np.asarray(goals, dtype=np.float32)
+    count = len(starts)
+    up = np.broadcast_to(np.array([0.0, 0.0, 1.0], dtype=np.float32), (count, 3))
+    start_normals = _unit(np.asarray(start_normals, dtype=np.float32)) if start_normals is not None else up
+    goal_normals = _unit(np.asarray(goal_normals, dtype=np.float32)) if goal_normals is not None else up
+
+    takeoff_points = starts + start_normals * cruise_height
+    approach_points = goals + goal_normals * cruise_height
+
+    if out is None:
+        out = np.empty((frames, count, 3), dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    position = starts.astype(np.float32)
+    velocity = (rng.standard_normal((count, 3)) * max_speed * 0.01).astype(np.float32)
+    phase = np.full(count, CLIMB, dtype=np.int8)
+    spatial_hash = SpatialHash(neighbor_radius)
+
+    for frame in range(frames):
+        out[frame] = position
+
+        # Advance agents that reached their current waypoint to the next phase
+        waypoint = np.where((phase == CLIMB)[:, None], takeoff_points,
+                            np.where((phase == CRUISE)[:, None], approach_points, goals))
+        # The takeoff and approach points are only guides, so they count as reached from further away
+        reach = np.where(phase == LAND, arrive_radius + max_speed, separation_radius)
+        reached = np.linalg.norm(waypoint - position, axis=1) < reach
+        phase = np.where(reached & (phase < LANDED), phase + 1, phase).astype(np.int8)
+        waypoint = np.where((phase == CLIMB)[:, None], takeoff_points,
+                            np.where((phase == CRUISE)[:, None], approach_points, goals))
+
+        flying = phase != LANDED
+        steer = np.zeros((count, 3), dtype=np.float32)
+
+        # Goal seeking with arrival slow-down
+        to_waypoint = waypoint - position
+        distance = np.linalg.norm(to_waypoint, axis=1, keepdims=True)
+        desired_speed = np.minimum(max_speed, distance * 0.25)
+        steer += goal_weight * (to_waypoint / np.maximum(distance, 1e-9) * desired_speed - velocity)
+
+        # Neighbor forces between flying agents only
+        moving = np.flatnonzero(flying)
+        if len(moving) > 1:
+            first, second, offset, gap = neighbor_pairs(position, neighbor_radius, spatial_hash)
+            # Re-index the pairs between flying agents to the moving subset
+            local_index = np.full(count, -1)
+            local_index[moving] = np.arange(len(moving))
+            both_flying = flying[first] & flying[second]
+            first, second = local_index[first[both_flying]], local_index[second[both_flying]]
+            offset, gap = offset[both_flying], gap[both_flying]
+            local = len(moving)
+            neighbors = np.maximum(np.bincount(first, minlength=local), 1)[:, None]
+
+            close = gap < separation_radius
+            push = offset[close] / np.maximum(gap[close], 1e-6)[:, None] ** 2
+            separation = _sum_per_agent(first[close], push, local)
+
+            alignment = _sum_per_agent(first, velocity[moving][second], local) / neighbors - velocity[moving]
+            cohesion = -_sum_per_agent(first, offset, local) / neighbors
+
+            has_neighbors = (np.bincount(first, minlength=local) > 0)[:, None]
+            # Landing agents only keep their distance, they no longer flock
+            cruising = (phase[moving] == CRUISE)[:, None]
+            # Fade neighbor forces out near the waypoint, so close goals can still be reached
+            fade = np.minimum(1.0, distance[moving] / (2 * neighbor_radius))
+            steer[moving] += fade * (separation_weight * separation
+                                     + has_neighbors * cruising * (alignment_weight * alignment + cohesion_weight * cohesion))
+
+        # Limit the steering force and the speed
+        steer_length = np.linalg.norm(steer, axis=1, keepdims=True)
+        steer *= np.minimum(1.0, max_force / np.maximum(steer_length, 1e-9))
+        velocity += steer
+        speed = np.linalg.norm(velocity, axis=1, keepdims=True)
+        velocity *= np.minimum(1.0, max_speed / np.maximum(speed, 1e-9))
+
+        velocity[~flying] = 0.0
+        position = position + velocity
+        # Snap landed agents onto their goal
+        landed = (phase == LAND) & (np.linalg.norm(goals - position, axis=1) < arrive_radius)
+        phase[landed] = LANDED
+        position[phase == LANDED] = goals[phase == LANDED]
+
+    return out
+
+
+def benchmark(agent_counts=(1000, 10000), frames=1000, seed=0):
+    """
+    Times simulate_swarm for agents flying between two random point clouds.
+
+    Args:
+    - agent_counts: Numbers of agents to simulate.
+    - frames: The number of frames per simulation.
+    - seed: Seed of the random start and goal points.
+
+    Returns:
+    - A list of result dicts with the simulation time.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for count in agent_counts:
+        # Roughly one agent per unit of floor area on both sides
+        side = np.sqrt(count)
+        starts = np.column_stack((rng.uniform(0, side, (count, 2)), np.zeros(count))).astype(np.float32)
+        goals = np.column_stack((rng.uniform(0, side, (count, 2)) + side * 2, np.zeros(count))).astype(np.float32)
+
+        start = time.perf_counter()
+        trajectory = simulate_swarm(starts, goals, frames, seed=seed)
+        elapsed = time.perf_counter() - start
+
+        results.append({"agents": count, "frames": frames, "seconds": elapsed})
+        print(f"swarm simulation agents={count:<6} frames={frames:<5} {elapsed:8.2f}s "
+              f"({elapsed / frames * 1000:.1f} ms/frame, {trajectory.nbytes / 1e6:.0f} MB)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
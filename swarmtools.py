@@ -1,61 +1,145 @@
+"""
+Bezier bridges between the faces of a mesh.
+
+Bridges leave every face along its normal and arrive at the paired face along
+that face's normal. Face pairs are given as an (N, 2) array of face indices,
+for example from all_face_pairs, nearest_face_pairs or random_face_pairs, and
+all bridges are written as the splines of a single curve datablock.
+"""
 import bpy
-from mathutils import Vector
+import numpy as np
+from mathutils.kdtree import KDTree
 
-def create_bezier_between_faces(obj, face_index1, face_index2):
-    # Ensure the object is a mesh
+import bpl
+from swarm import capture_selected_faces, read_face_selection
+
+
+def selected_face_indices(obj):
+    """
+    Returns the indices of the selected faces of a mesh object as an int array.
+    """
+    return np.flatnonzero(read_face_selection(obj.data))
+
+
+def all_face_pairs(face_indices):
+    """
+    Returns every pair of the given faces once, as an (N, 2) array of face indices.
+    """
+    face_indices = np.asarray(face_indices)
+    first, second = np.triu_indices(len(face_indices), k=1)
+    return np.column_stack((face_indices[first], face_indices[second]))
+
+
+def nearest_face_pairs(obj, face_indices, k=1):
+    """
+    Pairs each of the given faces with its k nearest faces among them.
+
+    Args:
+    - obj: The mesh object.
+    - face_indices: The candidate faces.
+    - k: The number of neighbors per face.
+
+    Returns:
+    - An (N, 2) array of face indices; a pair found from both of its faces is listed once.
+    """
+    face_indices = np.asarray(face_indices)
+    k = min(k, len(face_indices) - 1)
+    if k < 1:
+        return np.zeros((0, 2), dtype=face_indices.dtype)
+
+    centers, _ = capture_selected_faces(obj, selected_only=False)
+    centers = centers[face_indices].tolist()
+    tree = KDTree(len(centers))
+    for index, center in enumerate(centers):
+        tree.insert(center, index)
+    tree.balance()
+
+    # The nearest result of every query is the face itself
+    neighbors = [[index for _, index, _ in tree.find_n(center, k + 1)] for center in centers]
+    first = np.repeat(np.arange(len(centers)), [len(row) for row in neighbors])
+    second = np.fromiter((index for row in neighbors for index in row), dtype=np.int64, count=len(first))
+    pairs = np.column_stack((first, second))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    return face_indices[pairs]
+
+
+def random_face_pairs(face_indices, count, seed=None):
+    """
+    Draws count random pairs of two different faces. Unlike swarm.pair_random_indices,
+    a face can be part of several pairs.
+
+    Returns:
+    - A (count, 2) array of face indices.
+    """
+    face_indices = np.asarray(face_indices)
+    if len(face_indices) < 2:
+        raise ValueError("At least two faces are needed for a pair")
+
+    rng = np.random.default_rng(seed)
+    first = rng.integers(len(face_indices), size=count)
+    # Shifting by 1..len-1 (mod len) never picks the first face again
+    second = (first + rng.integers(1, len(face_indices), size=count)) % len(face_indices)
+    return np.column_stack((face_indices[first], face_indices[second]))
+
+
+def create_bezier_bridges(obj, face_pairs, height_factor=4, name='BezierCurve'):
+    """
+    Creates one Bezier spline per face pair, all in a single curve object.
+
+    Every bridge starts at the center of the first face and ends at the center of
+    the second. The inner handles point along the face normals, at height_factor
+    times the distance between the faces.
+
+    Args:
+    - obj: The mesh object.
+    - face_pairs: An (N, 2) array of face indices.
+    - height_factor: The handle length relative to the distance between the faces.
+    - name: The name of the curve and, with the suffix "Obj", of its object.
+
+    Returns:
+    - The new curve object, or None if obj is not a mesh.
+    """
     if obj.type != 'MESH':
         print("Selected object is not a mesh")
-        return
-
-    mesh = obj.data
-    # Get the world matrix of the object
-    mw = obj.matrix_world
-    
-    # Get the center and normal of the first face
-    f1 = mesh.polygons[face_index1]
-    center1 = mw @ sum((obj.data.vertices[vert].co for vert in f1.vertices), Vector()) / len(f1.vertices)
-    normal1 = mw.to_3x3() @ f1.normal
-
-    # Get the center and normal of the second face
-    f2 = mesh.polygons[face_index2]
-    center2 = mw @ sum((obj.data.vertices[vert].co for vert in f2.vertices), Vector()) / len(f2.vertices)
-    normal2 = mw.to_3x3() @ f2.normal
-
-    # Calculate the distance between the faces and set the height
-    distance = (center1 - center2).length
-    height = 4 * distance
-
-    # Calculate control points
-    control1 = center1 + normal1 * height
-    control2 = center2 + normal2 * height
-
-    # Create the curve
-    curve_data = bpy.data.curves.new('BezierCurve', type='CURVE')
-    curve_data.dimensions = '3D'
-    spline = curve_data.splines.new(type='BEZIER')
-    spline.bezier_points.add(1)
-    
-    # Assign points
-    spline.bezier_points[0].co = center1
-    spline.bezier_points[0].handle_right_type = 'FREE'
-    spline.bezier_points[0].handle_right = control1
-    
-    spline.bezier_points[1].co = center2
-    spline.bezier_points[1].handle_left_type = 'FREE'
-    spline.bezier_points[1].handle_left = control2
-    
-    # Create curve object
-    curve_obj = bpy.data.objects.new('BezierCurveObj', curve_data)
+        return None
+
+    face_pairs = np.asarray(face_pairs).reshape(-1, 2)
+    centers, normals = capture_selected_faces(obj, selected_only=False)
+    co = centers[face_pairs]
+    face_normals = normals[face_pairs]
+
+    distance = np.linalg.norm(co[:, 0] - co[:, 1], axis=1)
+    controls = co + face_normals * (height_factor * distance)[:, None, None]
+
+    # The outer handles mirror the inner ones, so the bridges can be extended smoothly
+    handle_right = np.stack((controls[:, 0], 2 * co[:, 1] - controls[:, 1]), axis=1)
+    handle_left = np.stack((2 * co[:, 0] - controls[:, 0], controls[:, 1]), axis=1)
+
+    curve_data = bpl.create_bezier_curve(name, co, handle_left, handle_right)
+    curve_obj = bpy.data.objects.new(name + 'Obj', curve_data)
     bpy.context.scene.collection.objects.link(curve_obj)
+    return curve_obj
+
+
+def create_bezier_between_faces(obj, face_index1, face_index2):
+    """
+    Creates a Bezier curve between two faces of a mesh object.
+    """
+    return create_bezier_bridges(obj, [(face_index1, face_index2)])
+
+
+if __name__ == "__main__":
+    obj = bpy.context.object
+    if obj and obj.type == 'MESH' and obj.mode == 'EDIT':
+        bpy.ops.object.mode_set(mode='OBJECT')  # Temporarily switch to Object Mode to access mesh data
+        selected_faces = selected_face_indices(obj)
+
+        if len(selected_faces) >= 2:
+            # Bridges to the nearest faces grow linearly with the selection; all_face_pairs
+            # would create one bridge per pair of selected faces
+            create_bezier_bridges(obj, nearest_face_pairs(obj, selected_faces, k=3))
+        else:
+            print("Please select at least two faces.")
 
-# Example usage
-if bpy.context.object and bpy.context.object.type == 'MESH' and bpy.context.object.mode == 'EDIT':
-    bpy.ops.object.mode_set(mode='OBJECT')  # Temporarily switch to Object Mode to access mesh data
-    selected_faces = [p.index for p in bpy.context.object.data.polygons if p.select]
-    
-    if len(selected_faces) == 2:
-        create_bezier_between_faces(bpy.context.object, selected_faces[0], selected_faces[1])
-    else:
-        print("Please select exactly two faces.")
-    
-    bpy.ops.object.mode_set(mode='EDIT')  # Switch back to Edit Mode
\ No newline at end of file
+        bpy.ops.object.mode_set(mode='EDIT')  # Switch back to Edit Mode
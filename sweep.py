@@ -0,0 +1,58 @@
+"""
+Frame math for sweeping cross-sections along paths.
+
+Shared by the modules that bake animation along curves (bake) and the ones that
+build swept geometry (snailshell), so neither depends on the other. The module
+only uses NumPy.
+"""
+import numpy as np
+
+
+def normalized(vectors):
+    """
+    Scales vectors to unit length along the last axis; zero vectors stay zero.
+    """
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+
+def start_normal(tangent):
+    """
+    Returns a unit normal perpendicular to a unit tangent, preferring the one closest to +Z.
+    """
+    # Any direction that is not parallel to the tangent gives a valid normal
+    helper = np.array((0.0, 0.0, 1.0)) if abs(tangent[2]) < 0.9 else np.array((1.0, 0.0, 0.0))
+    return normalized(np.cross(np.cross(tangent, helper), tangent))
+
+
+def minimum_twist_normals(directions, first_normal):
+    """
+    Transports a normal along the path directions without twisting it, like the
+    'Minimum' twist method of 3D curves.
+
+    Args:
+    - directions: (P, 3) array of unit tangents.
+    - first_normal: The unit normal at the first point.
+
+    Returns:
+    - A (P, 3) array of unit normals.
+    """
+    # Smallest rotations that take every direction to the next one (Rodrigues' formula)
+    previous, following = directions[:-1], directions[1:]
+    axes = np.cross(previous, following)
+    sin = np.linalg.norm(axes, axis=1)
+    cos = np.sum(previous * following, axis=1)
+    axes = normalized(axes)
+    cross_matrices = np.zeros((len(axes), 3, 3))
+    cross_matrices[:, 0, 1], cross_matrices[:, 0, 2] = -axes[:, 2], axes[:, 1]
+    cross_matrices[:, 1, 0], cross_matrices[:, 1, 2] = axes[:, 2], -axes[:, 0]
+    cross_matrices[:, 2, 0], cross_matrices[:, 2, 1] = -axes[:, 1], axes[:, 0]
+    rotations = (np.eye(3) + sin[:, None, None] * cross_matrices
+                 + (1 - cos)[:, None, None] * cross_matrices @ cross_matrices)
+
+    normals = np.empty_like(directions)
+    normal = first_normal
+    normals[0] = normal
+    for index, rotation in enumerate(rotations, 1):
+        normal = rotation @ normal
+        normals[index] = normal
+    return normalized(normals - np.sum(normals * directions, axis=1, keepdims=True) * directions)